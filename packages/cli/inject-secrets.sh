@@ -113,9 +113,15 @@ fi
 
 # Backup existing file if it exists
 if [ -f "$OUTPUT_FILE" ]; then
-    BACKUP_FILE="$OUTPUT_FILE.backup.$(date +%Y%m%d_%H%M%S)"
-    echo -e "${YELLOW}⚠️  Backing up existing file to: $(basename $BACKUP_FILE)${NC}"
-    cp "$OUTPUT_FILE" "$BACKUP_FILE"
+    if command -v vault-backup >/dev/null 2>&1; then
+        # Deduplicated store in ~/.claude-vault/backups (see vault-backup log)
+        BACKUP_REF="$(vault-backup add "$OUTPUT_FILE")" || exit 1
+        echo -e "${YELLOW}⚠️  Backed up existing file: $BACKUP_REF${NC}"
+    else
+        BACKUP_FILE="$OUTPUT_FILE.backup.$(date +%Y%m%d_%H%M%S)"
+        echo -e "${YELLOW}⚠️  Backing up existing file to: $(basename $BACKUP_FILE)${NC}"
+        cp "$OUTPUT_FILE" "$BACKUP_FILE"
+    fi
 fi
 
 # Create output directory if needed
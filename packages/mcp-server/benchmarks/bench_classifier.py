@@ -0,0 +1,76 @@
+"""
+Throughput and accuracy benchmark for the shared secret classifier.
+
+Runs on the labeled corpus (benchmarks/labeled_corpus.py) and
+reports values/s plus precision/recall against the ground-truth labels, so
+speed work on the classifier cannot quietly regress detection quality.
+
+Usage:
+    python benchmarks/bench_classifier.py [--values N] [--seed S] [--by-kind]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
+
+from claude_vault_mcp.classifier import SecretClassifier, get_classifier  # noqa: E402
+from claude_vault_mcp.file_parsers import classify_secret  # noqa: E402
+from claude_vault_mcp.tokenization import should_tokenize_value  # noqa: E402
+from labeled_corpus import errors_by_kind, generate_corpus, score  # noqa: E402
+
+
+def measure(label: str, fn, pairs, by_kind: bool = False) -> None:
+    start = time.perf_counter()
+    verdicts = fn()
+    elapsed = time.perf_counter() - start
+    quality = score(verdicts, [p.is_secret for p in pairs])
+    print(
+        f"{label:<32} {len(pairs) / elapsed:>12,.0f} values/s  ({elapsed * 1000:7.1f} ms)  "
+        f"precision {quality['precision']:.3f}  recall {quality['recall']:.3f}"
+    )
+    if by_kind:
+        for kind, (errors, total) in errors_by_kind(verdicts, pairs).items():
+            if errors:
+                print(f"    {kind:<20} {errors:>6} / {total} misclassified")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--by-kind", action="store_true", help="Show errors per value kind")
+    args = parser.parse_args()
+
+    pairs = generate_corpus(args.values, args.seed)
+    corpus = [(p.key, p.value) for p in pairs]
+    classifier = SecretClassifier({**get_classifier().rules, "memo_size": 2 * len(corpus)})
+    uncached = SecretClassifier({**get_classifier().rules, "memo_size": 0})
+
+    measure(
+        "classify_secret (per value)",
+        lambda: [classify_secret(k, v) for k, v in corpus],
+        pairs,
+        args.by_kind,
+    )
+    measure("classify_batch (no memo)", lambda: uncached.classify_batch(corpus), pairs)
+
+    # Repeated scans of unchanged files: every pair is already memoized
+    classifier.classify_batch(corpus)
+    measure("classify_batch (warm memo)", lambda: classifier.classify_batch(corpus), pairs)
+    measure(
+        "should_tokenize_value",
+        lambda: [should_tokenize_value(k, v) for k, v in corpus],
+        pairs,
+        args.by_kind,
+    )
+    measure("should_tokenize_batch", lambda: classifier.should_tokenize_batch(corpus), pairs)
+
+    stats = classifier.cache_stats()
+    print(f"memo: {stats['size']:,} entries, hit rate {stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
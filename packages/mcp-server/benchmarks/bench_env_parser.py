@@ -0,0 +1,68 @@
+"""
+Throughput of the streaming .env parser.
+
+Parses a large generated .env file (values from the labeled corpus, with
+comments and blank lines mixed in) both as plain key/values and with full
+structure, and compares against a raw line read of the same file.
+
+Usage:
+    python benchmarks/bench_env_parser.py [--entries N] [--seed S]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
+
+from claude_vault_mcp.file_parsers import (  # noqa: E402
+    parse_env_file,
+    parse_env_file_with_structure,
+)
+from labeled_corpus import generate_corpus, render_env  # noqa: E402
+
+
+def measure(label: str, fn, path: str, size: int) -> None:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<24} {size / best / 1e6:>8.1f} MB/s  {best * 1000:>9.1f} ms")
+
+
+def read_lines(path: str) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        for _ in f:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = generate_corpus(args.entries, seed=args.seed)
+    chunks = []
+    for start in range(0, len(pairs), 20):
+        chunks.append(f"# Section {start // 20}\n")
+        chunks.append(render_env(pairs[start : start + 20]))
+
+    with tempfile.NamedTemporaryFile("w", suffix=".env", delete=False) as f:
+        f.write("".join(chunks))
+        path = f.name
+    try:
+        size = os.path.getsize(path)
+        print(f"{args.entries:,} entries, {size / 1e6:.1f} MB")
+        measure("read lines (baseline)", read_lines, path, size)
+        measure("parse_env_file", parse_env_file, path, size)
+        measure("with structure", parse_env_file_with_structure, path, size)
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
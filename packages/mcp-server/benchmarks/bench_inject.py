@@ -0,0 +1,84 @@
+"""
+Bulk injection throughput with atomic, fsync-safe writes.
+
+Injects a tokenized .env template for many services through
+VaultInjectTool._inject_from_template (detokenize, back up, atomic replace)
+and compares it with the previous in-place write, with VAULT_FSYNC on and
+off. Runs in a temporary directory.
+
+Usage:
+    python benchmarks/bench_inject.py [--services N] [--keys N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
+
+from claude_vault_mcp.tokenization import get_token_vault  # noqa: E402
+from claude_vault_mcp.tools import inject as inject_module  # noqa: E402
+
+
+def build_templates(services: int, keys: int) -> dict:
+    """Tokenized .env template per service."""
+    vault = get_token_vault()
+    templates = {}
+    for s in range(services):
+        lines = []
+        for k in range(keys):
+            token = vault.tokenize(f"secret-{s}-{k}-" + "x" * 24, metadata={"key": f"K{k}"})
+            lines.append(f"SECRET_{k}={token}")
+        lines.append(f"PORT={8000 + s}")
+        templates[f"svc{s:03d}"] = "\n".join(lines) + "\n"
+    return templates
+
+
+def run(templates: dict) -> float:
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        tool = inject_module.VaultInjectTool()
+        try:
+            for service, template in templates.items():
+                tool._inject_from_template(service, template, "env")  # Creates the file
+            start = time.perf_counter()
+            for service, template in templates.items():
+                tool._inject_from_template(service, template, "env")  # Replaces (with backup)
+            return time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=30)
+    args = parser.parse_args()
+
+    os.environ["VAULT_SECURITY_MODE"] = "tokenized"
+    templates = build_templates(args.services, args.keys)
+    print(f"{args.services} services x {args.keys} secrets")
+
+    # Previous behaviour: truncate and write the target in place
+    atomic_write = inject_module.atomic_write
+    inject_module.atomic_write = lambda path, data: Path(path).write_text(data)
+    try:
+        report("in-place write", run(templates), args.services)
+    finally:
+        inject_module.atomic_write = atomic_write
+
+    for fsync in ("false", "true"):
+        os.environ["VAULT_FSYNC"] = fsync
+        report(f"atomic, fsync={fsync}", run(templates), args.services)
+
+
+def report(name: str, elapsed: float, files: int) -> None:
+    print(f"{name:<22} {elapsed * 1000:>8.1f} ms   {files / elapsed:>7.0f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compose load/dump cost with the pure-Python and libyaml YAML backends.
+
+Builds a large multi-service compose file from the labeled corpus and times
+loading and dumping it with yaml.SafeLoader/SafeDumper and, when PyYAML was
+built with libyaml, CSafeLoader/CSafeDumper (the backend file_parsers uses).
+
+Usage:
+    python benchmarks/bench_yaml.py [--services N] [--env-per-service N]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../src"))
+
+from claude_vault_mcp.file_parsers import yaml_backend  # noqa: E402
+from labeled_corpus import generate_corpus, render_compose  # noqa: E402
+
+
+def build_compose(services: int, env_per_service: int) -> dict:
+    compose = {"services": {}}
+    for i in range(services):
+        service = render_compose(generate_corpus(env_per_service, seed=i))["services"]["app"]
+        service["ports"] = [f"{8000 + i}:80"]
+        service["volumes"] = [f"./data/svc{i}:/data", "/etc/localtime:/etc/localtime:ro"]
+        service["depends_on"] = [f"svc{i - 1}"] if i else []
+        compose["services"][f"svc{i}"] = service
+    return compose
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--env-per-service", type=int, default=40)
+    args = parser.parse_args()
+
+    compose = build_compose(args.services, args.env_per_service)
+    text = yaml.dump(compose, Dumper=yaml.SafeDumper, sort_keys=False)
+    print(
+        f"{args.services} services, {len(text) / 1e6:.1f} MB "
+        f"(file_parsers backend: {yaml_backend()})"
+    )
+
+    backends = [("python", yaml.SafeLoader, yaml.SafeDumper)]
+    if hasattr(yaml, "CSafeLoader"):
+        backends.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+
+    for name, loader, dumper in backends:
+        load = best_of(lambda: yaml.load(io.StringIO(text), Loader=loader))
+        dump = best_of(lambda: yaml.dump(compose, io.StringIO(), Dumper=dumper, sort_keys=False))
+        print(f"{name:<8} load {load * 1000:>8.1f} ms   dump {dump * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Labeled synthetic corpus of .env and docker-compose environment entries.
+
+Used to measure classifier accuracy (precision/recall) alongside throughput,
+so speed work on the classifier cannot quietly regress detection quality.
+Every entry carries the ground-truth label and the kind of value it models;
+the generator is seeded and fully deterministic.
+
+Example:
+    pairs = generate_corpus(1000, seed=0)
+    verdicts = [classify_secret(p.key, p.value) for p in pairs]
+    print(score(verdicts, [p.is_secret for p in pairs]))
+"""
+
+import random
+import string
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+_ALNUM = string.ascii_letters + string.digits
+_HEX = "0123456789abcdef"
+_B64 = _ALNUM + "+/"
+_B64URL = _ALNUM + "-_"
+
+
+@dataclass(frozen=True)
+class LabeledPair:
+    """One environment entry with its ground-truth label."""
+
+    key: str
+    value: str
+    is_secret: bool
+    kind: str  # Generator that produced the entry, e.g. "password", "port"
+    source: str  # "env" or "compose"
+
+
+def _rand(rng: random.Random, k: int, alphabet: str = _ALNUM) -> str:
+    return "".join(rng.choices(alphabet, k=k))
+
+
+def _prefix(rng: random.Random) -> str:
+    return rng.choice(["", "APP_", "DB_", "REDIS_", "SMTP_", "AUTH_", "GRAFANA_", "MINIO_"])
+
+
+# Each generator returns (key, value); grouped by label
+_Generator = Callable[[random.Random], Tuple[str, str]]
+
+SECRET_GENERATORS: Dict[str, _Generator] = {
+    "password": lambda r: (
+        _prefix(r) + r.choice(["PASSWORD", "PASS", "DB_PASSWD", "ADMIN_PASSWORD"]),
+        _rand(r, r.randint(12, 32), _ALNUM + "!@#%^&*-_"),
+    ),
+    "api_key": lambda r: (
+        r.choice(["API_KEY", "STRIPE_API_KEY", "SENDGRID_API_KEY", "OPENAI_API_KEY"]),
+        r.choice(["sk-", "sk_live_", "SG.", "key-", ""]) + _rand(r, r.randint(24, 48)),
+    ),
+    "token": lambda r: (
+        _prefix(r) + r.choice(["TOKEN", "ACCESS_TOKEN", "BOT_TOKEN", "AUTH_TOKEN"]),
+        r.choice(["ghp_" + _rand(r, 36), "xoxb-" + _rand(r, 40), _rand(r, 40, _HEX)]),
+    ),
+    "hex_secret": lambda r: (
+        r.choice(["SECRET_KEY", "APP_SECRET", "JWT_SECRET", "SESSION_SECRET", "COOKIE_SECRET"]),
+        _rand(r, r.choice([32, 64]), _HEX),
+    ),
+    "base64_key": lambda r: (
+        r.choice(["ENCRYPTION_KEY", "MASTER_KEY", "SIGNING_KEY", "PRIVATE_KEY"]),
+        _rand(r, 43, _B64) + "=",
+    ),
+    "aws_credentials": lambda r: r.choice(
+        [
+            ("AWS_ACCESS_KEY_ID", "AKIA" + _rand(r, 16, string.ascii_uppercase + string.digits)),
+            ("AWS_SECRET_ACCESS_KEY", _rand(r, 40, _B64)),
+        ]
+    ),
+    "jwt": lambda r: (
+        r.choice(["SESSION_DATA", "SERVICE_ROLE", "ANON_CONFIG"]),
+        f"eyJ{_rand(r, 30, _B64URL)}.eyJ{_rand(r, 60, _B64URL)}.{_rand(r, 43, _B64URL)}",
+    ),
+    "connection_string": lambda r: (
+        r.choice(["DATABASE_URL", "REDIS_DSN", "BROKER", "MONGO_CONNECTION"]),
+        "{}://{}:{}@{}:{}/{}".format(
+            r.choice(["postgres", "mysql", "redis", "mongodb", "amqp"]),
+            r.choice(["app", "admin", "svc"]),
+            _rand(r, r.randint(12, 24)),
+            r.choice(["db", "cache", "db.internal", "10.0.0.12"]),
+            r.randint(1024, 65535),
+            r.choice(["app", "0", "prod"]),
+        ),
+    ),
+    "opaque": lambda r: (
+        r.choice(["LICENSE", "WEBHOOK_SIGNATURE", "HMAC", "SALT"]),
+        _rand(r, r.randint(24, 48)),
+    ),
+}
+
+CONFIG_GENERATORS: Dict[str, _Generator] = {
+    "port": lambda r: (_prefix(r) + "PORT", str(r.randint(1, 65535))),
+    "url": lambda r: (
+        _prefix(r) + r.choice(["URL", "BASE_URL", "CALLBACK_URL", "ENDPOINT"]),
+        f"https://{r.choice(['app', 'api', 'auth', 'grafana'])}{r.randint(1, 99)}"
+        f".example.com/{r.choice(['', 'v1', 'callback', 'oauth2/authorize'])}",
+    ),
+    "path": lambda r: (
+        r.choice(["DATA_DIR", "CONFIG_PATH", "LOG_FILE", "CERT_PATH", "UPLOAD_DIR"]),
+        r.choice(["/srv", "/var/lib", "/etc", "./data", "~/.config"])
+        + f"/{r.choice(['app', 'grafana', 'ssl', 'uploads'])}/{r.randint(1, 999)}",
+    ),
+    "boolean": lambda r: (
+        r.choice(["DEBUG", "ENABLE_SIGNUP", "SSL_VERIFY", "METRICS_ENABLED"]),
+        r.choice(["true", "false", "yes", "no", "on", "off", "1", "0"]),
+    ),
+    "uuid": lambda r: (
+        r.choice(["INSTANCE_ID", "TENANT_ID", "CLIENT_ID", "WORKSPACE_ID"]),
+        str(uuid.UUID(int=r.getrandbits(128), version=4)),
+    ),
+    "hostname": lambda r: (
+        _prefix(r) + r.choice(["HOST", "HOSTNAME", "SERVER"]),
+        r.choice(["localhost", "db", "redis", f"node{r.randint(1, 9)}.internal", "0.0.0.0"]),
+    ),
+    "log_level": lambda r: (
+        "LOG_LEVEL",
+        r.choice(["debug", "info", "warning", "error", "INFO"]),
+    ),
+    "timezone": lambda r: ("TZ", r.choice(["UTC", "Europe/Berlin", "America/New_York"])),
+    "image": lambda r: (
+        r.choice(["IMAGE", "APP_IMAGE", "WORKER_IMAGE"]),
+        f"{r.choice(['ghcr.io/acme', 'docker.io/library', 'quay.io/org'])}"
+        f"/{r.choice(['app', 'worker', 'nginx'])}:{r.randint(1, 9)}.{r.randint(0, 20)}",
+    ),
+    "email": lambda r: (
+        r.choice(["ADMIN_EMAIL", "SMTP_FROM", "CONTACT"]),
+        f"{r.choice(['admin', 'noreply', 'ops'])}@example.com",
+    ),
+    "name": lambda r: (
+        r.choice(["APP_NAME", "DB_NAME", "DB_USER", "SERVICE_NAME", "PROJECT"]),
+        r.choice(["myapp", "grafana", "postgres", "homelab-services", "authentik"]),
+    ),
+    "reference": lambda r: (
+        _prefix(r) + r.choice(["PASSWORD", "SECRET_KEY", "TOKEN"]),
+        "${" + r.choice(["DB_PASSWORD", "SECRET_KEY", "API_TOKEN"]) + "}",
+    ),
+    "duration": lambda r: (
+        r.choice(["TIMEOUT", "CACHE_TTL", "SESSION_LIFETIME"]),
+        f"{r.randint(1, 3600)}{r.choice(['', 's', 'm', 'h'])}",
+    ),
+}
+
+
+def generate_corpus(
+    n: int, seed: int = 0, secret_ratio: float = 0.4, compose_ratio: float = 0.3
+) -> List[LabeledPair]:
+    """
+    Generate a labeled corpus.
+
+    Args:
+        n: Number of entries
+        seed: Random seed (same seed → same corpus)
+        secret_ratio: Fraction of entries that are secrets
+        compose_ratio: Fraction of entries attributed to compose files
+
+    Returns:
+        List of LabeledPair
+    """
+    rng = random.Random(seed)
+    secret_kinds = sorted(SECRET_GENERATORS)
+    config_kinds = sorted(CONFIG_GENERATORS)
+
+    pairs = []
+    for _ in range(n):
+        is_secret = rng.random() < secret_ratio
+        if is_secret:
+            kind = rng.choice(secret_kinds)
+            key, value = SECRET_GENERATORS[kind](rng)
+        else:
+            kind = rng.choice(config_kinds)
+            key, value = CONFIG_GENERATORS[kind](rng)
+        source = "compose" if rng.random() < compose_ratio else "env"
+        pairs.append(LabeledPair(key, value, is_secret, kind, source))
+    return pairs
+
+
+def render_env(pairs: Sequence[LabeledPair]) -> str:
+    """Render entries as .env file content (quoted where a shell would need it)."""
+    lines = ["# Generated test environment", ""]
+    for pair in pairs:
+        value = pair.value
+        if any(c in value for c in " #'\"$"):
+            value = "'" + value.replace("'", "") + "'"
+        lines.append(f"{pair.key}={value}")
+    return "\n".join(lines) + "\n"
+
+
+def render_compose(pairs: Sequence[LabeledPair], service: str = "app") -> dict:
+    """Render entries as a docker-compose dict with one service."""
+    return {
+        "services": {
+            service: {
+                "image": "ghcr.io/acme/app:1.0",
+                "environment": {pair.key: pair.value for pair in pairs},
+            }
+        }
+    }
+
+
+def score(predictions: Sequence[bool], labels: Sequence[bool]) -> Dict[str, float]:
+    """
+    Precision/recall of binary predictions against labels.
+
+    Args:
+        predictions: Predicted "is secret" verdicts
+        labels: Ground-truth labels, same order
+
+    Returns:
+        Dict with tp, fp, fn, tn counts and precision, recall, f1
+    """
+    tp = sum(1 for p, y in zip(predictions, labels) if p and y)
+    fp = sum(1 for p, y in zip(predictions, labels) if p and not y)
+    fn = sum(1 for p, y in zip(predictions, labels) if not p and y)
+    tn = sum(1 for p, y in zip(predictions, labels) if not p and not y)
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "tn": tn,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+    }
+
+
+def errors_by_kind(
+    predictions: Sequence[bool], pairs: Sequence[LabeledPair]
+) -> Dict[str, Tuple[int, int]]:
+    """Misclassifications per generator kind, as (errors, total)."""
+    totals: Dict[str, List[int]] = {}
+    for verdict, pair in zip(predictions, pairs):
+        bucket = totals.setdefault(pair.kind, [0, 0])
+        bucket[0] += verdict != pair.is_secret
+        bucket[1] += 1
+    return {kind: (errors, total) for kind, (errors, total) in sorted(totals.items())}
@@ -14,6 +14,15 @@ async def main():
     """
     from mcp.server.stdio import stdio_server
 
+    from .token_service import start_token_service
+    from .watcher import start_watcher
+
+    # Let the standalone approval server resolve this process's tokens (opt-in)
+    start_token_service()
+
+    # Keep workspace scan results warm for the vault_scan_* tools
+    start_watcher()
+
     async with stdio_server() as (read_stream, write_stream):
         await app.run(read_stream, write_stream, app.create_initialization_options())
 
@@ -28,6 +28,9 @@ from webauthn.helpers.structs import (
     UserVerificationRequirement,
 )
 
+from .atomic_io import atomic_write
+from .token_service import resolve_tokens
+
 
 @dataclass
 class PendingOperation:
@@ -36,14 +39,14 @@ class PendingOperation:
     op_id: str
     service: str
     action: str  # CREATE, UPDATE, SCAN_ENV, SCAN_COMPOSE
-    secrets: Dict[str, str]  # Detokenized values for display
+    secrets: Dict[str, str]  # Values to write (may contain @token-xxx references)
     warnings: list
     created_at: float
     approved: bool = False
     approved_at: Optional[float] = None
     scan_file_path: Optional[str] = None  # For scan operations
     metadata: Optional[Dict] = None  # Additional metadata
-    tokens_map: Optional[Dict[str, str]] = None  # Maps secret_key -> token (for display)
+    tokens_map: Optional[Dict[str, str]] = None  # Legacy: key -> token (tokens now kept in secrets)
     approved_by_credential: Optional[str] = None  # credential_id used for approval
     approved_by_device: Optional[str] = None  # device name used for approval
 
@@ -96,7 +99,7 @@ class ApprovalServer:
     def _save_credentials(self):
         """Save WebAuthn credentials to disk."""
         try:
-            self.credentials_file.write_text(json.dumps(self.credentials_db, indent=2))
+            atomic_write(self.credentials_file, json.dumps(self.credentials_db, indent=2))
         except Exception as e:
             print(f"Warning: Could not save credentials: {e}")
 
@@ -125,7 +128,7 @@ class ApprovalServer:
         try:
             # Convert PendingOperation objects to dicts
             data = {op_id: asdict(op) for op_id, op in self.pending_ops.items()}
-            self.pending_ops_file.write_text(json.dumps(data, indent=2))
+            atomic_write(self.pending_ops_file, json.dumps(data, indent=2))
         except Exception as e:
             print(f"Warning: Could not save pending operations: {e}", file=sys.stderr)
 
@@ -146,7 +149,7 @@ class ApprovalServer:
         try:
             # Convert PendingOperation objects to dicts
             data = {op_id: asdict(op) for op_id, op in self.completed_ops.items()}
-            self.completed_ops_file.write_text(json.dumps(data, indent=2))
+            atomic_write(self.completed_ops_file, json.dumps(data, indent=2))
         except Exception as e:
             print(f"Warning: Could not save completed operations: {e}", file=sys.stderr)
 
@@ -1537,14 +1540,35 @@ class ApprovalServer:
         else:
             age_str = f"{age_seconds // 3600}h ago"
 
+        # Workspace scans: one row per service
+        services_html = ""
+        if op.action == "SCAN_WORKSPACE":
+            import html
+
+            rows = "".join(
+                f"<tr><td>{html.escape(name)}</td><td>{len(svc.get('files', []))}</td>"
+                f"<td>{svc.get('secret_count', 0)}</td><td>{svc.get('config_count', 0)}</td></tr>"
+                for name, svc in metadata.get("services", {}).items()
+            )
+            services_html = f"""
+<div class="info-box" style="margin-top: 20px;">
+    <h3>📦 Services ({len(metadata.get("services", {}))})</h3>
+    <table style="width: 100%; text-align: left;">
+        <tr><th>Service</th><th>Files</th><th>Secrets</th><th>Config</th></tr>
+        {rows}
+    </table>
+</div>
+"""
+
         op_id_style = "background: #e9ecef; padding: 2px 6px; border-radius: 3px;"
+        file_label = "Directories" if op.action == "SCAN_WORKSPACE" else "File"
         return f"""
 <div class="info-box">
     <h3>ℹ️ Operation Details</h3>
     <p><strong>Operation ID:</strong> <code style="{op_id_style}">{op.op_id}</code></p>
     <p><strong>Service:</strong> {op.service}</p>
     <p><strong>Action:</strong> <span class="badge badge-{op.action.lower()}">{op.action}</span></p>
-    <p><strong>File:</strong> <code>{op.scan_file_path}</code></p>
+    <p><strong>{file_label}:</strong> <code>{op.scan_file_path}</code></p>
     <p><strong>Status:</strong> <span class="badge badge-warning">Pending Approval</span></p>
 </div>
 
@@ -1564,20 +1588,29 @@ class ApprovalServer:
     <strong>{secret_count} potential secret(s)</strong> and
     <strong>{config_count} config value(s)</strong></p>
 </div>
-"""
+{services_html}"""
 
     def _get_approval_html(self, op: PendingOperation) -> str:
         """Get HTML for approval page."""
         # Route to appropriate HTML generator based on action type
-        if op.action in ["SCAN_ENV", "SCAN_COMPOSE"]:
+        if op.action in ["SCAN_ENV", "SCAN_COMPOSE", "SCAN_WORKSPACE"]:
             action_specific_html = self._get_scan_approval_html(op)
         else:
             # Default: vault_set operations (CREATE/UPDATE)
             # Generate secrets list with smart truncation for readability
             import html
 
+            # Resolve tokens for display in one batched lookup (local vault,
+            # or the MCP process's token-resolution service when standalone)
+            tokens = [
+                v for v in op.secrets.values() if isinstance(v, str) and v.startswith("@token-")
+            ]
+            resolved = resolve_tokens(tokens, op.op_id) if tokens else {}
+
             secrets_rows = ""
-            for key, value in op.secrets.items():
+            for key, raw in op.secrets.items():
+                value = resolved.get(raw, raw)
+
                 # Escape HTML in values for safe display
                 value_escaped = html.escape(value)
 
@@ -1593,8 +1626,8 @@ class ApprovalServer:
 
                 # Check if we have a token for this key
                 token_display = ""
-                if op.tokens_map and key in op.tokens_map:
-                    token = op.tokens_map[key]
+                token = raw if raw in resolved else (op.tokens_map or {}).get(key)
+                if token:
                     token_display = (
                         '<br><span style="color: #6c757d; ' 'font-size: 0.85em;">Token: {}</span>'
                     ).format(token)
@@ -2197,8 +2230,8 @@ class ApprovalServer:
         """
         op_id = secrets_module.token_urlsafe(16)
 
-        # Secrets are expected to already be detokenized by the calling tool
-        # The tokens_map (if provided) maps keys to their original token values for display
+        # Secrets may still contain tokens; they are resolved for display through
+        # the token-resolution service. tokens_map (if provided) maps keys to tokens
         self.pending_ops[op_id] = PendingOperation(
             op_id=op_id,
             service=service,
@@ -0,0 +1,133 @@
+"""
+Atomic file replacement for generated .env, compose and state files.
+
+Content is written to a temporary file in the target's directory, optionally
+fsynced, and renamed over the target, so readers (and services restarting
+after a crash) see either the old file or the new one, never a truncated
+mix. The replacement keeps the old file's permissions and, where the process
+may, its ownership; the directory is fsynced so the rename itself survives
+a crash.
+
+Durability is controlled by VAULT_FSYNC (default: true). With it off, writes
+are still atomic for concurrent readers but may be lost on power failure.
+
+Example:
+    with atomic_open("/workspace/app/.env") as f:
+        f.write("API_KEY=...\\n")
+"""
+
+import os
+import secrets
+import stat
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+
+def fsync_enabled() -> bool:
+    """Whether atomic writes fsync by default (VAULT_FSYNC)."""
+    return os.getenv("VAULT_FSYNC", "true").lower() not in ("0", "false", "no", "off")
+
+
+def fsync_directory(directory: Union[str, Path]) -> None:
+    """Flush a directory entry change (rename, create) to disk, where supported."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows: directories cannot be opened for fsync
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(
+    file_path: Union[str, Path],
+    binary: bool = False,
+    encoding: str = "utf-8",
+    fsync: Optional[bool] = None,
+    mode: Optional[int] = None,
+) -> Iterator[IO]:
+    """
+    Open a file for writing that replaces the target only on success.
+
+    If the block raises, the target is untouched and the temporary file is
+    removed. A symlinked target is resolved, so the link keeps pointing at
+    the updated file (as with a plain open()). Hard links to the old file
+    keep the old content.
+
+    Args:
+        file_path: Target path (parent directories are created)
+        binary: Open in binary mode instead of text
+        encoding: Text encoding
+        fsync: Flush file and directory to disk (default: VAULT_FSYNC)
+        mode: Permissions for the file (default: the existing file's, or
+            0o666 minus the umask for a new file, like open())
+
+    Yields:
+        File object writing to the temporary file
+    """
+    path = Path(os.path.realpath(file_path))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fsync is None:
+        fsync = fsync_enabled()
+
+    try:
+        existing: Optional[os.stat_result] = os.stat(path)
+    except FileNotFoundError:
+        existing = None
+    if mode is None and existing is not None:
+        mode = stat.S_IMODE(existing.st_mode)
+
+    tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    # With a known mode, create owner-only until it is applied (the content
+    # may be secret); a new file gets 0o666 minus the umask from the kernel
+    initial_mode = 0o600 if mode is not None else 0o666
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, initial_mode)
+    try:
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else encoding) as f:
+            if existing is not None and hasattr(os, "fchown"):
+                try:
+                    os.fchown(f.fileno(), existing.st_uid, existing.st_gid)
+                except PermissionError:
+                    pass  # Only root (or the group's members) may keep another owner
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if fsync:
+        try:
+            fsync_directory(path.parent)
+        except OSError as e:
+            # The file is replaced; only the rename's durability is uncertain
+            print(f"Warning: Could not fsync {path.parent}: {e}", file=sys.stderr)
+
+
+def atomic_write(
+    file_path: Union[str, Path],
+    data: Union[str, bytes],
+    encoding: str = "utf-8",
+    fsync: Optional[bool] = None,
+    mode: Optional[int] = None,
+) -> None:
+    """
+    Atomically replace a file's content (see atomic_open).
+
+    Args:
+        file_path: Target path
+        data: Text or bytes to write
+        encoding: Text encoding
+        fsync: Flush to disk (default: VAULT_FSYNC)
+        mode: Permissions (default: kept from the existing file)
+    """
+    binary = isinstance(data, bytes)
+    with atomic_open(file_path, binary=binary, encoding=encoding, fsync=fsync, mode=mode) as f:
+        f.write(data)
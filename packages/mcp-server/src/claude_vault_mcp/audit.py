@@ -0,0 +1,783 @@
+"""
+Process-wide buffered audit sink writing rotated JSON Lines segments.
+
+AuditLogger used to open the audit file, append one free-text line and close
+it on every event, at repo root, forever. Events now go into a bounded
+in-memory queue that a background thread drains into a segmented JSONL log:
+
+- Group commit: everything queued since the last write goes out in one
+  write() call on a file that stays open.
+- fsync cadence: VAULT_AUDIT_FSYNC is "always" (fsync after every group),
+  "never" (leave it to the OS), or a number of seconds between fsyncs
+  (default 1).
+- Back-pressure: when the queue is full, log() blocks until the writer
+  catches up, so events are never dropped.
+- Rotation: the active segment is rotated once it exceeds
+  VAULT_AUDIT_MAX_BYTES or VAULT_AUDIT_MAX_AGE seconds, compressed (zstd
+  when the `zstandard` package is installed, else gzip) and recorded in
+  manifest.json with its time range. Only VAULT_AUDIT_RETAIN segments are
+  kept, so disk usage is bounded.
+- Range reads: read_entries() opens only the segments whose time range
+  overlaps the query.
+- Index: each group is also inserted into a SQLite index (audit_index.py)
+  that backs the vault_audit_query tool.
+- Tamper evidence: entries are hash-chained and periodically covered by
+  signed checkpoints (audit_chain.py).
+- Shutdown: pending events are written and synced at interpreter exit.
+- Several processes: each MCP server has its own sink, so every group is
+  written under an exclusive flock on audit.lock. While holding it a writer
+  reopens the active segment if another process rotated it (inode changed,
+  like logging's WatchedFileHandler), catches up on entries appended by
+  others and resumes the hash chain from disk before sealing its group.
+
+Layout (default directory ~/.claude-vault/audit, or VAULT_AUDIT_LOG):
+    audit.jsonl                        active segment
+    audit-20250101T000000Z-0001.jsonl.gz  rotated segments
+    manifest.json                      rotated segment index
+    index.sqlite3                      query index (VAULT_AUDIT_INDEX=false disables)
+    checkpoints.jsonl                  signed chain checkpoints
+    verify-state.json                  last checkpoint verified by AuditVerifier
+    audit.lock                         writer lock shared by all processes
+"""
+
+import atexit
+import gzip
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional
+
+from .atomic_io import atomic_open, atomic_write
+from .audit_chain import DEFAULT_CHECKPOINT_EVERY, ENCODER, AuditChain
+from .audit_index import AuditIndex, index_enabled, index_path_for
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Default audit directory and active segment name
+AUDIT_DIR = Path.home() / ".claude-vault" / "audit"
+ACTIVE_FILE = "audit.jsonl"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "audit.lock"
+
+# Default queue bound (events); log() blocks when this many are pending
+MAX_QUEUE = 10000
+
+# Most events written in one group commit
+MAX_GROUP = 1000
+
+# How often flush() checks that the writer thread is still alive (seconds)
+FLUSH_POLL_INTERVAL = 1.0
+
+# Defaults for fsync cadence and rotation
+DEFAULT_FSYNC_INTERVAL = 1.0
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 3600
+DEFAULT_RETAIN = 30
+
+_STOP = object()
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    """Read a non-negative number from the environment."""
+    setting = os.getenv(name)
+    if setting is None:
+        return default
+    try:
+        return max(0.0, float(setting))
+    except ValueError:
+        print(f"Warning: Invalid {name}={setting!r}, using {default}", file=sys.stderr)
+        return default
+
+
+def fsync_interval_from_env() -> Optional[float]:
+    """
+    Read the fsync cadence from VAULT_AUDIT_FSYNC.
+
+    Returns:
+        0.0 for "always", None for "never", else seconds between fsyncs
+    """
+    setting = os.getenv("VAULT_AUDIT_FSYNC", "").strip().lower()
+    if setting == "always":
+        return 0.0
+    if setting in ("never", "off", "false"):
+        return None
+    return _env_float("VAULT_AUDIT_FSYNC", DEFAULT_FSYNC_INTERVAL)
+
+
+def default_audit_path() -> Path:
+    """Active segment path: VAULT_AUDIT_LOG directory, else ~/.claude-vault/audit."""
+    directory = os.getenv("VAULT_AUDIT_LOG")
+    return (Path(directory).expanduser() if directory else AUDIT_DIR) / ACTIVE_FILE
+
+
+def utc_timestamp(when: Optional[float] = None) -> str:
+    """ISO-8601 UTC timestamp with milliseconds (sorts lexicographically)."""
+    moment = datetime.fromtimestamp(time.time() if when is None else when, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _parse_timestamp(ts: str) -> float:
+    """Inverse of utc_timestamp()."""
+    moment = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%fZ")
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+class SegmentedLog:
+    """
+    Rotating JSONL log: one active segment plus compressed, manifest-indexed
+    rotated segments. Not thread-safe; owned by one AuditSink writer. Writers
+    in other processes are serialized with a lock file (see module docstring).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: Optional[float] = DEFAULT_MAX_AGE,
+        retain: int = DEFAULT_RETAIN,
+        compression: Optional[str] = None,
+        chain: Optional[AuditChain] = None,
+    ):
+        """
+        Initialize log (the active segment is opened lazily).
+
+        Args:
+            path: Active segment path; rotated segments and the manifest
+                live in the same directory
+            max_bytes: Rotate once the active segment reaches this size
+            max_age: Rotate once the active segment's first entry is this
+                many seconds old (None = no age limit)
+            retain: Number of rotated segments to keep
+            compression: "zstd", "gzip" or "none" (default: zstd if
+                available, else gzip)
+            chain: Hash chain that stamps entries (default: none)
+        """
+        self.path = Path(path)
+        self.directory = self.path.parent
+        self.manifest_path = self.directory / MANIFEST_FILE
+        self.lock_path = self.directory / LOCK_FILE
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retain = retain
+        self.compression = compression or ("zstd" if zstandard is not None else "gzip")
+        if self.compression == "zstd" and zstandard is None:
+            self.compression = "gzip"
+
+        self._file: Optional[IO[str]] = None
+        self._size = 0
+        self._start: Optional[str] = None
+        self._end: Optional[str] = None
+        self._entries = 0
+        self._first_seq: Optional[int] = None
+        self._last_entry: Optional[dict] = None
+
+        self.chain = chain
+
+        # Start of the oldest retained segment after retention dropped some
+        self.pruned_before: Optional[str] = None
+
+    # -- active segment ------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive lock shared by every process writing this log."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _open(self) -> None:
+        """Open the active segment, recovering its range and the chain head from disk."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+        self._start = self._end = None
+        self._entries = 0
+        self._first_seq = None
+        self._last_entry = None
+        self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Account for entries appended to the active segment since _size."""
+        with open(self.path, "rb") as f:
+            f.seek(self._size)
+            data = f.read()
+        self._size += len(data)
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            entry = _parse_entry(line)
+            if entry is None:
+                continue
+            self._start = self._start or entry["ts"]
+            self._end = entry["ts"]
+            self._entries += 1
+            if self._first_seq is None:
+                self._first_seq = entry.get("seq")
+            self._last_entry = entry
+
+        if self.chain is not None:
+            self._resume_chain()
+
+    def _refresh(self) -> None:
+        """
+        Bring the open segment up to date with other writers (lock held).
+
+        Reopens the segment if it was rotated away (missing, new inode or
+        truncated), otherwise reads only what others appended.
+        """
+        if self._file is not None:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                st = None
+            if (
+                st is None
+                or st.st_ino != os.fstat(self._file.fileno()).st_ino
+                or st.st_size < self._size
+            ):
+                self._file.close()
+                self._file = None
+            elif st.st_size > self._size:
+                self._catch_up()
+                return
+            else:
+                return
+        self._open()
+
+    def _resume_chain(self) -> None:
+        """Continue the hash chain from the newest entry on disk."""
+        last = self._last_entry
+        if last is None or "hash" not in last:
+            segments = self.load_manifest()["segments"]
+            last = segments[-1] if segments else None
+            if last is not None and "last_hash" in last:
+                self.chain.resume(last["last_seq"], last["last_hash"])
+            return
+        self.chain.resume(last["seq"], last["hash"])
+
+    def append(self, records: List[dict]) -> None:
+        """Serialize and append a group of records with one write call."""
+        with self._locked():
+            self._refresh()
+            if self._rotation_due(records[0]["ts"]):
+                self._rotate()
+                self._open()
+
+            if self.chain is not None:
+                lines = self.chain.seal(records)
+                if self._first_seq is None:
+                    self._first_seq = records[0]["seq"]
+            else:
+                lines = [ENCODER.encode(r) for r in records]
+
+            data = "\n".join(lines) + "\n"
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data.encode("utf-8"))
+            self._start = self._start or records[0]["ts"]
+            self._end = records[-1]["ts"]
+            self._entries += len(records)
+            self._last_entry = records[-1]
+
+            if self.chain is not None and self.chain.checkpoint_due():
+                self.chain.checkpoint(self._end)
+            if self._rotation_due(self._end):
+                self._rotate()
+
+    def fileno(self) -> Optional[int]:
+        """Descriptor of the open active segment, if any."""
+        return self._file.fileno() if self._file is not None else None
+
+    def close(self) -> None:
+        """Close the active segment (reopened on the next append)."""
+        if self._file is not None:
+            with self._locked():
+                self._refresh()
+                self._close_file(checkpoint=True)
+
+    def _close_file(self, checkpoint: bool) -> None:
+        """Close the active segment, optionally checkpointing the chain head."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if checkpoint and self.chain is not None and self._end is not None:
+                self.chain.checkpoint(self._end)
+
+    def _rotation_due(self, now_ts: str) -> bool:
+        if not self._entries:
+            return False
+        if self._size >= self.max_bytes:
+            return True
+        if self.max_age is not None and self._start is not None:
+            return _parse_timestamp(now_ts) - _parse_timestamp(self._start) >= self.max_age
+        return False
+
+    # -- rotation ------------------------------------------------------------
+
+    def rotate(self) -> Optional[dict]:
+        """
+        Seal the active segment: compress it, index it, apply retention.
+
+        Returns:
+            Manifest entry for the new segment, or None if nothing to rotate
+        """
+        with self._locked():
+            self._refresh()
+            return self._rotate()
+
+    def _rotate(self) -> Optional[dict]:
+        """rotate() with the lock held and the segment state refreshed."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._close_file(checkpoint=True)
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        if st.st_size == 0:
+            return None
+
+        # A segment without a parseable entry (a torn first line after a
+        # crash) is dated by its modification time
+        start = self._start or utc_timestamp(st.st_mtime)
+        end = self._end or start
+        manifest = self.load_manifest()
+        stamp = start.replace("-", "").replace(":", "").split(".")[0] + "Z"
+        seq = manifest.get("next_seq", 1)
+        manifest["next_seq"] = seq + 1
+        suffix = {"zstd": ".zst", "gzip": ".gz"}.get(self.compression, "")
+        name = f"audit-{stamp}-{seq:04d}.jsonl{suffix}"
+        raw_bytes = st.st_size
+
+        sealed = self.directory / name
+        with open(self.path, "rb") as src, atomic_open(sealed, binary=True, fsync=True) as dst:
+            if self.compression == "zstd":
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+            elif self.compression == "gzip":
+                with gzip.GzipFile(fileobj=dst, mode="wb", mtime=0) as gz:
+                    while chunk := src.read(1024 * 1024):
+                        gz.write(chunk)
+            else:
+                while chunk := src.read(1024 * 1024):
+                    dst.write(chunk)
+
+        entry = {
+            "file": name,
+            "start": start,
+            "end": end,
+            "entries": self._entries,
+            "bytes": sealed.stat().st_size,
+            "raw_bytes": raw_bytes,
+            "compression": self.compression,
+        }
+        if self._last_entry is not None and "hash" in self._last_entry:
+            entry["first_seq"] = self._first_seq
+            entry["last_seq"] = self._last_entry["seq"]
+            entry["last_hash"] = self._last_entry["hash"]
+        manifest["segments"].append(entry)
+
+        # Retention: drop the oldest sealed segments
+        while len(manifest["segments"]) > self.retain:
+            dropped = manifest["segments"].pop(0)
+            (self.directory / dropped["file"]).unlink(missing_ok=True)
+            self.pruned_before = manifest["segments"][0]["start"]
+
+        self._save_manifest(manifest)
+        self.path.unlink()
+        self._size = 0
+        self._start = self._end = None
+        self._entries = 0
+        self._first_seq = None
+        self._last_entry = None
+        return entry
+
+    def load_manifest(self) -> dict:
+        """Read manifest.json (empty manifest if missing or unreadable)."""
+        return load_manifest(self.directory)
+
+    def _save_manifest(self, manifest: dict) -> None:
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2), fsync=True)
+
+
+def _parse_entry(line: str) -> Optional[dict]:
+    """Decode a JSONL entry, or None for a torn/invalid line."""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) and "ts" in entry else None
+
+
+def load_manifest(directory: Path) -> dict:
+    """Read a segment manifest (empty manifest if missing or unreadable)."""
+    try:
+        with open(Path(directory) / MANIFEST_FILE, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("segments"), list):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": 1, "next_seq": 1, "segments": []}
+
+
+def _open_segment(path: Path) -> IO[str]:
+    """Open a (possibly compressed) segment for text reading."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise OSError(f"zstandard is required to read {path.name}")
+        raw = open(path, "rb")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def read_entries(
+    path: Optional[Path] = None, start: Optional[str] = None, end: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Iterate audit entries in time order, optionally within [start, end].
+
+    Only segments whose manifest time range overlaps the query are opened.
+
+    Args:
+        path: Active segment path (default: default_audit_path())
+        start: Earliest timestamp (ISO-8601 UTC, inclusive), or None
+        end: Latest timestamp (ISO-8601 UTC, inclusive), or None
+
+    Yields:
+        Entry dicts
+    """
+    active = Path(path) if path else default_audit_path()
+    manifest = load_manifest(active.parent)
+
+    files = [
+        active.parent / seg["file"]
+        for seg in manifest["segments"]
+        if (start is None or seg["end"] >= start) and (end is None or seg["start"] <= end)
+    ]
+    files.append(active)
+
+    for file in files:
+        for entry in iter_segment(file):
+            ts = entry.get("ts", "")
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts > end:
+                continue
+            yield entry
+
+
+def iter_segment(path: Path) -> Iterator[dict]:
+    """
+    Iterate the entries of one (possibly compressed) segment.
+
+    Missing files yield nothing; a torn final line after a crash is skipped.
+    """
+    try:
+        f = _open_segment(path)
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        print(f"Warning: Skipping audit segment: {e}", file=sys.stderr)
+        return
+    with f:
+        for line in f:
+            entry = _parse_entry(line)
+            if entry is not None:
+                yield entry
+
+
+class AuditSink:
+    """
+    Background writer for one audit log.
+
+    Example:
+        sink = AuditSink(Path("~/.claude-vault/audit/audit.jsonl").expanduser())
+        sink.write({"ts": utc_timestamp(), "action": "SUCCESS", "service": "app"})
+        sink.flush()
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_queue: int = MAX_QUEUE,
+        fsync_interval: Optional[float] = DEFAULT_FSYNC_INTERVAL,
+        log: Optional[SegmentedLog] = None,
+        index: Optional[AuditIndex] = None,
+    ):
+        """
+        Initialize sink (the writer thread starts with the first event).
+
+        Args:
+            path: Active segment path
+            max_queue: Maximum number of pending events before write() blocks
+            fsync_interval: Seconds between fsyncs; 0 = after every group,
+                None = never
+            log: Segmented log to write to (default: SegmentedLog(path))
+            index: Query index fed with every group (default: none)
+        """
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.log = log or SegmentedLog(self.path)
+        self.index = index
+        self.groups_written = 0
+        self.events_written = 0
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        """
+        Start the writer thread on first use.
+
+        Deferred so that importing the tools (e.g. in scan worker processes)
+        does not start threads.
+        """
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(
+                    target=self._run, name=f"audit-writer:{self.path.parent.name}", daemon=True
+                )
+                thread.start()
+                self._thread = thread
+
+    def write(self, record: dict) -> None:
+        """
+        Queue one audit record (blocks while the queue is full).
+
+        Args:
+            record: Entry dict with at least a "ts" key (see utc_timestamp())
+        """
+        if self._closed:
+            # Late events after shutdown are written synchronously
+            self._write_group([record])
+            self._sync()
+            return
+        self._ensure_started()
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Block until every queued event is written and synced."""
+        if self._closed:
+            return
+        self._ensure_started()
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(FLUSH_POLL_INTERVAL):
+            if not self._thread.is_alive():
+                print("Warning: Audit writer thread stopped; entries may be lost", file=sys.stderr)
+                return
+
+    def close(self) -> None:
+        """Flush pending events and stop the writer thread."""
+        if self._closed:
+            return
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._closed = True
+
+    def _init_index(self) -> None:
+        """Populate an empty index from the log (first run, or index deleted)."""
+        if self.index is None:
+            return
+        try:
+            has_log = self.path.exists() or bool(self.log.load_manifest()["segments"])
+            if has_log and self.index.count() == 0:
+                self.index.rebuild(read_entries(self.path))
+        except Exception as e:
+            print(f"Warning: Could not rebuild audit index: {e}", file=sys.stderr)
+
+    def _run(self) -> None:
+        """Writer loop: drain the queue in groups until stopped."""
+        self._init_index()
+        while True:
+            timeout = None
+            if self._dirty and self.fsync_interval:
+                timeout = max(0.0, self._last_fsync + self.fsync_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._guarded(self._sync)
+                continue
+
+            group: List[dict] = []
+            waiters: List[threading.Event] = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    group.append(item)
+                if stop or len(group) >= MAX_GROUP:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                if group:
+                    self._write_group(group)
+                if waiters or stop or self._fsync_due():
+                    self._sync()
+            except Exception as e:
+                # Keep the thread alive: flush() and write() depend on it
+                print(f"Warning: Audit writer error: {e}", file=sys.stderr)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+            if stop:
+                self._guarded(self.log.close)
+                if self.index is not None:
+                    self._guarded(self.index.close)
+                return
+
+    @staticmethod
+    def _guarded(step) -> None:
+        """Run a writer-thread step, reporting instead of raising errors."""
+        try:
+            step()
+        except Exception as e:
+            print(f"Warning: Audit writer error: {e}", file=sys.stderr)
+
+    def _fsync_due(self) -> bool:
+        """Check whether the fsync cadence requires a sync now."""
+        if not self._dirty or self.fsync_interval is None:
+            return False
+        return time.monotonic() - self._last_fsync >= self.fsync_interval
+
+    def _write_group(self, records: List[dict]) -> None:
+        """Append a group of records to the segmented log."""
+        try:
+            self.log.append(records)
+            self._dirty = True
+            self.groups_written += 1
+            self.events_written += len(records)
+        except Exception as e:
+            print(f"Warning: Could not write to audit log: {e}", file=sys.stderr)
+            self._guarded(self.log.close)
+            return
+
+        if self.index is None:
+            return
+        try:
+            self.index.add(records)
+            if self.log.pruned_before is not None:
+                self.index.prune(self.log.pruned_before)
+                self.log.pruned_before = None
+        except Exception as e:
+            print(f"Warning: Could not update audit index: {e}", file=sys.stderr)
+
+    def _sync(self) -> None:
+        """fsync the active segment if anything was written since the last sync."""
+        if not self._dirty:
+            return
+        fd = self.log.fileno()
+        if fd is not None and self.fsync_interval is not None:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                print(f"Warning: Could not sync audit log: {e}", file=sys.stderr)
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+
+# Process-wide sinks, one per log
+_sinks: Dict[Path, AuditSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_audit_sink(path: Optional[Path] = None) -> AuditSink:
+    """
+    Get or create the process-wide sink for an audit log.
+
+    Rotation settings come from VAULT_AUDIT_MAX_BYTES, VAULT_AUDIT_MAX_AGE
+    (seconds), VAULT_AUDIT_RETAIN and VAULT_AUDIT_COMPRESSION; checkpoint
+    cadence from VAULT_AUDIT_CHECKPOINT_EVERY.
+
+    Args:
+        path: Active segment path (default: default_audit_path())
+
+    Returns:
+        AuditSink shared by every AuditLogger writing to that log
+    """
+    key = Path(os.path.abspath(path or default_audit_path()))
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            try:
+                every = int(_env_float("VAULT_AUDIT_CHECKPOINT_EVERY", DEFAULT_CHECKPOINT_EVERY))
+                chain = AuditChain(key.parent, checkpoint_every=every)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Audit hash chain disabled: {e}", file=sys.stderr)
+                chain = None
+            log = SegmentedLog(
+                key,
+                max_bytes=int(_env_float("VAULT_AUDIT_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                max_age=_env_float("VAULT_AUDIT_MAX_AGE", DEFAULT_MAX_AGE) or None,
+                retain=max(1, int(_env_float("VAULT_AUDIT_RETAIN", DEFAULT_RETAIN))),
+                compression=os.getenv("VAULT_AUDIT_COMPRESSION") or None,
+                chain=chain,
+            )
+            index = AuditIndex(index_path_for(key)) if index_enabled() else None
+            sink = AuditSink(key, fsync_interval=fsync_interval_from_env(), log=log, index=index)
+            _sinks[key] = sink
+        return sink
+
+
+def get_audit_index(path: Optional[Path] = None) -> Optional[AuditIndex]:
+    """
+    Get the query index for an audit log, with every pending event indexed.
+
+    Args:
+        path: Active segment path (default: default_audit_path())
+
+    Returns:
+        AuditIndex, or None when indexing is disabled
+    """
+    sink = get_audit_sink(path)
+    sink.flush()
+    return sink.index
+
+
+def flush_audit_sinks() -> None:
+    """Write and sync every pending audit event in this process."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.flush()
+
+
+@atexit.register
+def _close_audit_sinks() -> None:
+    """Drain all sinks at interpreter exit."""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+    for sink in sinks:
+        sink.close()
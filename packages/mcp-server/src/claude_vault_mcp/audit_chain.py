@@ -0,0 +1,446 @@
+"""
+Tamper evidence for the audit log: hash chain, signed checkpoints and an
+incremental verifier.
+
+Every entry carries `seq`, `prev` (the previous entry's hash) and `hash`:
+
+    hash = SHA-256(prev || compact JSON of the entry without "hash")
+
+The JSON is the line as written (key order preserved, hash appended last), so
+sealing costs one serialization per entry and verifiers re-encode the parsed
+entry to the same bytes. Changing, removing or reordering any entry breaks every later link. Every
+VAULT_AUDIT_CHECKPOINT_EVERY entries (default 1000), and whenever a segment
+is rotated, the writer appends a checkpoint {seq, hash, ts} signed with an
+Ed25519 key to checkpoints.jsonl. The signing key lives outside the audit
+directory (~/.claude-vault/audit-signing.key, 0600), so rewriting the log
+and its checkpoints together is not enough to hide tampering.
+
+AuditVerifier remembers the last checkpoint it verified (verify-state.json)
+and on the next run only re-hashes entries after it, skipping whole sealed
+segments via the manifest, so a check costs time proportional to new
+activity rather than total log size.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+
+from .atomic_io import atomic_write
+
+# prev of the very first entry
+GENESIS_HASH = "0" * 64
+
+CHECKPOINT_FILE = "checkpoints.jsonl"
+VERIFY_STATE_FILE = "verify-state.json"
+SIGNING_KEY_FILE = "audit-signing.key"
+
+DEFAULT_CHECKPOINT_EVERY = 1000
+
+# Chain fields at the end of a written line (details cannot fake this: quotes
+# inside strings are escaped)
+_CHAIN_TAIL = re.compile(r',"seq":(\d+),"prev":"[0-9a-f]{64}","hash":"[0-9a-f]{64}"\}\n?')
+
+
+# Audit line encoding (reused: json.dumps() builds a new encoder per call)
+ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _digest(prev: str, body: str) -> str:
+    return hashlib.sha256(prev.encode("ascii") + body.encode("utf-8")).hexdigest()
+
+
+def entry_hash(record: dict) -> str:
+    """Chain hash of an entry (its "prev" field included, "hash" excluded)."""
+    if "hash" in record:
+        record = {k: v for k, v in record.items() if k != "hash"}
+    return _digest(record["prev"], ENCODER.encode(record))
+
+
+def _checkpoint_message(seq: int, digest: str, ts: str) -> bytes:
+    return f"claude-vault-audit-checkpoint:{seq}:{digest}:{ts}".encode("ascii")
+
+
+class CheckpointSigner:
+    """
+    Ed25519 key used to sign chain checkpoints.
+
+    The key is loaded, or generated and stored raw (32 bytes, mode 0600), on
+    first use, so constructing a signer never touches the filesystem.
+    """
+
+    def __init__(self, key_path: Optional[Path] = None):
+        """
+        Initialize signer.
+
+        Args:
+            key_path: Private key file (default: ~/.claude-vault/audit-signing.key)
+        """
+        self.key_path = (
+            Path(key_path) if key_path else Path.home() / ".claude-vault" / SIGNING_KEY_FILE
+        )
+        self._private_key: Optional[Ed25519PrivateKey] = None
+
+    @property
+    def _key(self) -> Ed25519PrivateKey:
+        if self._private_key is None:
+            if not self.key_path.exists():
+                self._create_key()
+            self._private_key = Ed25519PrivateKey.from_private_bytes(self.key_path.read_bytes())
+        return self._private_key
+
+    def _create_key(self) -> None:
+        """
+        Generate a key and publish it with link(), so that processes starting
+        at the same time agree on one complete key (the first link wins).
+        """
+        self.key_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.key_path.with_name(f".{self.key_path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(Ed25519PrivateKey.generate().private_bytes_raw())
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp, self.key_path)
+        except FileExistsError:
+            pass  # Another process created it first
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    @property
+    def public_key(self) -> Ed25519PublicKey:
+        """Public half, for verification."""
+        return self._key.public_key()
+
+    def sign(self, seq: int, digest: str, ts: str) -> str:
+        """Sign a checkpoint; returns the hex signature."""
+        return self._key.sign(_checkpoint_message(seq, digest, ts)).hex()
+
+
+class AuditChain:
+    """
+    Writer-side chain state: stamps entries and emits checkpoints.
+
+    Not thread-safe; owned by the audit sink's writer thread, and only used
+    under the log's writer lock.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        signer: Optional[CheckpointSigner] = None,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+    ):
+        """
+        Initialize chain.
+
+        Args:
+            directory: Audit directory (checkpoints.jsonl is written there)
+            signer: Checkpoint signer (default: CheckpointSigner(); its key
+                is only read or generated by the first checkpoint)
+            checkpoint_every: Entries between checkpoints
+        """
+        self.checkpoint_path = Path(directory) / CHECKPOINT_FILE
+        self.signer = signer or CheckpointSigner()
+        self._signing_disabled = False
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.seq = 0
+        self.last_hash = GENESIS_HASH
+        self._last_checkpoint_seq = 0
+
+    def resume(self, seq: int, last_hash: str) -> None:
+        """
+        Continue the chain from the head on disk (after a restart, or after
+        another process appended entries).
+        """
+        if self._last_checkpoint_seq == 0 or self._last_checkpoint_seq > seq:
+            self._last_checkpoint_seq = seq
+        self.seq = seq
+        self.last_hash = last_hash
+
+    def seal(self, records: List[dict]) -> List[str]:
+        """
+        Add seq/prev/hash to records, in order (mutates them).
+
+        Returns:
+            The serialized lines (without newline), hash field last
+        """
+        lines = []
+        for record in records:
+            self.seq += 1
+            record.pop("hash", None)
+            record["seq"] = self.seq
+            record["prev"] = self.last_hash
+            body = ENCODER.encode(record)
+            record["hash"] = digest = _digest(self.last_hash, body)
+            lines.append(f'{body[:-1]},"hash":"{digest}"}}')
+            self.last_hash = digest
+        return lines
+
+    def checkpoint_due(self) -> bool:
+        """Check whether enough entries were sealed since the last checkpoint."""
+        if self._signing_disabled:
+            return False
+        return self.seq - self._last_checkpoint_seq >= self.checkpoint_every
+
+    def checkpoint(self, ts: str) -> Optional[dict]:
+        """
+        Append a signed checkpoint for the current chain head.
+
+        Returns:
+            The checkpoint, or None if nothing was sealed since the last one
+            or the signing key is unusable
+        """
+        if self._signing_disabled or self.seq == self._last_checkpoint_seq:
+            return None
+        try:
+            sig = self.signer.sign(self.seq, self.last_hash, ts)
+        except (OSError, ValueError) as e:
+            # Entries stay chained; only the signed checkpoints are lost
+            print(f"Warning: Audit checkpoints disabled: {e}", file=sys.stderr)
+            self._signing_disabled = True
+            return None
+        checkpoint = {"seq": self.seq, "hash": self.last_hash, "ts": ts, "sig": sig}
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(checkpoint, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._last_checkpoint_seq = self.seq
+        return checkpoint
+
+
+def load_checkpoints(directory: Path) -> List[dict]:
+    """Read checkpoints.jsonl (ignoring a torn final line), ordered by seq."""
+    checkpoints = []
+    try:
+        with open(Path(directory) / CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    checkpoints.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return sorted(checkpoints, key=lambda c: c.get("seq", 0))
+
+
+@dataclass
+class VerificationResult:
+    """Outcome of one verification run."""
+
+    ok: bool
+    entries_checked: int = 0
+    checkpoints_checked: int = 0
+    start_seq: int = 0  # Last seq trusted before this run
+    last_seq: int = 0  # Last entry seq seen
+    verified_seq: int = 0  # Checkpoint the next run will start from
+    errors: List[str] = field(default_factory=list)
+
+
+class AuditVerifier:
+    """
+    Incremental verifier for a hash-chained audit log.
+
+    Example:
+        result = AuditVerifier(Path("~/.claude-vault/audit/audit.jsonl").expanduser()).verify()
+        if not result.ok:
+            print(result.errors)
+    """
+
+    def __init__(self, log_path: Path, public_key: Optional[Ed25519PublicKey] = None):
+        """
+        Initialize verifier.
+
+        Args:
+            log_path: Active audit segment path
+            public_key: Checkpoint verification key (default: derived from
+                the local signing key)
+        """
+        self.log_path = Path(log_path)
+        self.directory = self.log_path.parent
+        self.state_path = self.directory / VERIFY_STATE_FILE
+        self.public_key = public_key or CheckpointSigner().public_key
+        self._head = 0
+        self._offsets: Dict[int, Tuple[Optional[int], int]] = {}
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            int(state["seq"]), state["hash"]
+            return state
+        except (OSError, ValueError, KeyError, TypeError):
+            return {"seq": 0, "hash": None}
+
+    def _save_state(self, state: dict) -> None:
+        atomic_write(self.state_path, json.dumps(state))
+
+    @staticmethod
+    def _line_seq(line: str) -> Optional[int]:
+        """Seq of a chained line, read from its tail without JSON parsing."""
+        tail = _CHAIN_TAIL.fullmatch(line, max(0, line.rfind(',"seq":')))
+        return int(tail.group(1)) if tail is not None else None
+
+    def _parse_after(self, line: str, seq: int) -> Optional[dict]:
+        """Parse a line unless it is a chained entry at or before seq."""
+        line_seq = self._line_seq(line)
+        if line_seq is not None:
+            self._head = max(self._head, line_seq)
+            if line_seq <= seq:
+                return None
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None  # Torn final line
+        if isinstance(entry, dict) and entry.get("seq", 0) > seq:
+            return entry
+        return None
+
+    def _entries_after(self, state: dict, marks: Set[int]) -> Iterator[dict]:
+        """
+        Entries with seq > state["seq"].
+
+        Sealed segments at or before it are skipped via the manifest; in the
+        active segment, reading resumes at the saved byte offset if the
+        segment has not rotated since. Byte offsets just past entries whose
+        seq is in marks are recorded in self._offsets.
+        """
+        from .audit import _open_segment, load_manifest
+
+        seq = state["seq"]
+        # Highest seq present in the log, including skipped segments
+        self._head = 0
+        self._offsets = {}
+
+        for segment in load_manifest(self.directory)["segments"]:
+            self._head = max(self._head, segment.get("last_seq", 0))
+            if segment.get("last_seq", float("inf")) <= seq:
+                continue
+            try:
+                f = _open_segment(self.directory / segment["file"])
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    entry = self._parse_after(line, seq)
+                    if entry is not None:
+                        yield entry
+
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            first_line = f.readline().decode("utf-8", "replace")
+            first_seq = self._line_seq(first_line)
+            offset = state.get("offset")
+            if (
+                first_seq is not None
+                and first_seq == state.get("active_first_seq")
+                and offset is not None
+                and offset <= os.fstat(f.fileno()).st_size
+            ):
+                self._head = max(self._head, seq)
+                f.seek(offset)
+            else:
+                f.seek(0)
+            position = f.tell()
+            for raw in f:
+                position += len(raw)
+                entry = self._parse_after(raw.decode("utf-8", "replace"), seq)
+                if entry is None:
+                    continue
+                if entry.get("seq") in marks:
+                    self._offsets[entry["seq"]] = (first_seq, position)
+                yield entry
+
+    def verify(self, full: bool = False) -> VerificationResult:
+        """
+        Verify entries written since the last verified checkpoint.
+
+        Args:
+            full: Ignore saved state and re-verify every retained entry
+
+        Returns:
+            VerificationResult (state advances only when ok)
+        """
+        state = {"seq": 0, "hash": None} if full else self._load_state()
+        start_seq, start_hash = state["seq"], state["hash"]
+        result = VerificationResult(ok=True, start_seq=start_seq, verified_seq=start_seq)
+
+        checkpoints: Dict[int, dict] = {}
+        for cp in load_checkpoints(self.directory):
+            if cp.get("seq", 0) <= start_seq:
+                continue
+            try:
+                self.public_key.verify(
+                    bytes.fromhex(cp["sig"]), _checkpoint_message(cp["seq"], cp["hash"], cp["ts"])
+                )
+            except (InvalidSignature, KeyError, ValueError):
+                result.errors.append(f"Checkpoint at seq {cp.get('seq')} has an invalid signature")
+                continue
+            checkpoints[cp["seq"]] = cp
+
+        expected_seq = start_seq + 1
+        running = start_hash
+        verified: Optional[Tuple[int, str]] = None
+
+        for entry in self._entries_after(state, set(checkpoints)):
+            seq = entry.get("seq")
+            if "hash" not in entry or seq is None:
+                continue  # Written before chaining was enabled
+            if running is None:
+                # Full run: anchor at the oldest retained entry
+                running, expected_seq = entry.get("prev"), seq
+                if seq == 1 and running != GENESIS_HASH:
+                    result.errors.append("First entry does not start the chain")
+            if seq != expected_seq:
+                result.errors.append(f"Missing entries: expected seq {expected_seq}, found {seq}")
+            if entry.get("prev") != running:
+                result.errors.append(f"Broken link at seq {seq}")
+            if entry_hash(entry) != entry["hash"]:
+                result.errors.append(f"Entry seq {seq} was modified")
+
+            running = entry["hash"]
+            expected_seq = seq + 1
+            result.entries_checked += 1
+            result.last_seq = seq
+
+            checkpoint = checkpoints.get(seq)
+            if checkpoint is not None:
+                result.checkpoints_checked += 1
+                if checkpoint["hash"] != running:
+                    result.errors.append(f"Chain does not match checkpoint at seq {seq}")
+                elif not result.errors:
+                    verified = (seq, running)
+
+            if len(result.errors) >= 20:
+                break
+
+        head = max(self._head, result.last_seq)
+        covered = max(max(checkpoints, default=0), start_seq)
+        if covered > head:
+            result.errors.append(
+                f"Log ends at seq {head} but seq {covered} was checkpointed (truncated)"
+            )
+
+        result.ok = not result.errors
+        if result.ok and verified is not None:
+            seq, digest = verified
+            new_state = {"seq": seq, "hash": digest}
+            if seq in self._offsets:
+                new_state["active_first_seq"], new_state["offset"] = self._offsets[seq]
+            self._save_state(new_state)
+            result.verified_seq = seq
+        return result
@@ -0,0 +1,274 @@
+"""
+SQLite index over the JSONL audit log.
+
+The audit sink's writer thread feeds every group of entries into this index
+in one transaction, next to the log itself (audit/index.sqlite3). WAL mode
+lets `vault_audit_query` read while the writer appends. Indexes on
+timestamp, (service, timestamp) and (action, timestamp) keep filtered,
+paginated queries and counts in the millisecond range over hundreds of
+thousands of events.
+
+The log stays the source of truth: if the index is missing or was disabled,
+rebuild() repopulates it from the segments, and rows older than the oldest
+retained segment are pruned after rotation.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_FILE = "index.sqlite3"
+
+# Refresh planner statistics after this many inserted rows
+OPTIMIZE_EVERY = 10000
+
+# Columns that can be filtered on and grouped by. Queries are assembled only
+# from the fixed SQL fragments below and "?" placeholders, never from input.
+FILTER_COLUMNS = ("service", "action", "user")
+GROUP_BY = {
+    "service": "SELECT service AS grp, COUNT(*) AS n FROM events",
+    "action": "SELECT action AS grp, COUNT(*) AS n FROM events",
+    "user": "SELECT user AS grp, COUNT(*) AS n FROM events",
+    "day": "SELECT substr(ts, 1, 10) AS grp, COUNT(*) AS n FROM events",
+}
+_FILTER_SQL = {"service": "service = ?", "action": "action = ?", "user": "user = ?"}
+_SINCE_SQL = "ts >= ?"
+_UNTIL_SQL = "ts <= ?"
+_CONTAINS_SQL = "details LIKE ? ESCAPE '\\'"
+_COUNT_SQL = "SELECT COUNT(*) FROM events"
+_PAGE_SQL = "SELECT ts, user, action, service, details FROM events"
+_PAGE_ORDER_SQL = " ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?"
+_GROUP_ORDER_SQL = " GROUP BY grp ORDER BY n DESC, grp"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    user TEXT,
+    action TEXT,
+    service TEXT,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_service_ts ON events (service, ts);
+CREATE INDEX IF NOT EXISTS events_action_ts ON events (action, ts);
+"""
+
+
+def index_enabled() -> bool:
+    """Check whether the audit index is enabled (VAULT_AUDIT_INDEX, default on)."""
+    return os.getenv("VAULT_AUDIT_INDEX", "true").lower() not in ("0", "false", "no", "off")
+
+
+class AuditIndex:
+    """
+    Queryable index of audit entries.
+
+    Connections are per thread: the sink's writer thread inserts, tool calls
+    read through their own connection.
+
+    Example:
+        index = AuditIndex(Path("~/.claude-vault/audit/index.sqlite3").expanduser())
+        rows, total = index.query(service="myapp", since="2025-01-01T00:00:00.000Z")
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize index (the database is created on first use).
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self._local = threading.local()
+        self._since_optimize = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def add(self, records: List[dict]) -> None:
+        """Insert a group of audit records in one transaction."""
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (ts, user, action, service, details) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (r["ts"], r.get("user"), r.get("action"), r.get("service"), r.get("details"))
+                    for r in records
+                ],
+            )
+        self._since_optimize += len(records)
+        if self._since_optimize >= OPTIMIZE_EVERY:
+            self.optimize()
+
+    def optimize(self) -> None:
+        """
+        Refresh planner statistics.
+
+        Without them SQLite picks the (service, ts) index for time-range
+        counts grouped by service and scans the whole table.
+        """
+        self._conn().execute("ANALYZE")
+        self._since_optimize = 0
+
+    def prune(self, before: str) -> int:
+        """
+        Delete entries older than a timestamp (after log retention).
+
+        Returns:
+            Number of rows deleted
+        """
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM events WHERE ts < ?", (before,)).rowcount
+
+    def count(self) -> int:
+        """Total number of indexed entries."""
+        return self._conn().execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def rebuild(self, entries: Iterable[dict], batch_size: int = 5000) -> int:
+        """
+        Replace the index contents with entries read from the log.
+
+        Args:
+            entries: Audit entries (e.g. audit.read_entries())
+            batch_size: Rows per insert transaction
+
+        Returns:
+            Number of entries indexed
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM events")
+        total = 0
+        batch: List[dict] = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            self.add(batch)
+            total += len(batch)
+        self.optimize()
+        return total
+
+    @staticmethod
+    def _where(
+        filters: Dict[str, Optional[str]],
+        since: Optional[str],
+        until: Optional[str],
+        contains: Optional[str],
+    ) -> Tuple[str, list]:
+        """Build a WHERE clause (parameterized) from query filters."""
+        clauses: List[str] = []
+        params: list = []
+        for column in FILTER_COLUMNS:
+            value = filters.get(column)
+            if value:
+                clauses.append(_FILTER_SQL[column])
+                params.append(value)
+        if since:
+            clauses.append(_SINCE_SQL)
+            params.append(since)
+        if until:
+            clauses.append(_UNTIL_SQL)
+            params.append(until)
+        if contains:
+            clauses.append(_CONTAINS_SQL)
+            escaped = contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(
+        self,
+        service: Optional[str] = None,
+        action: Optional[str] = None,
+        user: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        contains: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Tuple[List[dict], int]:
+        """
+        Find audit entries, newest first.
+
+        Args:
+            service: Exact service name
+            action: Exact action (SUCCESS, FAILED, ...)
+            user: Exact user/source
+            since: Earliest timestamp (ISO-8601 UTC, inclusive)
+            until: Latest timestamp (ISO-8601 UTC, inclusive)
+            contains: Substring of details
+            limit: Page size
+            offset: Number of matching entries to skip
+
+        Returns:
+            Tuple of (page of entry dicts, total number of matches)
+        """
+        where, params = self._where(
+            {"service": service, "action": action, "user": user}, since, until, contains
+        )
+        conn = self._conn()
+        total = conn.execute("".join((_COUNT_SQL, where)), params).fetchone()[0]
+        rows = conn.execute(
+            "".join((_PAGE_SQL, where, _PAGE_ORDER_SQL)), params + [limit, offset]
+        ).fetchall()
+        page = [
+            {"ts": ts, "user": u, "action": a, "service": s, "details": d}
+            for ts, u, a, s, d in rows
+        ]
+        return page, total
+
+    def counts(
+        self,
+        group_by: str,
+        service: Optional[str] = None,
+        action: Optional[str] = None,
+        user: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Count matching entries per service, action, user or day.
+
+        Returns:
+            List of (group value, count), largest first
+
+        Raises:
+            ValueError: If group_by is not one of GROUP_BY
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+        where, params = self._where(
+            {"service": service, "action": action, "user": user}, since, until, contains
+        )
+        return self._conn().execute(
+            "".join((GROUP_BY[group_by], where, _GROUP_ORDER_SQL)), params
+        ).fetchall()
+
+
+def index_path_for(log_path: Path) -> Path:
+    """Index database location for an active audit segment."""
+    return Path(log_path).parent / INDEX_FILE
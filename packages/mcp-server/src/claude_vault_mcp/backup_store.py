@@ -0,0 +1,464 @@
+"""
+Content-addressed backup store for files replaced by migrations and injection.
+
+Instead of `<name>.backup.<timestamp>` copies next to the original, backups
+live in ~/.claude-vault/backups:
+
+    objects/ab/abcdef....gz   gzip-compressed content, named by its SHA-256
+    index.json                per-path version list, oldest first
+
+Identical content is stored once, and backing up a file whose content equals
+its latest version adds nothing, so repeated migrations only store what
+changed. Retention keeps the newest VAULT_BACKUP_KEEP versions per path
+(default 20) and, with VAULT_BACKUP_MAX_AGE_DAYS set, drops older ones
+(the newest version is always kept); unreferenced objects are deleted.
+
+Versions are referenced as `PATH@DIGEST-PREFIX` (what backup_file() returns)
+or by position, newest first: `PATH@1` is the latest backup.
+
+Command line (`vault-backup`):
+    vault-backup add FILE...
+    vault-backup list
+    vault-backup log FILE
+    vault-backup restore FILE[@VERSION] [--to TARGET]
+    vault-backup prune [--keep N] [--max-age-days D]
+    vault-backup stats
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .atomic_io import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+# Default store location
+BACKUP_DIR = Path.home() / ".claude-vault" / "backups"
+
+# Default retention: versions kept per path (the age limit is off by default)
+DEFAULT_KEEP = 20
+
+# Bumped when the index format changes
+INDEX_VERSION = 1
+
+# Shortest digest prefix accepted in a version reference
+MIN_PREFIX = 4
+
+
+class BackupError(Exception):
+    """Raised for unknown paths/versions and corrupt backups."""
+
+    pass
+
+
+@dataclass
+class BackupVersion:
+    """One stored version of a file."""
+
+    path: str
+    digest: str  # SHA-256 of the content
+    size: int
+    stored_size: int  # Compressed size of the object
+    mode: int
+    created_at: str
+
+    @property
+    def ref(self) -> str:
+        """Reference accepted by restore() and `vault-backup restore`."""
+        return f"{self.path}@{self.digest[:12]}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "digest": self.digest,
+            "size": self.size,
+            "stored_size": self.stored_size,
+            "mode": self.mode,
+            "created_at": self.created_at,
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def split_ref(ref: str) -> Tuple[str, Optional[str]]:
+    """Split `PATH[@VERSION]` into path and version."""
+    path, sep, version = ref.rpartition("@")
+    if not sep or not version or "/" in version:
+        return ref, None
+    return path, version
+
+
+class BackupStore:
+    """
+    Deduplicated, compressed file backups with a per-path version index.
+
+    Example:
+        store = BackupStore()
+        version = store.backup("/workspace/app/.env")
+        store.restore("/workspace/app/.env", version.digest)
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        keep: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+    ):
+        """
+        Initialize store.
+
+        Args:
+            root: Store directory (default: ~/.claude-vault/backups)
+            keep: Versions kept per path (default: VAULT_BACKUP_KEEP or 20; 0 = all)
+            max_age_days: Drop versions older than this (default:
+                VAULT_BACKUP_MAX_AGE_DAYS or 0 = no age limit)
+        """
+        self.root = Path(root) if root else BACKUP_DIR
+        self.keep = _env_int("VAULT_BACKUP_KEEP", DEFAULT_KEEP) if keep is None else keep
+        self.max_age_days = (
+            _env_int("VAULT_BACKUP_MAX_AGE_DAYS", 0) if max_age_days is None else max_age_days
+        )
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        # Parsed index, reused while the file's stat identity is unchanged
+        self._cached: Optional[Tuple[tuple, Dict[str, List[Dict]]]] = None
+        self._changed = False
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, List[Dict]]]:
+        """Load the index under an exclusive lock; save it on exit if _changed was set."""
+        self.root.mkdir(mode=0o700, parents=True, exist_ok=True)
+        with self._lock, open(self.root / "index.lock", "a") as lock_file:
+            if fcntl is not None:
+                # Also excludes other processes (MCP server, vault-backup CLI)
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            paths = self._load()
+            self._changed = False
+            try:
+                yield paths
+            except BaseException:
+                self._cached = None  # May hold unsaved changes
+                raise
+            if self._changed:
+                data = {"version": INDEX_VERSION, "paths": paths}
+                atomic_write(self.index_path, json.dumps(data, indent=2), mode=0o600)
+                self._cached = (self._identity(), paths)
+
+    def _identity(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        """Read the index (empty if missing; cached until another writer replaces it)."""
+        identity = self._identity()
+        if identity is None:
+            return {}
+        if self._cached is not None and self._cached[0] == identity:
+            return self._cached[1]
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise BackupError(f"Corrupt backup index {self.index_path}: {e}") from e
+        if data.get("version") != INDEX_VERSION:
+            raise BackupError(f"Unsupported backup index version: {data.get('version')}")
+        self._cached = (identity, data["paths"])
+        return data["paths"]
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.gz"
+
+    def backup(self, file_path: str) -> BackupVersion:
+        """
+        Store the current content of a file as its newest version.
+
+        Args:
+            file_path: File to back up
+
+        Returns:
+            The stored version (the existing latest one if content is unchanged)
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        path = os.path.abspath(file_path)
+        try:
+            with open(path, "rb") as f:
+                mode = os.fstat(f.fileno()).st_mode & 0o7777
+                data = f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Cannot backup non-existent file: {file_path}") from None
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._locked() as paths:
+            versions = paths.get(path, [])
+            if versions and versions[-1]["digest"] == digest and versions[-1]["mode"] == mode:
+                return BackupVersion(path=path, **versions[-1])
+
+            obj = self._object_path(digest)
+            if obj.exists():
+                stored_size = obj.stat().st_size
+            else:
+                # Content is named by its digest, so the compressed bytes are
+                # deterministic (mtime=0) and a race writes identical objects
+                compressed = gzip.compress(data, compresslevel=6, mtime=0)
+                obj.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                atomic_write(obj, compressed, mode=0o600)
+                stored_size = len(compressed)
+
+            version = BackupVersion(
+                path=path,
+                digest=digest,
+                size=len(data),
+                stored_size=stored_size,
+                mode=mode,
+                created_at=datetime.utcnow().isoformat() + "Z",
+            )
+            paths[path] = versions + [version.to_dict()]
+            self._changed = True
+            self._apply_retention(paths, [path], self.keep, self.max_age_days)
+            return version
+
+    def paths(self) -> List[str]:
+        """Paths with at least one backup."""
+        with self._locked() as paths:
+            return sorted(paths)
+
+    def versions(self, file_path: str) -> List[BackupVersion]:
+        """
+        Versions of a file, newest first.
+
+        Args:
+            file_path: Backed-up file
+
+        Returns:
+            List of versions (empty if never backed up)
+        """
+        path = os.path.abspath(file_path)
+        with self._locked() as paths:
+            return [BackupVersion(path=path, **v) for v in reversed(paths.get(path, []))]
+
+    def resolve(self, file_path: str, version: Optional[str] = None) -> BackupVersion:
+        """
+        Find a version by position (1 = newest), digest prefix, or latest.
+
+        Args:
+            file_path: Backed-up file
+            version: "latest"/None, a position like "2", or a digest prefix
+
+        Returns:
+            Matching version
+
+        Raises:
+            BackupError: If there is no unique match
+        """
+        versions = self.versions(file_path)
+        if not versions:
+            raise BackupError(f"No backups of {file_path}")
+        if version in (None, "", "latest"):
+            return versions[0]
+        if version.isdigit() and len(version) < MIN_PREFIX:
+            position = int(version)
+            if not 1 <= position <= len(versions):
+                raise BackupError(f"{file_path} has {len(versions)} backup(s), not {position}")
+            return versions[position - 1]
+
+        if len(version) < MIN_PREFIX:
+            raise BackupError(f"Digest prefix must be at least {MIN_PREFIX} characters")
+        matches = {v.digest: v for v in versions if v.digest.startswith(version.lower())}
+        if len(matches) != 1:
+            found = "no" if not matches else "several"
+            raise BackupError(f"{found} backups of {file_path} match {version!r}")
+        return next(iter(matches.values()))
+
+    def read(self, version: BackupVersion) -> bytes:
+        """
+        Read and verify a version's content.
+
+        Raises:
+            BackupError: If the object is missing or does not match its digest
+        """
+        try:
+            data = gzip.decompress(self._object_path(version.digest).read_bytes())
+        except (OSError, EOFError) as e:
+            raise BackupError(f"Backup {version.ref} is unreadable: {e}") from e
+        if hashlib.sha256(data).hexdigest() != version.digest:
+            raise BackupError(f"Backup {version.ref} is corrupt (digest mismatch)")
+        return data
+
+    def restore(
+        self, file_path: str, version: Optional[str] = None, target: Optional[str] = None
+    ) -> BackupVersion:
+        """
+        Restore a version (the current file is backed up first).
+
+        Args:
+            file_path: Backed-up file
+            version: See resolve() (default: latest)
+            target: Write here instead of the original path
+
+        Returns:
+            Restored version
+        """
+        chosen = self.resolve(file_path, version)
+        data = self.read(chosen)
+        destination = target or chosen.path
+        if os.path.exists(destination):
+            self.backup(destination)  # Restoring is itself undoable
+        atomic_write(destination, data, mode=chosen.mode)
+        return chosen
+
+    def prune(self, keep: Optional[int] = None, max_age_days: Optional[int] = None) -> Dict:
+        """
+        Apply retention to every path and delete unreferenced objects.
+
+        Args:
+            keep: Versions kept per path (default: the store's policy)
+            max_age_days: Age limit in days (default: the store's policy)
+
+        Returns:
+            Dict with versions_removed, objects_removed, bytes_freed
+        """
+        keep = self.keep if keep is None else keep
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        with self._locked() as paths:
+            return self._apply_retention(paths, list(paths), keep, max_age_days)
+
+    def _apply_retention(
+        self, paths: Dict[str, List[Dict]], selected: List[str], keep: int, max_age_days: int
+    ) -> Dict:
+        """Drop versions outside the policy and the objects nobody references."""
+        cutoff = None
+        if max_age_days > 0:
+            cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).isoformat() + "Z"
+
+        dropped = []
+        for path in selected:
+            versions = paths[path]
+            kept = versions[-keep:] if keep > 0 else list(versions)
+            if cutoff is not None:
+                # ISO timestamps in one format compare chronologically
+                kept = [v for v in kept[:-1] if v["created_at"] >= cutoff] + kept[-1:]
+            if len(kept) < len(versions):
+                kept_ids = {id(v) for v in kept}
+                dropped.extend(v for v in versions if id(v) not in kept_ids)
+                paths[path] = kept
+                self._changed = True
+
+        removed = {v["digest"] for v in dropped}
+        if removed:
+            removed -= {v["digest"] for versions in paths.values() for v in versions}
+        freed = 0
+        for digest in removed:
+            obj = self._object_path(digest)
+            try:
+                freed += obj.stat().st_size
+                obj.unlink()
+            except FileNotFoundError:
+                pass
+        return {
+            "versions_removed": len(dropped),
+            "objects_removed": len(removed),
+            "bytes_freed": freed,
+        }
+
+    def stats(self) -> Dict:
+        """Counts and sizes: logical (all versions) vs stored (unique, compressed)."""
+        with self._locked() as paths:
+            versions = [v for vs in paths.values() for v in vs]
+            path_count = len(paths)
+        unique = {v["digest"]: v for v in versions}
+        return {
+            "paths": path_count,
+            "versions": len(versions),
+            "objects": len(unique),
+            "logical_bytes": sum(v["size"] for v in versions),
+            "stored_bytes": sum(v["stored_size"] for v in unique.values()),
+        }
+
+
+# Global store
+_global_store: Optional[BackupStore] = None
+
+
+def get_backup_store() -> BackupStore:
+    """Get the shared backup store (policy from VAULT_BACKUP_KEEP/_MAX_AGE_DAYS)."""
+    global _global_store
+    if _global_store is None:
+        _global_store = BackupStore()
+    return _global_store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """`vault-backup` command line."""
+    parser = argparse.ArgumentParser(
+        prog="vault-backup", description="Manage claude-vault file backups."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="back up files")
+    add.add_argument("files", nargs="+")
+    commands.add_parser("list", help="list backed-up paths")
+    log = commands.add_parser("log", help="list versions of a file, newest first")
+    log.add_argument("file")
+    restore = commands.add_parser("restore", help="restore FILE[@VERSION] (default: latest)")
+    restore.add_argument("ref")
+    restore.add_argument("--to", help="write to this path instead of the original")
+    prune = commands.add_parser("prune", help="apply retention and delete unused objects")
+    prune.add_argument("--keep", type=int, help="versions to keep per path")
+    prune.add_argument("--max-age-days", type=int, help="drop versions older than this")
+    commands.add_parser("stats", help="show store size and deduplication")
+    args = parser.parse_args(argv)
+
+    store = get_backup_store()
+    try:
+        if args.command == "add":
+            for file in args.files:
+                print(store.backup(file).ref)
+        elif args.command == "list":
+            for path in store.paths():
+                versions = store.versions(path)
+                print(f"{len(versions):>4}  {versions[0].created_at}  {path}")
+        elif args.command == "log":
+            for position, v in enumerate(store.versions(args.file), 1):
+                print(f"{position:>4}  {v.digest[:12]}  {v.created_at}  {v.size:>8} bytes")
+        elif args.command == "restore":
+            path, version = split_ref(args.ref)
+            restored = store.restore(path, version, args.to)
+            print(f"Restored {restored.ref} to {args.to or restored.path}")
+        elif args.command == "prune":
+            result = store.prune(args.keep, args.max_age_days)
+            print(
+                "Removed {versions_removed} version(s), {objects_removed} object(s), "
+                "{bytes_freed} bytes".format(**result)
+            )
+        elif args.command == "stats":
+            for key, value in store.stats().items():
+                print(f"{key}: {value}")
+    except (BackupError, OSError) as e:
+        print(f"vault-backup: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
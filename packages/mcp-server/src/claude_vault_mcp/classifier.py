@@ -0,0 +1,405 @@
+"""
+Precompiled secret classifier shared by the scan, get and example tools.
+
+Backs both `file_parsers.classify_secret` and
+`tokenization.should_tokenize_value` with one rule engine. Rules are loaded
+once from a JSON file (bundled `classifier_rules.json`, or the file named by
+VAULT_CLASSIFIER_RULES) and compiled into frozensets and a single combined
+regex, so classifying a value no longer rebuilds keyword sets or tests key
+patterns one by one.
+
+Two policies run on the same compiled rules:
+- classify(): heuristic detection for values read from files (scan, example)
+- should_tokenize(): values read from Vault are secrets by definition, so
+  only clearly non-sensitive config (a short list of config keys, public URLs
+  without credentials, booleans, short values) is sent as plaintext. The
+  broader non_secret_keys list of the file heuristics does not apply here.
+
+classify() verdicts are memoized in a bounded LRU keyed by key name and a
+keyed digest of the value (the plaintext is never stored). The memo belongs to one
+compiled rule set, so reloading the rules starts from an empty cache.
+"""
+
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from .detectors import detect
+from .entropy import batch_entropy, shannon_entropy
+
+# Bundled default rule set
+DEFAULT_RULES_FILE = Path(__file__).parent / "classifier_rules.json"
+
+# Keys whose Vault values are returned in plaintext when "vault_plaintext_keys"
+# is absent from a (custom) rule file
+DEFAULT_VAULT_PLAINTEXT_KEYS = (
+    "PORT", "HOST", "HOSTNAME", "ENVIRONMENT", "ENV", "DEBUG", "LOG_LEVEL", "TIMEZONE", "TZ",
+)
+
+# URL userinfo (user@ or user:password@) and query parameter names
+_URL_USERINFO_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://[^/?#\s]*@")
+_URL_QUERY_KEY_RE = re.compile(r"[?&;]([^=&;#]+)=")
+
+# Default memo capacity (entries); "memo_size": 0 in the rules disables it
+DEFAULT_MEMO_SIZE = 65536
+
+
+class ClassificationMemo:
+    """
+    Bounded LRU of classification verdicts.
+
+    Entries are keyed by (key name, value digest). The digest is
+    keyed with a random per-process secret, so cached entries cannot be used
+    to confirm guesses of a value. Python's own str hash is SipHash under a
+    random per-process key (PEP 456) and is cached on the string, so it is
+    used directly (with the length) unless PYTHONHASHSEED pins the key, in
+    which case a keyed BLAKE2b digest is computed instead.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        """
+        Initialize memo.
+
+        Args:
+            maxsize: Maximum number of cached verdicts
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._key = secrets.token_bytes(32)
+        self._siphash = os.getenv("PYTHONHASHSEED", "random") == "random"
+        self._entries: "OrderedDict[tuple, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry(self, key: str, value: str) -> tuple:
+        """Build the cache key for a (key, value) pair."""
+        if self._siphash:
+            return (key, hash(value), len(value))
+        digest = hashlib.blake2b(
+            value.encode("utf-8", "surrogatepass"), key=self._key, digest_size=16
+        ).digest()
+        return (key, digest)
+
+    def get(self, entry: tuple) -> Optional[bool]:
+        """Return a cached verdict (and mark it recently used), or None."""
+        with self._lock:
+            verdict = self._entries.get(entry)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry)
+            self.hits += 1
+            return verdict
+
+    def get_many(self, entries: List[Optional[tuple]]) -> List[Optional[bool]]:
+        """get() for many entries under one lock; None entries are misses."""
+        verdicts: List[Optional[bool]] = []
+        with self._lock:
+            for entry in entries:
+                verdict = self._entries.get(entry) if entry is not None else None
+                if verdict is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(entry)
+                    self.hits += 1
+                verdicts.append(verdict)
+        return verdicts
+
+    def put(self, entry: tuple, verdict: bool) -> None:
+        """Cache a verdict, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[entry] = verdict
+            self._entries.move_to_end(entry)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached verdicts and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SecretClassifier:
+    """
+    Compiled secret classification rules.
+
+    Example:
+        classifier = SecretClassifier.from_file(DEFAULT_RULES_FILE)
+        classifier.classify("DB_PASSWORD", "hunter2hunter2")
+        # → True
+        classifier.classify_batch([("PORT", "8080"), ("API_KEY", "sk-1234567890")])
+        # → [False, True]
+    """
+
+    def __init__(self, rules: dict):
+        """
+        Compile a rule set.
+
+        Args:
+            rules: Rule set dict (see classifier_rules.json)
+        """
+        self.rules = rules
+        self.digest = hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+        self.non_secret_keys = frozenset(k.upper() for k in rules["non_secret_keys"])
+        self.vault_plaintext_keys = frozenset(
+            k.upper() for k in rules.get("vault_plaintext_keys", DEFAULT_VAULT_PLAINTEXT_KEYS)
+        )
+        self.public_url_prefixes = tuple(rules["public_url_prefixes"])
+        self.boolean_values = frozenset(v.lower() for v in rules["boolean_values"])
+        self.path_prefixes = tuple(rules["path_prefixes"])
+        self.reference_markers = tuple(rules["reference_markers"])
+        self.min_secret_length = rules["min_secret_length"]
+        self.entropy_min_length = rules["entropy_min_length"]
+        self.entropy_threshold = rules["entropy_threshold"]
+        self.default_secret_length = rules["default_secret_length"]
+        self.use_detectors = rules.get("credential_detectors", True)
+        self.detector_min_confidence = rules.get("detector_min_confidence", 0.9)
+
+        memo_size = rules.get("memo_size", DEFAULT_MEMO_SIZE)
+        self.memo: Optional[ClassificationMemo] = (
+            ClassificationMemo(memo_size) if memo_size > 0 else None
+        )
+
+        # One alternation for all key patterns (longest first)
+        patterns = sorted({p.upper() for p in rules["secret_key_patterns"]}, key=len, reverse=True)
+        self.secret_key_re = re.compile("|".join(re.escape(p) for p in patterns))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "SecretClassifier":
+        """Load and compile a rule set from a JSON file."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _detected(self, value: str) -> bool:
+        """Check the value against the known credential formats (detectors.py)."""
+        if not self.use_detectors:
+            return False
+        detection = detect(value)
+        return detection is not None and detection.confidence >= self.detector_min_confidence
+
+    def _url_credentials(self, value: str) -> bool:
+        """Check a URL for userinfo or secret-looking query parameters."""
+        if _URL_USERINFO_RE.match(value):
+            return True
+        return any(
+            self.secret_key_re.search(name.upper()) for name in _URL_QUERY_KEY_RE.findall(value)
+        )
+
+    def _prefilter(self, key: str, value: str) -> Optional[bool]:
+        """
+        Apply the cheap rules (0-8) of classify().
+
+        Returns:
+            True/False when a rule decides, None when entropy must decide
+        """
+        if not value or not isinstance(value, str):
+            return False
+
+        # 0. Known credential formats win over every heuristic below
+        if self._detected(value):
+            return True
+
+        key_upper = key.upper()
+
+        # 1. Non-secret key patterns (common configuration keys)
+        if key_upper in self.non_secret_keys:
+            return False
+
+        # 2. Public URLs (not secrets)
+        if value.startswith(self.public_url_prefixes):
+            return False
+
+        # 3. Boolean/simple values (not secrets)
+        if value.lower() in self.boolean_values:
+            return False
+
+        # 4. Too short to be a secret
+        if len(value) < self.min_secret_length:
+            return False
+
+        # 5. Numeric-only values (ports, IDs, etc.)
+        if value.isdigit():
+            return False
+
+        # 6. Path patterns (file paths, not secrets)
+        if value.startswith(self.path_prefixes) and "/" in value:
+            return False
+
+        # 7. Variable expansion syntax (references, not secrets)
+        if any(marker in value for marker in self.reference_markers):
+            return False
+
+        # 8. Secret key patterns (strong indicators of secrets)
+        if self.secret_key_re.search(key_upper):
+            return True
+
+        return None
+
+    def _entropy_verdict(self, value: str, entropy: float) -> bool:
+        """Apply the entropy (9) and default-length (10) rules."""
+        # 9. High entropy suggests a random string (API keys, tokens, UUIDs)
+        if len(value) >= self.entropy_min_length and entropy >= self.entropy_threshold:
+            return True
+
+        # 10. Default: if uncertain and long enough, treat as secret (safer)
+        return len(value) >= self.default_secret_length
+
+    def _memo_entry(self, key: str, value: str) -> Optional[tuple]:
+        """Memo key for a pair, or None when the pair is not cacheable."""
+        if self.memo is None or not value or not isinstance(value, str):
+            return None
+        return self.memo.entry(key, value)
+
+    def _classify_uncached(self, key: str, value: str) -> bool:
+        """classify() without the memo."""
+        verdict = self._prefilter(key, value)
+        if verdict is not None:
+            return verdict
+
+        entropy = shannon_entropy(value) if len(value) >= self.entropy_min_length else 0.0
+        return self._entropy_verdict(value, entropy)
+
+    def classify(self, key: str, value: str) -> bool:
+        """
+        Determine if a key-value pair read from a file is likely a secret.
+
+        Args:
+            key: Environment variable key
+            value: Environment variable value
+
+        Returns:
+            True if likely a secret, False if likely config
+        """
+        entry = self._memo_entry(key, value)
+        verdict = self.memo.get(entry) if entry is not None else None
+        if verdict is not None:
+            return verdict
+
+        verdict = self._classify_uncached(key, value)
+        if entry is not None:
+            self.memo.put(entry, verdict)
+        return verdict
+
+    def classify_batch(self, items: Iterable[Tuple[str, str]]) -> List[bool]:
+        """
+        Classify many key-value pairs.
+
+        Memoized pairs are answered from the cache; the rest go through the
+        prefilter and one batched entropy pass.
+
+        Args:
+            items: Iterable of (key, value) pairs (e.g. dict.items())
+
+        Returns:
+            List of verdicts in input order
+        """
+        items = list(items)
+        entries = [self._memo_entry(key, value) for key, value in items]
+        verdicts = self.memo.get_many(entries) if self.memo is not None else [None] * len(items)
+
+        misses = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        for i in misses:
+            verdicts[i] = self._prefilter(*items[i])
+
+        # Score every undecided value long enough for the entropy rule at once
+        pending = [
+            i
+            for i in misses
+            if verdicts[i] is None and len(items[i][1]) >= self.entropy_min_length
+        ]
+        scores = batch_entropy([items[i][1] for i in pending])
+        entropies = dict(zip(pending, scores.entropy))
+
+        for i in misses:
+            if verdicts[i] is None:
+                verdicts[i] = self._entropy_verdict(items[i][1], entropies.get(i, 0.0))
+            if entries[i] is not None:
+                self.memo.put(entries[i], verdicts[i])
+
+        return verdicts
+
+    def should_tokenize(self, key: str, value: str) -> bool:
+        """
+        Decide if a value fetched from Vault should be tokenized.
+
+        Not memoized: these checks are cheaper than computing a cache key.
+
+        Args:
+            key: Secret key name
+            value: Secret value
+
+        Returns:
+            True if value should be tokenized
+        """
+        if not isinstance(value, str):
+            return False
+        if self._detected(value):
+            return True
+        if key.upper() in self.vault_plaintext_keys:
+            return False
+        if value.startswith(self.public_url_prefixes) and not self._url_credentials(value):
+            return False
+        if value.lower() in self.boolean_values:
+            return False
+        return len(value) >= self.min_secret_length
+
+    def should_tokenize_batch(self, items: Iterable[Tuple[str, str]]) -> List[bool]:
+        """Apply should_tokenize() to many (key, value) pairs, in input order."""
+        return [self.should_tokenize(key, value) for key, value in items]
+
+    def cache_stats(self) -> dict:
+        """Memo statistics (empty counters when the memo is disabled)."""
+        if self.memo is None:
+            return {"size": 0, "maxsize": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+        return self.memo.stats()
+
+
+# Global instance (rules are loaded once per process)
+_classifier: Optional[SecretClassifier] = None
+
+
+def get_classifier() -> SecretClassifier:
+    """
+    Get or create the global classifier.
+
+    Rules come from VAULT_CLASSIFIER_RULES if set, else the bundled
+    classifier_rules.json.
+
+    Returns:
+        SecretClassifier instance
+    """
+    global _classifier
+
+    if _classifier is None:
+        rules_file = os.getenv("VAULT_CLASSIFIER_RULES") or DEFAULT_RULES_FILE
+        _classifier = SecretClassifier.from_file(Path(rules_file))
+
+    return _classifier
+
+
+def reload_classifier() -> SecretClassifier:
+    """Reload the rule set from disk (e.g. after editing the rules file)."""
+    global _classifier
+
+    _classifier = None
+    return get_classifier()
@@ -0,0 +1,436 @@
+"""
+Docker Compose variable interpolation and env_file resolution.
+
+Resolves the environment each compose service would actually receive, so
+secrets passed through `${VAR}` references or `env_file` entries can be
+classified like inline values:
+
+- `env_file` entries (string, list, or `{path, required}` mappings) and the
+  project `.env` next to the compose file are loaded concurrently through
+  the shared parse cache (see file_parsers.ParseCache), so unchanged files
+  are not re-read across scans.
+- `environment` values are interpolated with compose's rules (see
+  interpolate) against the project `.env`, optionally overlaid with a shell
+  environment, and override env_file values as in compose.
+
+Every resolved value records the file(s) it came from.
+
+Example:
+    resolver = ComposeEnvResolver("/workspace/app/docker-compose.yml")
+    for container, env in resolver.resolve_all().items():
+        for key, resolved in env.secrets().items():
+            print(container, key, resolved.sources)
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .classifier import get_classifier
+from .file_parsers import parse_docker_compose, parse_env_file
+
+# Threads overlap file I/O (network mounts, cold page cache); parsing
+# itself is cached, so more workers would not help
+ENV_FILE_WORKERS = 8
+
+# Source recorded for values taken from a shell environment
+ENVIRONMENT_SOURCE = "environment"
+
+_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Longest operators first (":-" before "-")
+_OPERATORS = (":-", ":?", ":+", "-", "?", "+")
+
+
+class InterpolationError(ValueError):
+    """Raised for malformed `${...}` syntax and missing required variables."""
+
+    pass
+
+
+@dataclass
+class Interpolation:
+    """Result of interpolating one value."""
+
+    value: str
+    used: List[str] = field(default_factory=list)  # Variables whose value was substituted
+    missing: List[str] = field(default_factory=list)  # Unset variables without a default
+
+
+def interpolate(template: str, variables: Mapping[str, str]) -> Interpolation:
+    """
+    Interpolate a compose value.
+
+    Supports `$VAR`, `${VAR}`, `$$` (a literal `$`) and the modifiers
+    `${VAR:-default}` / `${VAR-default}` (default if unset or empty / unset),
+    `${VAR:?error}` / `${VAR?error}` (fail if unset or empty / unset) and
+    `${VAR:+alt}` / `${VAR+alt}` (alt if set and non-empty / set, else "").
+    Defaults and alternatives may themselves contain references. An unset
+    variable without a modifier becomes "" and is reported in `missing`.
+
+    Args:
+        template: Value to interpolate
+        variables: Variable values
+
+    Returns:
+        Interpolation with the value and the variables it used or missed
+
+    Raises:
+        InterpolationError: On malformed syntax or a missing required variable
+    """
+    result = Interpolation(value="")
+    result.value = _substitute(template, variables, result)
+    return result
+
+
+def _substitute(text: str, variables: Mapping[str, str], result: Interpolation) -> str:
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        j = text.find("$", i)
+        if j < 0:
+            out.append(text[i:])
+            break
+        out.append(text[i:j])
+        nxt = text[j + 1 : j + 2]
+        if nxt == "$":
+            out.append("$")
+            i = j + 2
+        elif nxt == "{":
+            end = _closing_brace(text, j + 2)
+            out.append(_expand(text[j + 2 : end], variables, result))
+            i = end + 1
+        else:
+            match = _NAME.match(text, j + 1)
+            if match:
+                out.append(_lookup(match.group(), variables, result))
+                i = match.end()
+            else:
+                out.append("$")  # A lone "$" is literal
+                i = j + 1
+    return "".join(out)
+
+
+def _closing_brace(text: str, start: int) -> int:
+    """Index of the "}" closing a "${" opened just before start."""
+    depth = 1
+    i = start
+    while i < len(text):
+        if text.startswith("$$", i):
+            i += 2
+            continue
+        if text.startswith("${", i):
+            depth += 1
+            i += 2
+            continue
+        if text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise InterpolationError(f"Invalid interpolation (missing '}}'): {text}")
+
+
+def _lookup(name: str, variables: Mapping[str, str], result: Interpolation) -> str:
+    value = variables.get(name)
+    if value is None:
+        result.missing.append(name)
+        return ""
+    result.used.append(name)
+    return value
+
+
+def _expand(body: str, variables: Mapping[str, str], result: Interpolation) -> str:
+    match = _NAME.match(body)
+    if not match:
+        raise InterpolationError(f"Invalid interpolation: ${{{body}}}")
+    name, rest = match.group(), body[match.end() :]
+    if not rest:
+        return _lookup(name, variables, result)
+
+    operator = next((op for op in _OPERATORS if rest.startswith(op)), None)
+    if operator is None:
+        raise InterpolationError(f"Invalid interpolation: ${{{body}}}")
+    arg = rest[len(operator) :]
+    value = variables.get(name)
+    # ":" variants also treat an empty value as unset
+    present = bool(value) if operator.startswith(":") else value is not None
+
+    if operator.endswith("-"):
+        if present:
+            result.used.append(name)
+            return value
+        return _substitute(arg, variables, result)
+    if operator.endswith("?"):
+        if present:
+            result.used.append(name)
+            return value
+        message = _substitute(arg, variables, result) or "is unset"
+        raise InterpolationError(f"Required variable {name}: {message}")
+    # "+": the alternative replaces a present value
+    return _substitute(arg, variables, result) if present else ""
+
+
+def load_env_files(
+    paths: Iterable[str], max_workers: int = ENV_FILE_WORKERS
+) -> Dict[str, Union[Dict[str, str], Exception]]:
+    """
+    Parse several .env files concurrently (through the shared parse cache).
+
+    Args:
+        paths: Files to load (duplicates are loaded once)
+        max_workers: Thread count (1 = sequential)
+
+    Returns:
+        Path to parsed values, or to the exception that prevented loading
+    """
+    unique = list(dict.fromkeys(paths))
+    if len(unique) <= 1 or max_workers <= 1:
+        return {path: _load_env_file(path) for path in unique}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+        return dict(zip(unique, pool.map(_load_env_file, unique)))
+
+
+def _load_env_file(path: str) -> Union[Dict[str, str], Exception]:
+    try:
+        return parse_env_file(path)
+    except (OSError, ValueError) as e:
+        return e
+
+
+@dataclass
+class ResolvedValue:
+    """One environment variable as a container would receive it."""
+
+    key: str
+    value: str
+    sources: List[str]  # Files (or "environment") the value came from
+    raw: Optional[str] = None  # Compose value before interpolation, if it had references
+
+
+@dataclass
+class ServiceEnvironment:
+    """Resolved environment of one compose service."""
+
+    service: str
+    values: Dict[str, ResolvedValue] = field(default_factory=dict)
+    env_files: List[str] = field(default_factory=list)  # Loaded env_file paths, in order
+    missing_files: List[str] = field(default_factory=list)  # Required env_files not found
+    missing_variables: List[str] = field(default_factory=list)  # Unset, no default
+    errors: List[str] = field(default_factory=list)  # Interpolation/parse errors
+
+    def secrets(self) -> Dict[str, ResolvedValue]:
+        """Values the shared classifier considers secrets."""
+        candidates = [(key, resolved.value) for key, resolved in self.values.items()]
+        verdicts = get_classifier().classify_batch(candidates)
+        return {
+            key: self.values[key] for (key, _), is_secret in zip(candidates, verdicts) if is_secret
+        }
+
+
+class ComposeEnvResolver:
+    """
+    Resolves the environment of the services in one compose file.
+
+    The project `.env` and all services' env_files are loaded together on
+    first use (see load_env_files) and kept for the resolver's lifetime.
+    """
+
+    def __init__(
+        self,
+        compose_path: str,
+        compose_data: Optional[Dict] = None,
+        environ: Optional[Mapping[str, str]] = None,
+        max_workers: int = ENV_FILE_WORKERS,
+        check: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Initialize resolver.
+
+        Args:
+            compose_path: Compose file (its directory is the project directory)
+            compose_data: Parsed (or merged, see compose_project) compose data
+                (default: parse compose_path)
+            environ: Shell environment overriding the project `.env`, as with
+                `docker compose` (default: none; the scanning process's own
+                environment is not the deployment's)
+            max_workers: Threads used to load env files
+            check: Called with each env file's path before it is read (e.g. a
+                path allow-list check); a file it rejects is reported as an error
+        """
+        self.compose_path = os.path.abspath(compose_path)
+        self.project_dir = os.path.dirname(self.compose_path)
+        self.compose_data = (
+            compose_data if compose_data is not None else parse_docker_compose(compose_path)
+        )
+        self.environ = dict(environ or {})
+        self.max_workers = max_workers
+        self.check = check
+        self._files: Optional[Dict[str, Union[Dict[str, str], Exception]]] = None
+        self._variables: Optional[Dict[str, Tuple[str, str]]] = None
+
+    @property
+    def project_env_path(self) -> str:
+        return os.path.join(self.project_dir, ".env")
+
+    def _services(self) -> Dict:
+        data = self.compose_data
+        services = data.get("services") if isinstance(data, dict) else None
+        return services if isinstance(services, dict) else {}
+
+    def variables(self) -> Dict[str, Tuple[str, str]]:
+        """Interpolation variables as name -> (value, source)."""
+        if self._variables is None:
+            project_env = self._load([self.project_env_path])[self.project_env_path]
+            variables = {}
+            if isinstance(project_env, dict):
+                variables = {k: (v, self.project_env_path) for k, v in project_env.items()}
+            variables.update((k, (v, ENVIRONMENT_SOURCE)) for k, v in self.environ.items())
+            self._variables = variables
+        return self._variables
+
+    def env_file_entries(self, service: str) -> List[Tuple[str, bool]]:
+        """A service's env_file paths (interpolated, absolute) with their `required` flag."""
+        config = self._services().get(service)
+        env_file = config.get("env_file") if isinstance(config, dict) else None
+        if env_file is None:
+            return []
+        if not isinstance(env_file, list):
+            env_file = [env_file]
+
+        values = {k: v for k, (v, _) in self.variables().items()}
+        entries = []
+        for entry in env_file:
+            required = True
+            if isinstance(entry, dict):
+                required = entry.get("required", True) is not False
+                entry = entry.get("path")
+            if not isinstance(entry, str):
+                continue
+            try:
+                path = interpolate(entry, values).value
+            except InterpolationError:
+                path = entry
+            entries.append((os.path.normpath(os.path.join(self.project_dir, path)), required))
+        return entries
+
+    def prefetch(self) -> None:
+        """Load the project `.env` and every service's env_files concurrently."""
+        paths = [self.project_env_path]
+        services = list(self._services())
+        if any(self._env_file_refs(s) for s in services):
+            # env_file paths may interpolate project variables: load .env first
+            self.variables()
+            for service in services:
+                paths.extend(path for path, _ in self.env_file_entries(service))
+        self._load(paths)
+
+    def _env_file_refs(self, service: str) -> bool:
+        config = self._services().get(service)
+        return isinstance(config, dict) and bool(config.get("env_file"))
+
+    def _load(self, paths: List[str]) -> Dict[str, Union[Dict[str, str], Exception]]:
+        if self._files is None:
+            self._files = {}
+        todo = [p for p in paths if p not in self._files]
+        if self.check is not None:
+            allowed = []
+            for path in todo:
+                try:
+                    self.check(path)
+                    allowed.append(path)
+                except Exception as e:
+                    self._files[path] = e
+            todo = allowed
+        if todo:
+            self._files.update(load_env_files(todo, self.max_workers))
+        return self._files
+
+    def resolve(self, service: str) -> ServiceEnvironment:
+        """
+        Resolve one service's environment.
+
+        env_files apply in order (later files win), then `environment`
+        entries override them. A bare `KEY` entry (or `KEY:` with no value)
+        takes the variable's value, if set.
+
+        Args:
+            service: Service name
+
+        Returns:
+            ServiceEnvironment (errors are collected, not raised)
+        """
+        env = ServiceEnvironment(service=service)
+        entries = self.env_file_entries(service)
+        files = self._load([path for path, _ in entries])
+        for path, required in entries:
+            loaded = files[path]
+            if isinstance(loaded, FileNotFoundError):
+                if required:
+                    env.missing_files.append(path)
+                continue
+            if isinstance(loaded, Exception):
+                env.errors.append(f"{path}: {loaded}")
+                continue
+            env.env_files.append(path)
+            for key, value in loaded.items():
+                env.values[key] = ResolvedValue(key=key, value=value, sources=[path])
+
+        variables = self.variables()
+        values = {k: v for k, (v, _) in variables.items()}
+        for key, raw in self._environment(service):
+            if raw is None:
+                if key in variables:
+                    value, source = variables[key]
+                    env.values[key] = ResolvedValue(key=key, value=value, sources=[source])
+                continue
+            try:
+                result = interpolate(raw, values)
+            except InterpolationError as e:
+                env.errors.append(f"{key}: {e}")
+                continue
+            for name in result.missing:
+                if name not in env.missing_variables:
+                    env.missing_variables.append(name)
+            if result.used:
+                sources = list(dict.fromkeys(variables[name][1] for name in result.used))
+            else:
+                sources = [self.compose_path]
+            env.values[key] = ResolvedValue(
+                key=key,
+                value=result.value,
+                sources=sources,
+                raw=raw if "$" in raw else None,
+            )
+        return env
+
+    def _environment(self, service: str) -> List[Tuple[str, Optional[str]]]:
+        """A service's `environment` entries as (key, raw value or None)."""
+        config = self._services().get(service)
+        environment = config.get("environment") if isinstance(config, dict) else None
+        if isinstance(environment, dict):
+            items = []
+            for key, value in environment.items():
+                if isinstance(value, bool):
+                    value = "true" if value else "false"
+                elif isinstance(value, (int, float)):
+                    value = str(value)
+                elif value is not None and not isinstance(value, str):
+                    continue
+                items.append((str(key), value))
+            return items
+        if isinstance(environment, list):
+            items = []
+            for item in environment:
+                if isinstance(item, str):
+                    key, sep, value = item.partition("=")
+                    items.append((key, value if sep else None))
+            return items
+        return []
+
+    def resolve_all(self) -> Dict[str, ServiceEnvironment]:
+        """Resolve every service (files are prefetched together first)."""
+        self.prefetch()
+        return {service: self.resolve(service) for service in self._services()}
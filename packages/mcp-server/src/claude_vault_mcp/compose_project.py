@@ -0,0 +1,544 @@
+"""
+Multi-file Docker Compose projects: override files, `include` and `extends`.
+
+Loads the configuration `docker compose` would run instead of a single file:
+
+- A project directory (or its default compose file) loads the first of
+  COMPOSE_FILE_NAMES plus the first of OVERRIDE_FILE_NAMES, as `docker
+  compose` does without `-f`. Other files load on their own.
+- Files are merged in order with the compose specification's rules (see
+  merge_service): mappings merge recursively, `environment`/`labels`-style
+  sections merge by key (list or mapping form), `volumes`/`secrets`/
+  `configs`/`devices` merge by mount target, `command`/`entrypoint` are
+  replaced and other sequences are appended.
+- `include` entries are loaded as their own projects; their resources may
+  not redefine the including file's. `extends` services (same file or
+  another) are resolved before merging. Relative paths from included and
+  extended files are rebased onto the project directory.
+
+Merged models are cached by the stat identity of every file they were built
+from, so an unchanged project is neither re-parsed nor re-merged.
+
+Example:
+    project = load_compose_project("/workspace/proxmox-services/app")
+    print(project.files, list(project.model.get("services", {})))
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .file_parsers import RACY_WINDOW_NS, parse_docker_compose
+from .workspace_scan import file_identity
+
+# Default file names, in the order `docker compose` looks for them
+COMPOSE_FILE_NAMES = ("compose.yaml", "compose.yml", "docker-compose.yml", "docker-compose.yaml")
+OVERRIDE_FILE_NAMES = (
+    "compose.override.yml",
+    "compose.override.yaml",
+    "docker-compose.override.yml",
+    "docker-compose.override.yaml",
+)
+
+# Merged projects kept by the shared cache
+COMPOSE_PROJECT_CACHE_SIZE = 32
+
+# Service keys whose list form ("KEY=value") is a mapping
+_MAPPING_KEYS = ("environment", "labels", "annotations", "extra_hosts", "sysctls")
+
+# Service keys replaced as a whole by an override
+_REPLACED_KEYS = ("command", "entrypoint")
+
+# Service keys merged by a unique key (mount target / container path)
+_UNIQUE_KEYS = ("volumes", "secrets", "configs", "devices")
+
+# Service keys given either as a list of names or a mapping
+_NAMES_OR_MAPPING_KEYS = ("depends_on", "networks")
+
+# Top-level sections whose entries are named resources
+_RESOURCE_SECTIONS = ("services", "networks", "volumes", "secrets", "configs")
+
+
+class ComposeProjectError(ValueError):
+    """Raised for missing files, broken `include`/`extends` and conflicts."""
+
+    pass
+
+
+@dataclass
+class ComposeProject:
+    """Effective configuration of a compose project."""
+
+    files: List[str]  # Compose files merged, in order (absolute)
+    model: Dict  # Merged configuration (relative paths are relative to project_dir)
+    inputs: List[str] = field(default_factory=list)  # Every file read, including include/extends
+
+    @property
+    def project_dir(self) -> str:
+        return os.path.dirname(self.files[0])
+
+    def copy(self) -> "ComposeProject":
+        """A copy whose model may be modified."""
+        return ComposeProject(list(self.files), copy.deepcopy(self.model), list(self.inputs))
+
+
+def find_compose_files(directory: str) -> List[str]:
+    """
+    Default compose file set of a directory: the main file and its override.
+
+    Args:
+        directory: Project directory
+
+    Returns:
+        Absolute paths (empty if the directory has no compose file)
+    """
+    directory = os.path.abspath(directory)
+    files = []
+    for names in (COMPOSE_FILE_NAMES, OVERRIDE_FILE_NAMES):
+        for name in names:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                files.append(path)
+                break
+        if not files:
+            break
+    return files
+
+
+def project_files(path: str) -> List[str]:
+    """
+    Compose files `docker compose` would load for a directory or file.
+
+    A directory, or the file that is its default compose file, gives the
+    default file set (with override); any other file is loaded alone.
+
+    Args:
+        path: Project directory or compose file
+
+    Returns:
+        Absolute paths (empty if a directory has no compose file)
+    """
+    path = os.path.abspath(path)
+    if os.path.isdir(path):
+        return find_compose_files(path)
+    defaults = find_compose_files(os.path.dirname(path))
+    return defaults if defaults[:1] == [path] else [path]
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, list) else [value]
+
+
+def _as_mapping(value, key: str) -> Dict:
+    """List form ("KEY=value", "KEY", "host:ip") of a mapping section as a dict."""
+    if isinstance(value, dict):
+        return dict(value)
+    mapping = {}
+    for item in _as_list(value):
+        item = str(item)
+        sep = "=" if "=" in item or key != "extra_hosts" else ":"
+        name, found, val = item.partition(sep)
+        mapping[name] = val if found else None
+    return mapping
+
+
+def _unique_key(key: str, item) -> str:
+    """Identity of a volume/secret/config/device entry within a service."""
+    if isinstance(item, dict):
+        return str(item.get("target") or item.get("source"))
+    parts = str(item).split(":")
+    if key in ("volumes", "devices") and len(parts) > 1:
+        return parts[1]  # source:target[:mode]
+    return parts[0]
+
+
+def _merge_mapping(base: Dict, override: Dict) -> Dict:
+    """Recursive mapping merge: nested mappings merge, anything else is replaced."""
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge_mapping(result[key], value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def merge_service(base: Dict, override: Dict) -> Dict:
+    """
+    Merge two definitions of one service (override file or `extends`).
+
+    Args:
+        base: Earlier definition
+        override: Later definition (wins on conflicts)
+
+    Returns:
+        New merged definition (the inputs are not modified)
+    """
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        old = result.get(key)
+        if old is None or value is None:
+            result[key] = copy.deepcopy(value)
+        elif key in _MAPPING_KEYS:
+            result[key] = {**_as_mapping(old, key), **_as_mapping(value, key)}
+        elif key in _REPLACED_KEYS:
+            result[key] = copy.deepcopy(value)
+        elif key in _UNIQUE_KEYS:
+            merged = {_unique_key(key, item): item for item in _as_list(old)}
+            merged.update((_unique_key(key, item), item) for item in _as_list(value))
+            result[key] = copy.deepcopy(list(merged.values()))
+        elif key in _NAMES_OR_MAPPING_KEYS and (isinstance(old, dict) or isinstance(value, dict)):
+            old_map = old if isinstance(old, dict) else dict.fromkeys(_as_list(old))
+            new_map = value if isinstance(value, dict) else dict.fromkeys(_as_list(value))
+            result[key] = _merge_mapping(old_map, new_map)
+        elif key == "build" and (isinstance(old, dict) or isinstance(value, dict)):
+            old_map = old if isinstance(old, dict) else {"context": old}
+            new_map = value if isinstance(value, dict) else {"context": value}
+            result[key] = _merge_mapping(old_map, new_map)
+        elif isinstance(old, dict) and isinstance(value, dict):
+            result[key] = _merge_mapping(old, value)
+        elif key == "env_file" or (isinstance(old, list) and isinstance(value, list)):
+            merged = _as_list(old)
+            merged.extend(item for item in _as_list(value) if item not in merged)
+            result[key] = copy.deepcopy(merged)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def merge_compose(base: Dict, override: Dict) -> Dict:
+    """
+    Merge two compose files (`docker compose -f base -f override`).
+
+    Args:
+        base: Earlier file's configuration
+        override: Later file's configuration
+
+    Returns:
+        New merged configuration (the inputs are not modified)
+    """
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        old = result.get(key)
+        if key == "services" and isinstance(old, dict) and isinstance(value, dict):
+            for name, config in value.items():
+                if isinstance(old.get(name), dict) and isinstance(config, dict):
+                    old[name] = merge_service(old[name], config)
+                else:
+                    old[name] = copy.deepcopy(config)
+        elif isinstance(old, dict) and isinstance(value, dict):
+            result[key] = _merge_mapping(old, value)
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+def _rebase_path(path, from_dir: str, to_dir: str):
+    """Make a path relative to from_dir relative to to_dir instead."""
+    if not isinstance(path, str) or from_dir == to_dir or os.path.isabs(path):
+        return path
+    if path.startswith(("$", "~")) or "://" in path or path.startswith("git@"):
+        return path  # Variables, home directories and remote build contexts
+    rebased = os.path.relpath(os.path.join(from_dir, path), to_dir)
+    return rebased if rebased.startswith("..") or rebased == "." else "./" + rebased
+
+
+def _rebase_service(config: Dict, from_dir: str, to_dir: str) -> Dict:
+    """Rebase a service's env_file, build context and bind mount sources."""
+    if from_dir == to_dir or not isinstance(config, dict):
+        return config
+    config = copy.deepcopy(config)
+    if "env_file" in config:
+        entries = []
+        for entry in _as_list(config["env_file"]):
+            if isinstance(entry, dict):
+                entry = {**entry, "path": _rebase_path(entry.get("path"), from_dir, to_dir)}
+            else:
+                entry = _rebase_path(entry, from_dir, to_dir)
+            entries.append(entry)
+        config["env_file"] = entries if isinstance(config["env_file"], list) else entries[0]
+    build = config.get("build")
+    if isinstance(build, dict):
+        build["context"] = _rebase_path(build.get("context", "."), from_dir, to_dir)
+    elif isinstance(build, str):
+        config["build"] = _rebase_path(build, from_dir, to_dir)
+    volumes = []
+    for volume in _as_list(config.get("volumes")):
+        if isinstance(volume, str) and volume.startswith("."):
+            source, sep, rest = volume.partition(":")
+            volume = _rebase_path(source, from_dir, to_dir) + sep + rest
+        elif isinstance(volume, dict) and volume.get("type") == "bind":
+            volume = {**volume, "source": _rebase_path(volume.get("source"), from_dir, to_dir)}
+        volumes.append(volume)
+    if volumes:
+        config["volumes"] = volumes
+    return config
+
+
+def _rebase_model(model: Dict, from_dir: str, to_dir: str) -> Dict:
+    """Rebase the relative paths of a whole (included) configuration."""
+    if from_dir == to_dir:
+        return model
+    model = copy.deepcopy(model)
+    services = model.get("services")
+    if isinstance(services, dict):
+        for name, config in services.items():
+            services[name] = _rebase_service(config, from_dir, to_dir)
+    for section in ("secrets", "configs"):
+        for resource in (model.get(section) or {}).values():
+            if isinstance(resource, dict) and "file" in resource:
+                resource["file"] = _rebase_path(resource["file"], from_dir, to_dir)
+    return model
+
+
+class _Loader:
+    """One project load: reads files, resolves include/extends, records inputs."""
+
+    def __init__(self, check: Optional[Callable[[str], None]] = None):
+        self.check = check
+        self.inputs: Dict[str, tuple] = {}  # Path -> stat identity when first read
+
+    def read(self, path: str) -> Dict:
+        if self.check is not None:
+            self.check(path)
+        try:
+            # Stat before parsing: a change while loading leaves a stale identity
+            st = os.stat(path)
+            data = parse_docker_compose(path)
+        except FileNotFoundError:
+            raise ComposeProjectError(f"Compose file not found: {path}") from None
+        self.inputs.setdefault(path, file_identity(st))
+        if not isinstance(data, dict):
+            raise ComposeProjectError(f"Not a compose file (top level is not a mapping): {path}")
+        return data
+
+    def load_files(self, paths: Sequence[str], base_dir: str, stack: Tuple[str, ...]) -> Dict:
+        model: Dict = {}
+        for path in paths:
+            model = merge_compose(model, self.load_file(path, base_dir, stack))
+        return model
+
+    def load_file(self, path: str, base_dir: str, stack: Tuple[str, ...]) -> Dict:
+        if path in stack:
+            raise ComposeProjectError(f"Include cycle: {' -> '.join(stack + (path,))}")
+        data = self.read(path)
+        includes = data.pop("include", None)
+
+        services = data.get("services")
+        if isinstance(services, dict):
+            resolved = {}
+            for name in services:
+                resolved[name] = self._extends(path, base_dir, services, name, ())
+            data["services"] = resolved
+
+        included: Dict = {}
+        for entry in _as_list(includes):
+            if isinstance(entry, dict):
+                paths = _as_list(entry.get("path"))
+                project_dir = entry.get("project_directory")
+            else:
+                paths, project_dir = [entry], None
+            paths = [os.path.normpath(os.path.join(base_dir, p)) for p in paths if p]
+            if not paths:
+                raise ComposeProjectError(f"include entry without a path in {path}")
+            inc_dir = os.path.normpath(
+                os.path.join(base_dir, project_dir or os.path.dirname(paths[0]))
+            )
+            model = _rebase_model(
+                self.load_files(paths, inc_dir, stack + (path,)), inc_dir, base_dir
+            )
+            for existing, where in ((included, "another include"), (data, path)):
+                conflict = _first_conflict(existing, model)
+                if conflict:
+                    raise ComposeProjectError(
+                        f"{conflict} from include {paths[0]} is also defined in {where}"
+                    )
+            included = merge_compose(included, model)
+        return merge_compose(included, data) if included else data
+
+    def _extends(
+        self, path: str, base_dir: str, services: Dict, name: str, chain: Tuple[tuple, ...]
+    ) -> Dict:
+        config = services.get(name)
+        if not isinstance(config, dict) or "extends" not in config:
+            return config
+        link = (path, name)
+        if link in chain:
+            names = " -> ".join(n for _, n in chain + (link,))
+            raise ComposeProjectError(f"extends cycle: {names}")
+
+        spec = config["extends"]
+        if isinstance(spec, str):
+            spec = {"service": spec}
+        base_name = spec.get("service") if isinstance(spec, dict) else None
+        ext_file = spec.get("file") if isinstance(spec, dict) else None
+        if ext_file:
+            ext_path = os.path.normpath(os.path.join(os.path.dirname(path), ext_file))
+            ext_dir = os.path.dirname(ext_path)
+            ext_services = self.read(ext_path).get("services") or {}
+            base = self._extends(ext_path, ext_dir, ext_services, base_name, chain + (link,))
+            base = _rebase_service(base, ext_dir, base_dir)
+        else:
+            ext_path = path
+            base = self._extends(path, base_dir, services, base_name, chain + (link,))
+        if not isinstance(base, dict):
+            raise ComposeProjectError(
+                f"Service {name!r} extends unknown service {base_name!r} in {ext_path}"
+            )
+        own = {k: v for k, v in config.items() if k != "extends"}
+        return merge_service(base, own)
+
+
+def _first_conflict(model: Dict, other: Dict) -> Optional[str]:
+    for section in _RESOURCE_SECTIONS:
+        names = (model.get(section) or {}).keys() & (other.get(section) or {}).keys()
+        if names:
+            return f"{section[:-1]} {sorted(names)[0]!r}"
+    return None
+
+
+@dataclass
+class _CachedProject:
+    identities: Dict[str, tuple]  # Every input file -> stat identity
+    project: ComposeProject
+
+
+class ComposeProjectCache:
+    """
+    Bounded LRU of merged compose projects.
+
+    An entry is reused while the stat identity of every file it was built
+    from (compose files, overrides, includes, extends files) is unchanged.
+    Projects built from a file modified within RACY_WINDOW_NS are not
+    cached, since their identity cannot yet be trusted.
+    """
+
+    def __init__(self, maxsize: int = COMPOSE_PROJECT_CACHE_SIZE):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of cached projects
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, _CachedProject]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _current(identities: Dict[str, tuple]) -> bool:
+        for path, identity in identities.items():
+            try:
+                if file_identity(os.stat(path)) != identity:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def load(
+        self, files: Sequence[str], check: Optional[Callable[[str], None]] = None
+    ) -> ComposeProject:
+        """
+        Load and merge compose files, or return the cached project.
+
+        Args:
+            files: Compose files in merge order (the first sets the project directory)
+            check: Called with each file's path before it is read (e.g. a path
+                allow-list check); its exceptions propagate
+
+        Returns:
+            ComposeProject (a private copy)
+
+        Raises:
+            ComposeProjectError: On missing files, cycles and include conflicts
+        """
+        key = tuple(os.path.abspath(f) for f in files)
+        if not key:
+            raise ComposeProjectError("No compose files given")
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self._current(entry.identities):
+            if check is not None:
+                for path in entry.project.inputs:
+                    check(path)
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            return entry.project.copy()
+
+        loader = _Loader(check)
+        model = loader.load_files(key, os.path.dirname(key[0]), ())
+        project = ComposeProject(files=list(key), model=model, inputs=list(loader.inputs))
+
+        now = time.time_ns()
+        racy = any(now - identity[2] < RACY_WINDOW_NS for identity in loader.inputs.values())
+        with self._lock:
+            self.misses += 1
+            if not racy and self.maxsize > 0:
+                self._entries[key] = _CachedProject(loader.inputs, project)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return project.copy()
+
+    def clear(self) -> None:
+        """Drop all cached projects and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global compose project cache
+_global_project_cache: Optional[ComposeProjectCache] = None
+
+
+def get_compose_project_cache() -> ComposeProjectCache:
+    """Get the shared compose project cache."""
+    global _global_project_cache
+    if _global_project_cache is None:
+        _global_project_cache = ComposeProjectCache()
+    return _global_project_cache
+
+
+def load_compose_project(
+    path: Union[str, Sequence[str]], check: Optional[Callable[[str], None]] = None
+) -> ComposeProject:
+    """
+    Load the effective configuration of a compose project (cached).
+
+    Args:
+        path: Project directory, compose file (see project_files), or an
+            explicit list of files to merge in order
+        check: Called with each file's path before it is read
+
+    Returns:
+        ComposeProject (a private copy)
+
+    Raises:
+        ComposeProjectError: If no compose file is found or loading fails
+    """
+    files = project_files(path) if isinstance(path, str) else list(path)
+    if not files:
+        raise ComposeProjectError(f"No compose file in {path} (looked for {COMPOSE_FILE_NAMES})")
+    return get_compose_project_cache().load(files, check)
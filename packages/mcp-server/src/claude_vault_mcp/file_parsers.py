@@ -1,17 +1,41 @@
 """File parsing utilities for .env and docker-compose files."""
 
-import math
+import copy
+import hashlib
+import io
+import os
 import re
-from collections import Counter
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import yaml
 
+from .atomic_io import atomic_open
+from .classifier import get_classifier
 
-@dataclass
+# Use libyaml's C loader/dumper when PyYAML was built with it (several times
+# faster on large compose files); same safe schema either way
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+
+    YAML_BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+    YAML_BACKEND = "python"
+
+
+def yaml_backend() -> str:
+    """YAML backend in use: "libyaml" (C extension) or "python"."""
+    return YAML_BACKEND
+
+
+@dataclass(slots=True)
 class EnvLine:
     """Represents a line in a .env file for structure preservation."""
 
@@ -22,210 +46,306 @@ class EnvLine:
     comment: Optional[str] = None  # Inline comment after value
 
 
-def parse_env_file(file_path: str) -> Dict[str, str]:
+# Precompiled .env grammar
+_ASSIGNMENT = re.compile(r"(\s*)(?:(export)\s+)?([A-Za-z_][A-Za-z0-9_]*)=(.*)")
+
+
+def iter_env_lines(
+    stream: Iterable[str], structure: bool = True
+) -> Iterator[Union[EnvLine, Tuple[str, str]]]:
     """
-    Parse .env file into key-value pairs.
+    Parse .env content incrementally, one line at a time.
+
+    This is the single .env grammar behind parse_env_file and
+    parse_env_file_with_structure. Only the current (possibly multiline)
+    entry is held in memory.
 
     Handles:
-    - Comments (# prefix)
-    - Quoted values ("..." or '...')
-    - Multiline values (with quotes)
+    - Comments (# prefix) and inline comments after unquoted values
+    - Quoted values ("..." or '...'), including multiline values
     - Blank lines
     - export prefix (export KEY=value)
 
     Args:
-        file_path: Path to .env file
+        stream: Lines of the file (e.g. an open text file)
+        structure: If True, yield an EnvLine for every line (a file ending
+            in a newline ends with a blank EnvLine, so writing the structure
+            back reproduces it); if False, yield (key, value) tuples for
+            assignments only
+
+    Yields:
+        EnvLine objects, or (key, value) tuples
+    """
+    lines = iter(stream)
+    ends_with_newline = True  # An empty file is one blank line
 
-    Returns:
-        Dict of key-value pairs
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+            ends_with_newline = True
+        else:
+            ends_with_newline = False
 
-    Raises:
-        FileNotFoundError: If file doesn't exist
-        ValueError: If file cannot be parsed
-    """
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+        stripped = line.strip()
+        if not stripped or stripped[0] == "#":
+            if structure:
+                yield EnvLine("comment" if stripped else "blank", None, None, line)
+            continue
 
-    result = {}
-    path = Path(file_path)
+        match = _ASSIGNMENT.match(line)
+        if match is None:
+            if structure:
+                yield EnvLine("unknown", None, None, line)
+            continue
 
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
+        _, export, key, value = match.groups()
+        value = value.rstrip()
+        comment = None
+        raw_line = line
 
-    # Parse line by line
-    lines = content.split("\n")
-    i = 0
+        if value[:1] in ('"', "'"):
+            quote_char = value[0]
+            if len(value) > 1 and value[-1] == quote_char:
+                value = value[1:-1]
+            else:
+                # Multiline value - collect until a line ends with the quote
+                parts = [value[1:]]
+                raw_parts = [line]
+                for next_line in lines:
+                    if next_line.endswith("\n"):
+                        next_line = next_line[:-1]
+                        ends_with_newline = True
+                    else:
+                        ends_with_newline = False
+                    raw_parts.append(next_line)
+                    closing = next_line.rstrip()
+                    if closing.endswith(quote_char):
+                        parts.append(closing[:-1])
+                        break
+                    parts.append(next_line)
+                value = "\n".join(parts)
+                raw_line = "\n".join(raw_parts)
+        else:
+            # Unquoted value - strip inline comments
+            hash_pos = value.find("#")
+            if hash_pos >= 0:
+                comment = value[hash_pos:]
+                value = value[:hash_pos]
+            value = value.strip()
+
+        if structure:
+            yield EnvLine("export" if export else "assignment", key, value, raw_line, comment)
+        else:
+            yield key, value
 
-    while i < len(lines):
-        line = lines[i].rstrip()
+    if structure and ends_with_newline:
+        yield EnvLine("blank", None, None, "")
 
-        # Skip blank lines and comments
-        if not line or line.strip().startswith("#"):
-            i += 1
-            continue
 
-        # Match KEY=VALUE pattern (with optional export prefix)
-        match = re.match(r"^(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)=(.*)$", line)
+def _env_dict(stream: IO[str]) -> Dict[str, str]:
+    return dict(iter_env_lines(stream, structure=False))
 
-        if match:
-            key = match.group(1)
-            value = match.group(2)
 
-            # Handle quoted values (single or double quotes)
-            if value.startswith('"') or value.startswith("'"):
-                quote_char = value[0]
+def _env_structure(stream: IO[str]) -> List[EnvLine]:
+    return list(iter_env_lines(stream))
 
-                # Check if quote is closed on same line
-                if len(value) > 1 and value.endswith(quote_char):
-                    # Remove quotes
-                    value = value[1:-1]
-                else:
-                    # Multiline value - collect until closing quote
-                    multiline_value = value[1:]  # Remove opening quote
-                    i += 1
 
-                    while i < len(lines):
-                        next_line = lines[i]
-                        multiline_value += "\n" + next_line
+def _copy_lines(lines: List[EnvLine]) -> List[EnvLine]:
+    return [EnvLine(ln.type, ln.key, ln.value, ln.raw_line, ln.comment) for ln in lines]
 
-                        if next_line.rstrip().endswith(quote_char):
-                            # Remove closing quote
-                            multiline_value = multiline_value[:-1]
-                            break
 
-                        i += 1
+# Parsed files kept by the shared parse cache
+PARSE_CACHE_SIZE = 128
 
-                    value = multiline_value
-            else:
-                # Unquoted value - strip inline comments
-                comment_match = re.match(r"^([^#]*?)\s*#", value)
-                if comment_match:
-                    value = comment_match.group(1).strip()
-                else:
-                    value = value.strip()
+# A file modified this close to when it was read may change again without
+# its mtime changing (coarse filesystem timestamps); such entries are
+# verified by content hash until the window has passed
+RACY_WINDOW_NS = 2_000_000_000
 
-            result[key] = value
 
-        i += 1
+@dataclass
+class _CachedParse:
+    identity: tuple  # (dev, ino, mtime_ns, size)
+    digest: Optional[bytes]  # Content hash while the mtime is ambiguous
+    result: Any
 
-    return result
 
+def _decode(data: bytes) -> io.TextIOWrapper:
+    """Text stream over file bytes, with the same newline handling as open()."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
 
-def parse_env_file_with_structure(file_path: str) -> List[EnvLine]:
-    """
-    Parse .env file preserving structure (comments, blank lines, order).
 
-    Args:
-        file_path: Path to .env file
+class ParseCache:
+    """
+    Bounded LRU of parse results keyed by file stat identity.
 
-    Returns:
-        List of EnvLine objects
+    A hit costs one stat() call: the file is neither re-read nor re-parsed
+    while its (device, inode, mtime, size) are unchanged. Files read within
+    RACY_WINDOW_NS of their last modification are additionally verified by
+    content hash, since a quick second write may leave the stat identity
+    unchanged. Results are copied on the way out, so callers may mutate them.
     """
-    if not Path(file_path).exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
 
-    lines_data = []
-    path = Path(file_path)
+    def __init__(self, maxsize: int = PARSE_CACHE_SIZE):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of cached (file, parser) results
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, _CachedParse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _identity(st: os.stat_result) -> tuple:
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _digest(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def load(
+        self,
+        kind: str,
+        file_path: str,
+        parse: Callable[[IO[str]], Any],
+        clone: Callable[[Any], Any] = copy.deepcopy,
+    ) -> Any:
+        """
+        Parse a file, or return the cached result if it has not changed.
+
+        Args:
+            kind: Parser name (one file can be cached per parser)
+            file_path: File to parse
+            parse: Parser reading from a text stream
+            clone: Copies a result for the caller
+
+        Returns:
+            Parse result (a private copy)
+
+        Raises:
+            FileNotFoundError: If file doesn't exist
+        """
+        key = (kind, os.path.abspath(file_path))
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            self.invalidate(file_path)
+            raise FileNotFoundError(f"File not found: {file_path}") from None
+
+        identity = self._identity(st)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.identity == identity and entry.digest is None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return clone(entry.result)
+
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            identity = self._identity(st)
+            racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+            if entry is not None and entry.identity == identity:
+                # Ambiguous mtime: compare content before trusting the entry
+                data = f.read()
+                if self._digest(data) == entry.digest:
+                    with self._lock:
+                        if not racy:
+                            entry.digest = None
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                    return clone(entry.result)
+                result = parse(_decode(data))
+                digest = self._digest(data) if racy else None
+            elif racy:
+                data = f.read()
+                result = parse(_decode(data))
+                digest = self._digest(data)
+            else:
+                result = parse(io.TextIOWrapper(f, encoding="utf-8"))
+                digest = None
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = _CachedParse(identity, digest, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return clone(result)
+
+    def invalidate(self, file_path: str) -> None:
+        """Drop cached results for a file (after writing it)."""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [k for k in self._entries if k[1] == path]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global parse cache
+_global_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """Get the shared parse cache (size from VAULT_PARSE_CACHE_SIZE)."""
+    global _global_parse_cache
+    if _global_parse_cache is None:
+        size = int(os.getenv("VAULT_PARSE_CACHE_SIZE", PARSE_CACHE_SIZE))
+        _global_parse_cache = ParseCache(max(0, size))
+    return _global_parse_cache
 
-    with open(path, "r", encoding="utf-8") as f:
-        content = f.read()
 
-    lines = content.split("\n")
-    i = 0
+def parse_env_file(file_path: str) -> Dict[str, str]:
+    """
+    Parse .env file into key-value pairs.
 
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
+    See iter_env_lines for the supported syntax. Results are cached until
+    the file changes (see ParseCache).
 
-        # Blank line
-        if not stripped:
-            lines_data.append(EnvLine(type="blank", raw_line=line))
-            i += 1
-            continue
+    Args:
+        file_path: Path to .env file
 
-        # Comment line
-        if stripped.startswith("#"):
-            lines_data.append(EnvLine(type="comment", raw_line=line))
-            i += 1
-            continue
+    Returns:
+        Dict of key-value pairs
 
-        # Assignment line
-        match = re.match(r"^(\s*)(?:(export)\s+)?([A-Za-z_][A-Za-z0-9_]*)=(.*)$", line)
-
-        if match:
-            # indent = match.group(1)  # Reserved for future use
-            is_export = match.group(2) is not None
-            key = match.group(3)
-            value = match.group(4)
-
-            # Handle quoted multiline values
-            if (value.startswith('"') or value.startswith("'")) and len(value) > 0:
-                quote_char = value[0]
-
-                # Check if quote is closed
-                if len(value) > 1 and value.endswith(quote_char):
-                    # Single line quoted value - remove quotes for storage
-                    parsed_value = value[1:-1]
-                    lines_data.append(
-                        EnvLine(
-                            type="export" if is_export else "assignment",
-                            key=key,
-                            value=parsed_value,
-                            raw_line=line,
-                        )
-                    )
-                else:
-                    # Multiline value
-                    multiline_value = value[1:]  # Remove opening quote
-                    original_lines = [line]
-                    i += 1
-
-                    while i < len(lines):
-                        next_line = lines[i]
-                        original_lines.append(next_line)
-                        multiline_value += "\n" + next_line
-
-                        if next_line.rstrip().endswith(quote_char):
-                            multiline_value = multiline_value[:-1]
-                            break
-
-                        i += 1
-
-                    lines_data.append(
-                        EnvLine(
-                            type="export" if is_export else "assignment",
-                            key=key,
-                            value=multiline_value,
-                            raw_line="\n".join(original_lines),
-                        )
-                    )
-            else:
-                # Unquoted value
-                comment_match = re.match(r"^([^#]*?)\s*(#.*)$", value)
-                if comment_match:
-                    parsed_value = comment_match.group(1).strip()
-                    inline_comment = comment_match.group(2)
-                else:
-                    parsed_value = value.strip()
-                    inline_comment = None
-
-                lines_data.append(
-                    EnvLine(
-                        type="export" if is_export else "assignment",
-                        key=key,
-                        value=parsed_value,
-                        raw_line=line,
-                        comment=inline_comment,
-                    )
-                )
+    Raises:
+        FileNotFoundError: If file doesn't exist
+        ValueError: If file cannot be parsed
+    """
+    return get_parse_cache().load("env", file_path, _env_dict, dict)
 
-        else:
-            # Unrecognized line format - keep as-is
-            lines_data.append(EnvLine(type="unknown", raw_line=line))
 
-        i += 1
+def parse_env_file_with_structure(file_path: str) -> List[EnvLine]:
+    """
+    Parse .env file preserving structure (comments, blank lines, order).
+
+    Args:
+        file_path: Path to .env file
 
-    return lines_data
+    Returns:
+        List of EnvLine objects
+    """
+    return get_parse_cache().load("env_structure", file_path, _env_structure, _copy_lines)
 
 
 def write_env_file(
@@ -315,19 +435,17 @@ def write_env_file(
 
         content = "\n".join(lines)
 
-    # Ensure parent directory exists
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write file
-    with open(path, "w", encoding="utf-8") as f:
+    # Replace atomically (readers never see a half-written file)
+    with atomic_open(path) as f:
         f.write(content)
         if content and not content.endswith("\n"):
             f.write("\n")
+    get_parse_cache().invalidate(file_path)
 
 
 def parse_docker_compose(file_path: str) -> Dict:
     """
-    Parse docker-compose.yml file.
+    Parse docker-compose.yml file (cached until the file changes).
 
     Args:
         file_path: Path to docker-compose.yml
@@ -342,18 +460,11 @@ def parse_docker_compose(file_path: str) -> Dict:
         FileNotFoundError: If file doesn't exist
         yaml.YAMLError: If YAML is invalid
     """
-    path = Path(file_path)
-
-    if not path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return get_parse_cache().load("compose", file_path, _load_compose)
 
-    if not data:
-        return {}
 
-    return data
+def _load_compose(stream: IO[str]) -> Dict:
+    return yaml.load(stream, Loader=SafeLoader) or {}
 
 
 def write_docker_compose(file_path: str, data: Dict) -> None:
@@ -364,21 +475,29 @@ def write_docker_compose(file_path: str, data: Dict) -> None:
         file_path: Output file path
         data: Docker compose data structure
     """
-    path = Path(file_path)
+    # Write YAML with nice formatting, replacing the file atomically
+    with atomic_open(file_path) as f:
+        dump_docker_compose(data, f)
+    get_parse_cache().invalidate(file_path)
+
 
-    # Ensure parent directory exists
-    path.parent.mkdir(parents=True, exist_ok=True)
+def dump_docker_compose(data: Dict, stream: IO[str]) -> None:
+    """
+    Serialize docker-compose data to a stream (block style, key order kept).
 
-    # Write YAML with nice formatting
-    with open(path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(
-            data,
-            f,
-            default_flow_style=False,
-            sort_keys=False,
-            allow_unicode=True,
-            width=120,
-        )
+    Args:
+        data: Docker compose data structure
+        stream: Text stream to write to
+    """
+    yaml.dump(
+        data,
+        stream,
+        Dumper=SafeDumper,
+        default_flow_style=False,
+        sort_keys=False,
+        allow_unicode=True,
+        width=120,
+    )
 
 
 def classify_secret(key: str, value: str) -> bool:
@@ -387,6 +506,7 @@ def classify_secret(key: str, value: str) -> bool:
 
     Returns True if the value should be tokenized (likely a secret),
     False if it should be sent as plaintext (likely configuration).
+    Delegates to the shared compiled classifier (see classifier.py).
 
     Args:
         key: Environment variable key
@@ -395,168 +515,25 @@ def classify_secret(key: str, value: str) -> bool:
     Returns:
         True if likely a secret, False if likely config
     """
-    if not value or not isinstance(value, str):
-        return False
-
-    # Normalize for comparison
-    key_upper = key.upper()
-    value_lower = value.lower()
-
-    # 1. Non-secret key patterns (common configuration keys)
-    NON_SECRET_KEYS = {
-        "PORT",
-        "PORTS",
-        "HOST",
-        "HOSTNAME",
-        "DOMAIN",
-        "URL",
-        "ENVIRONMENT",
-        "ENV",
-        "NODE_ENV",
-        "DEBUG",
-        "LOG_LEVEL",
-        "LOGLEVEL",
-        "TIMEZONE",
-        "TZ",
-        "PUID",
-        "PGID",
-        "UMASK",
-        "LANG",
-        "LANGUAGE",
-        "LC_ALL",
-        "PATH",
-        "HOME",
-        "USER",
-        "UID",
-        "GID",
-        "WORKDIR",
-        "VERSION",
-    }
-
-    if key_upper in NON_SECRET_KEYS:
-        return False
-
-    # 2. Public URLs (not secrets)
-    if value.startswith(("http://", "https://", "ftp://", "ws://", "wss://")):
-        return False
-
-    # 3. Boolean/simple values (not secrets)
-    if value_lower in (
-        "true",
-        "false",
-        "yes",
-        "no",
-        "1",
-        "0",
-        "enabled",
-        "disabled",
-        "on",
-        "off",
-    ):
-        return False
-
-    # 4. Too short to be a secret (< 8 characters)
-    if len(value) < 8:
-        return False
-
-    # 5. Numeric-only values (ports, IDs, etc.)
-    if value.isdigit():
-        return False
-
-    # 6. Path patterns (file paths, not secrets)
-    if value.startswith(("/", "./", "../")) and "/" in value:
-        return False
-
-    # 7. Variable expansion syntax (references, not secrets)
-    if "${" in value or "$(" in value:
-        return False
-
-    # 8. Secret key patterns (strong indicators of secrets)
-    SECRET_KEY_PATTERNS = [
-        "PASSWORD",
-        "PASSWD",
-        "PWD",
-        "SECRET",
-        "TOKEN",
-        "API_KEY",
-        "APIKEY",
-        "API",
-        "KEY",
-        "PRIVATE_KEY",
-        "PRIV_KEY",
-        "AUTH",
-        "CREDENTIAL",
-        "CREDS",
-        "SALT",
-        "HASH",
-        "ENCRYPTION_KEY",
-        "ENCRYPT",
-        "SIGNATURE",
-        "CERT",
-        "CERTIFICATE",
-        "LICENSE",
-        "SESSION",
-    ]
-
-    for pattern in SECRET_KEY_PATTERNS:
-        if pattern in key_upper:
-            return True
-
-    # 9. High entropy check (potential random secrets)
-    # Only for longer values (>= 16 chars)
-    if len(value) >= 16:
-        try:
-            # Calculate Shannon entropy
-            freq = Counter(value)
-            entropy = -sum(
-                (count / len(value)) * math.log2(count / len(value)) for count in freq.values()
-            )
-
-            # High entropy (>= 3.5 bits per character) suggests random string
-            # This catches API keys, tokens, UUIDs, etc.
-            if entropy >= 3.5:
-                return True
-        except (ValueError, ZeroDivisionError):
-            pass
-
-    # 10. Default: if uncertain and long enough, treat as secret (safer)
-    # This ensures we don't accidentally expose secrets
-    if len(value) >= 20:
-        return True
-
-    return False
+    return get_classifier().classify(key, value)
 
 
 def backup_file(file_path: str) -> str:
     """
-    Create timestamped backup of file.
+    Back up a file to the content-addressed backup store (see backup_store.py).
 
     Args:
         file_path: Path to file to backup
 
     Returns:
-        Backup file path
+        Backup reference (`PATH@DIGEST`, restorable with `vault-backup restore`)
 
     Raises:
         FileNotFoundError: If original file doesn't exist
     """
-    path = Path(file_path)
-
-    if not path.exists():
-        raise FileNotFoundError(f"Cannot backup non-existent file: {file_path}")
+    from .backup_store import get_backup_store
 
-    # Generate timestamp: YYYYMMDD_HHMMSS
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    # Create backup path
-    backup_path = path.parent / f"{path.name}.backup.{timestamp}"
-
-    # Copy file
-    from shutil import copy2
-
-    copy2(path, backup_path)
-
-    return str(backup_path)
+    return get_backup_store().backup(file_path).ref
 
 
 def extract_compose_secrets(compose_data: Dict, service_name: str) -> Dict[str, str]:
@@ -580,15 +557,16 @@ def extract_compose_secrets(compose_data: Dict, service_name: str) -> Dict[str,
 
     # Environment can be dict or list format
     if isinstance(environment, dict):
-        for key, value in environment.items():
-            if isinstance(value, str) and classify_secret(key, value):
-                secrets[key] = value
+        candidates = [(k, v) for k, v in environment.items() if isinstance(v, str)]
     elif isinstance(environment, list):
-        for item in environment:
-            if "=" in item:
-                key, value = item.split("=", 1)
-                if classify_secret(key, value):
-                    secrets[key] = value
+        candidates = [tuple(item.split("=", 1)) for item in environment if "=" in item]
+    else:
+        candidates = []
+
+    verdicts = get_classifier().classify_batch(candidates)
+    for (key, value), is_secret in zip(candidates, verdicts):
+        if is_secret:
+            secrets[key] = value
 
     return secrets
 
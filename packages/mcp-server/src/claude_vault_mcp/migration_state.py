@@ -5,6 +5,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from .atomic_io import atomic_write
+
 # Default state file location
 STATE_FILE = Path.home() / ".claude-vault" / "migration-state.json"
 
@@ -34,12 +36,7 @@ def save_migration_state(state: Dict) -> None:
     Args:
         state: Migration state dict to save
     """
-    # Ensure directory exists
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-    # Write state file
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+    atomic_write(STATE_FILE, json.dumps(state, indent=2))
 
 
 def mark_scanned(service: str, file_paths: List[str], secret_count: int) -> None:
@@ -102,7 +99,7 @@ def mark_replaced(service: str, backup_path: str) -> None:
 
     Args:
         service: Service name
-        backup_path: Path to backup file created
+        backup_path: Backup reference (see file_parsers.backup_file)
     """
     state = load_migration_state()
 
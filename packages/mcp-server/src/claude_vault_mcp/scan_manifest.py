@@ -0,0 +1,338 @@
+"""
+Scan manifest: incremental workspace rescans with deltas.
+
+Records, per scanned file, its stat identity, content digest and
+classification (secret labels with keyed digests of their values, never the
+values) in ~/.claude-vault/scan-manifest.json. A rescan only reads files
+whose identity changed (or whose mtime is too recent to trust, see
+file_parsers.RACY_WINDOW_NS) and only re-classifies files whose content
+changed, so a drift check on a stable workspace costs one stat() per file.
+
+The manifest is the baseline of the last recorded scan (vault_scan_workspace
+records it after an approved scan). Deltas against it report new files and
+secrets, removed ones, and secrets whose value changed.
+
+Example:
+    manifest = get_scan_manifest()
+    scan, delta = manifest.rescan()
+    if not delta.is_empty:
+        print(delta.summary())
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .atomic_io import atomic_write
+from .classifier import get_classifier
+from .file_parsers import RACY_WINDOW_NS
+from .workspace_scan import (
+    FileScan,
+    WorkspaceScan,
+    content_digest,
+    discover_files,
+    file_identity,
+    scan_files,
+)
+
+# Default manifest and digest key locations
+MANIFEST_FILE = Path.home() / ".claude-vault" / "scan-manifest.json"
+MANIFEST_KEY_FILE = Path.home() / ".claude-vault" / "scan-manifest.key"
+
+# Bumped when the entry format changes (older manifests are discarded)
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ScanDelta:
+    """Changes between the manifest baseline and a rescan."""
+
+    new_files: List[str] = field(default_factory=list)
+    removed_files: List[str] = field(default_factory=list)
+    changed_files: List[str] = field(default_factory=list)  # Content changed
+    # Secret labels per file path
+    new_secrets: Dict[str, List[str]] = field(default_factory=dict)
+    removed_secrets: Dict[str, List[str]] = field(default_factory=dict)
+    changed_secrets: Dict[str, List[str]] = field(default_factory=dict)  # Value changed
+    rescanned: int = 0  # Files parsed and classified
+    unchanged: int = 0  # Files reused from the manifest
+
+    @property
+    def is_empty(self) -> bool:
+        """True if nothing changed since the baseline."""
+        return not (
+            self.new_files
+            or self.removed_files
+            or self.changed_files
+            or self.new_secrets
+            or self.removed_secrets
+            or self.changed_secrets
+        )
+
+    def summary(self) -> Dict:
+        """JSON-serializable delta (labels only, no values or digests)."""
+        return {
+            "new_files": self.new_files,
+            "removed_files": self.removed_files,
+            "changed_files": self.changed_files,
+            "new_secrets": self.new_secrets,
+            "removed_secrets": self.removed_secrets,
+            "changed_secrets": self.changed_secrets,
+            "rescanned": self.rescanned,
+            "unchanged": self.unchanged,
+        }
+
+
+def _entry(result: FileScan, rules: str) -> Dict:
+    """Manifest entry for a scan result (recorded with a digest key)."""
+    return {
+        "rules": rules,
+        "service": result.service,
+        "kind": result.kind,
+        "identity": list(result.identity) if result.identity else None,
+        "digest": result.digest,
+        "secrets": dict(result.value_digests),
+        "config_count": result.config_count,
+        "error": result.error,
+    }
+
+
+def _result(path: str, entry: Dict) -> FileScan:
+    """Scan result (labels only) rebuilt from a manifest entry."""
+    return FileScan(
+        path=path,
+        service=entry["service"],
+        kind=entry["kind"],
+        secrets=dict.fromkeys(entry["secrets"]),
+        config_count=entry["config_count"],
+        error=entry["error"],
+        identity=tuple(entry["identity"]) if entry["identity"] else None,
+        digest=entry["digest"],
+        value_digests=dict(entry["secrets"]),
+    )
+
+
+def diff_entries(old: Dict[str, Dict], new: Dict[str, Dict]) -> ScanDelta:
+    """
+    Compare two sets of manifest entries.
+
+    Args:
+        old: Baseline entries by path
+        new: Current entries by path
+
+    Returns:
+        ScanDelta (rescanned/unchanged left at 0)
+    """
+    delta = ScanDelta()
+    for path in sorted(old.keys() | new.keys()):
+        before = old[path]["secrets"] if path in old else {}
+        after = new[path]["secrets"] if path in new else {}
+        if path not in old:
+            delta.new_files.append(path)
+        elif path not in new:
+            delta.removed_files.append(path)
+        elif old[path]["digest"] != new[path]["digest"]:
+            delta.changed_files.append(path)
+
+        added = [label for label in after if label not in before]
+        removed = [label for label in before if label not in after]
+        changed = [
+            label for label in after if label in before and after[label] != before[label]
+        ]
+        if added:
+            delta.new_secrets[path] = added
+        if removed:
+            delta.removed_secrets[path] = removed
+        if changed:
+            delta.changed_secrets[path] = changed
+    return delta
+
+
+def _rules_digest() -> str:
+    """Short fingerprint of the classifier rules entries were produced with."""
+    return get_classifier().digest[:16]
+
+
+def _under(path: str, roots: List[Path]) -> bool:
+    return any(Path(path).is_relative_to(root) for root in roots)
+
+
+class ScanManifest:
+    """
+    Per-file scan results persisted between scans.
+
+    Entries are only reused while the classifier rules they were produced
+    with are unchanged; after a rules change files are rescanned (and the
+    delta shows what the new rules classify differently).
+    """
+
+    def __init__(self, path: Optional[Path] = None, key_path: Optional[Path] = None):
+        """
+        Load the manifest and its digest key.
+
+        Args:
+            path: Manifest file (default: ~/.claude-vault/scan-manifest.json)
+            key_path: Value digest key (default: ~/.claude-vault/scan-manifest.key,
+                generated on first use, mode 0600)
+        """
+        self.path = Path(path) if path else MANIFEST_FILE
+        self.key = self._load_key(Path(key_path) if key_path else MANIFEST_KEY_FILE)
+        self._lock = threading.Lock()
+
+        data = self._load()
+        if data.get("version") != MANIFEST_VERSION:
+            data = {}
+        self.scanned_at: Optional[str] = data.get("scanned_at")
+        self.files: Dict[str, Dict] = data.get("files", {})
+
+    @staticmethod
+    def _load_key(key_path: Path) -> bytes:
+        try:
+            return key_path.read_bytes()
+        except FileNotFoundError:
+            key = secrets.token_bytes(32)
+            key_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(key)
+            return key
+
+    def _load(self) -> Dict:
+        """Read the manifest (empty if missing or unreadable)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, IOError):
+            return {}
+
+    def save(self) -> None:
+        """Write the manifest atomically (mode 0600: it holds value digests)."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "scanned_at": self.scanned_at,
+            "files": self.files,
+        }
+        atomic_write(self.path, json.dumps(data), mode=0o600)
+
+    @staticmethod
+    def _unchanged(path: str, entry: Optional[Dict], rules: str) -> bool:
+        """Check whether a file still matches its entry (stat, then content if racy)."""
+        if entry is None or entry["rules"] != rules or entry["identity"] is None:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if list(file_identity(st)) != entry["identity"]:
+            return False
+        if time.time_ns() - st.st_mtime_ns >= RACY_WINDOW_NS:
+            return True
+        # Modified within one timestamp tick of the last scan: the identity
+        # alone does not prove the content is the same
+        try:
+            with open(path, "rb") as f:
+                return content_digest(f.read()) == entry["digest"]
+        except OSError:
+            return False
+
+    def rescan(
+        self,
+        roots: Optional[Iterable[Path]] = None,
+        max_workers: Optional[int] = None,
+        record: bool = True,
+    ) -> Tuple[WorkspaceScan, ScanDelta]:
+        """
+        Scan the workspace, re-reading only new and changed files.
+
+        Args:
+            roots: Directories to scan (default: the allowed roots)
+            max_workers: Pool size (default: VAULT_SCAN_WORKERS or CPU count)
+            record: Make this scan the new baseline (and save the manifest)
+
+        Returns:
+            (WorkspaceScan without values, ScanDelta against the baseline)
+        """
+        if roots is None:
+            from .security import get_allowed_roots
+
+            roots = [r for r in get_allowed_roots().roots if r.is_dir()]
+        roots = [Path(r) for r in roots]
+
+        rules = _rules_digest()
+        files = discover_files(roots)
+        with self._lock:
+            baseline = {p: e for p, e in self.files.items() if _under(p, roots)}
+        stale = [f for f in files if not self._unchanged(f[0], baseline.get(f[0]), rules)]
+
+        results = scan_files(stale, max_workers=max_workers, digest_key=self.key)
+        scanned = {r.path: r for r in results}
+        current = {}
+        scan = WorkspaceScan(roots=[str(r) for r in roots])
+        for path, service, _ in files:
+            result = scanned.get(path) or _result(path, baseline[path])
+            current[path] = _entry(result, rules)
+            scan.services.setdefault(service, []).append(result)
+
+        delta = diff_entries(baseline, current)
+        delta.rescanned = len(stale)
+        delta.unchanged = len(files) - len(stale)
+        if record:
+            self._replace(roots, current)
+        return scan, delta
+
+    def compare(self, results: Iterable[FileScan], roots: Iterable[Path]) -> ScanDelta:
+        """
+        Delta of up-to-date results (e.g. from the watcher) against the baseline.
+
+        Args:
+            results: Results scanned with this manifest's digest key
+            roots: Roots the results cover
+
+        Returns:
+            ScanDelta (every file counted as unchanged: nothing was re-read)
+        """
+        rules = _rules_digest()
+        roots = [Path(r) for r in roots]
+        with self._lock:
+            baseline = {p: e for p, e in self.files.items() if _under(p, roots)}
+        current = {r.path: _entry(r, rules) for r in results}
+        delta = diff_entries(baseline, current)
+        delta.unchanged = len(current)
+        return delta
+
+    def record(self, results: Iterable[FileScan], roots: Iterable[Path]) -> None:
+        """
+        Make scan results the new baseline for their roots.
+
+        Args:
+            results: Results scanned with this manifest's digest key
+            roots: Roots the results cover (entries for other files under
+                them are dropped)
+        """
+        rules = _rules_digest()
+        self._replace([Path(r) for r in roots], {r.path: _entry(r, rules) for r in results})
+
+    def _replace(self, roots: List[Path], entries: Dict[str, Dict]) -> None:
+        with self._lock:
+            self.files = {p: e for p, e in self.files.items() if not _under(p, roots)}
+            self.files.update(entries)
+            self.scanned_at = datetime.utcnow().isoformat() + "Z"
+            self.save()
+
+
+# Global manifest
+_global_manifest: Optional[ScanManifest] = None
+
+
+def get_scan_manifest() -> ScanManifest:
+    """Get the shared scan manifest."""
+    global _global_manifest
+    if _global_manifest is None:
+        _global_manifest = ScanManifest()
+    return _global_manifest
@@ -1,10 +1,28 @@
 """Security validation, confirmation prompts, and audit logging."""
 
+import os
 import re
-import sys
-from datetime import datetime
+import stat
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .audit import AuditSink, default_audit_path, get_audit_sink, utc_timestamp
+
+# Service and key names: letters, numbers, dash, underscore (checked with fullmatch)
+_NAME_RE = re.compile(r"[a-zA-Z0-9_-]+")
+
+# Directories file tools may read/write (override with VAULT_ALLOWED_DIRS,
+# os.pathsep-separated)
+DEFAULT_ALLOWED_DIRS = [
+    "/workspace/proxmox-services",
+    "/workspace/configs",
+    "/mnt/proxmox-services",  # Alternative mount point
+]
+
+# Recently validated paths kept by AllowedRoots
+PATH_CACHE_SIZE = 4096
 
 
 class ValidationError(Exception):
@@ -13,6 +31,157 @@ class ValidationError(Exception):
     pass
 
 
+def _identity(st: os.stat_result) -> tuple:
+    """File identity used to detect a validated path being swapped."""
+    return (st.st_dev, st.st_ino, st.st_mode, st.st_ctime_ns)
+
+
+class AllowedRoots:
+    """
+    Allowed base directories, resolved once into a prefix trie.
+
+    check() resolves a path once and walks the trie component by component,
+    instead of trying relative_to() against every base. Validated paths are
+    kept in an LRU together with the identity of the file they named
+    (st_dev, st_ino, plus st_mode and st_ctime_ns since inode numbers are
+    reused immediately after an unlink). A repeat check costs one lstat(), and
+    any change of identity (file replaced, symlink swapped in, directory
+    re-pointed) forces a full re-validation. Paths that do not exist yet are never cached.
+
+    Example:
+        roots = AllowedRoots(["/workspace/proxmox-services"])
+        roots.check("/workspace/proxmox-services/app/.env")
+    """
+
+    _LEAF = ""  # Marks the end of a root in the trie (never a path component)
+
+    def __init__(self, dirs: Sequence[str], cache_size: int = PATH_CACHE_SIZE):
+        """
+        Resolve roots and build the trie.
+
+        Args:
+            dirs: Allowed base directories
+            cache_size: Maximum number of validated paths to remember
+        """
+        self.roots = [Path(os.path.realpath(d)) for d in dirs]
+        self.cache_size = cache_size
+        self._trie: dict = {}
+        for root in self.roots:
+            node = self._trie
+            for part in root.parts:
+                node = node.setdefault(part, {})
+            node[self._LEAF] = True
+
+        self._cache: "OrderedDict[str, Tuple[tuple, Path]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def contains(self, resolved: Path) -> bool:
+        """Check whether an already-resolved path lies under an allowed root."""
+        node = self._trie
+        for part in resolved.parts:
+            if self._LEAF in node:
+                return True
+            node = node.get(part)
+            if node is None:
+                return False
+        return self._LEAF in node
+
+    def check(self, path: str) -> Path:
+        """
+        Validate that a path resolves inside an allowed root.
+
+        Args:
+            path: File path to validate
+
+        Returns:
+            Resolved absolute path
+
+        Raises:
+            ValidationError: If the path is invalid, outside the roots, or a symlink
+        """
+        key = os.fspath(path)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            try:
+                st = os.lstat(key)
+            except OSError:
+                st = None
+            if st is not None and _identity(st) == cached[0]:
+                with self._lock:
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                return cached[1]
+
+        try:
+            resolved = Path(os.path.realpath(key))
+        except (OSError, ValueError) as e:
+            raise ValidationError(f"Invalid file path: {e}")
+
+        if not self.contains(resolved):
+            raise ValidationError(
+                f"File path outside allowed directories: {path}\n"
+                f"Allowed directories: {', '.join(str(d) for d in self.roots)}"
+            )
+
+        try:
+            st = os.lstat(resolved)
+        except OSError:
+            return resolved  # Not created yet: valid, but not cacheable
+
+        # Prevent symlink attacks
+        if stat.S_ISLNK(st.st_mode):
+            raise ValidationError("Symlinks not allowed for security reasons")
+
+        # Identity as seen through the path as given (what the next lstat sees)
+        try:
+            given = os.lstat(key) if key != str(resolved) else st
+        except OSError:
+            return resolved
+        with self._lock:
+            self._cache[key] = (_identity(given), resolved)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return resolved
+
+    def clear_cache(self) -> None:
+        """Forget all validated paths."""
+        with self._lock:
+            self._cache.clear()
+
+
+# Global instance (roots are resolved once per process)
+_allowed_roots: Optional[AllowedRoots] = None
+
+
+def get_allowed_roots() -> AllowedRoots:
+    """
+    Get or create the process-wide allowed roots.
+
+    Roots come from VAULT_ALLOWED_DIRS (os.pathsep-separated) if set, else
+    DEFAULT_ALLOWED_DIRS.
+
+    Returns:
+        AllowedRoots instance
+    """
+    global _allowed_roots
+
+    if _allowed_roots is None:
+        env_dirs = os.getenv("VAULT_ALLOWED_DIRS")
+        dirs = [d for d in env_dirs.split(os.pathsep) if d] if env_dirs else DEFAULT_ALLOWED_DIRS
+        _allowed_roots = AllowedRoots(dirs)
+
+    return _allowed_roots
+
+
+def reset_allowed_roots() -> None:
+    """Drop the cached roots so the next call re-reads VAULT_ALLOWED_DIRS."""
+    global _allowed_roots
+
+    _allowed_roots = None
+
+
 class SecurityValidator:
     """Validates inputs to prevent injection attacks and enforce naming rules."""
 
@@ -28,6 +197,19 @@ class SecurityValidator:
         (r"\r", "carriage return"),
     ]
 
+    # All dangerous patterns as one alternation (group d<i> = DANGEROUS_PATTERNS[i]),
+    # so a value is scanned once however many patterns there are
+    _DANGEROUS_RE = re.compile(
+        "|".join(f"(?P<d{i}>{pattern})" for i, (pattern, _) in enumerate(DANGEROUS_PATTERNS))
+    )
+    # First character of every pattern above; a character-class scan is far
+    # cheaper than the alternation and clears almost every value on its own
+    _DANGEROUS_CHARS = re.compile(r"[$`&|;\n\r]")
+
+    MAX_SERVICE_NAME_LENGTH = 64
+    MAX_KEY_NAME_LENGTH = 128
+    MAX_SECRET_VALUE_BYTES = 8192
+
     @staticmethod
     def validate_service_name(name: str) -> None:
         """
@@ -42,10 +224,10 @@ class SecurityValidator:
         if not name:
             raise ValidationError("Service name cannot be empty")
 
-        if len(name) > 64:
+        if len(name) > SecurityValidator.MAX_SERVICE_NAME_LENGTH:
             raise ValidationError("Service name too long (max 64 characters)")
 
-        if not re.match(r"^[a-zA-Z0-9_-]+$", name):
+        if not _NAME_RE.fullmatch(name):
             raise ValidationError(
                 "Service name must contain only letters, numbers, dash, and underscore. "
                 "This prevents path traversal and injection attacks."
@@ -71,10 +253,10 @@ class SecurityValidator:
         if not name:
             raise ValidationError("Key name cannot be empty")
 
-        if len(name) > 128:
+        if len(name) > SecurityValidator.MAX_KEY_NAME_LENGTH:
             raise ValidationError("Key name too long (max 128 characters)")
 
-        if not re.match(r"^[a-zA-Z0-9_-]+$", name):
+        if not _NAME_RE.fullmatch(name):
             raise ValidationError(
                 "Key name must contain only letters, numbers, dash, and underscore"
             )
@@ -88,13 +270,19 @@ class SecurityValidator:
             value: Secret value to scan
 
         Returns:
-            List of detected pattern descriptions (empty if clean)
+            List of detected pattern descriptions (empty if clean), each
+            reported once, in DANGEROUS_PATTERNS order
         """
-        warnings = []
-        for pattern, description in SecurityValidator.DANGEROUS_PATTERNS:
-            if re.search(pattern, value):
-                warnings.append(description)
-        return warnings
+        if not SecurityValidator._DANGEROUS_CHARS.search(value):
+            return []
+        hits = {match.lastgroup for match in SecurityValidator._DANGEROUS_RE.finditer(value)}
+        if not hits:
+            return []
+        return [
+            description
+            for i, (_, description) in enumerate(SecurityValidator.DANGEROUS_PATTERNS)
+            if f"d{i}" in hits
+        ]
 
     @staticmethod
     def validate_secret_value(value: str) -> None:
@@ -107,9 +295,50 @@ class SecurityValidator:
         Raises:
             ValidationError if value is invalid
         """
-        if len(value) > 8192:
+        if len(value) > SecurityValidator.MAX_SECRET_VALUE_BYTES:
             raise ValidationError("Secret value too long (max 8KB to prevent DoS)")
 
+    @staticmethod
+    def validate_secrets_batch(secrets: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """
+        Validate a whole secrets dict, collecting every problem.
+
+        Unlike calling validate_key_name/validate_secret_value in a loop, this
+        does not stop at the first invalid entry.
+
+        Args:
+            secrets: Dictionary of key → value to be written
+
+        Returns:
+            Tuple of (errors, warnings), each entry prefixed with "KEY: ".
+            Any error means the batch must be rejected; warnings are the
+            dangerous patterns found in otherwise valid values.
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+
+        for key, value in secrets.items():
+            try:
+                SecurityValidator.validate_key_name(key)
+            except ValidationError as e:
+                errors.append(f"{key}: {e}")
+
+            if not isinstance(value, str):
+                errors.append(f"{key}: Secret value must be a string")
+                continue
+
+            try:
+                SecurityValidator.validate_secret_value(value)
+            except ValidationError as e:
+                errors.append(f"{key}: {e}")
+                continue
+
+            warnings.extend(
+                f"{key}: {w}" for w in SecurityValidator.detect_dangerous_patterns(value)
+            )
+
+        return errors, warnings
+
     @staticmethod
     def validate_file_path(path: str, service: str = None) -> None:
         """
@@ -125,40 +354,8 @@ class SecurityValidator:
         if not path:
             raise ValidationError("File path cannot be empty")
 
-        # Resolve to absolute path
-        try:
-            abs_path = Path(path).resolve()
-        except Exception as e:
-            raise ValidationError(f"Invalid file path: {e}")
-
-        # Allowed base directories
-        allowed_dirs = [
-            Path("/workspace/proxmox-services"),
-            Path("/workspace/configs"),
-            Path("/mnt/proxmox-services"),  # Alternative mount point
-        ]
-
-        # Check if path is within allowed directories
-        is_allowed = False
-        for base_dir in allowed_dirs:
-            try:
-                # Check if abs_path is relative to base_dir
-                abs_path.relative_to(base_dir)
-                is_allowed = True
-                break
-            except ValueError:
-                # Not relative to this base dir, try next
-                continue
-
-        if not is_allowed:
-            raise ValidationError(
-                f"File path outside allowed directories: {path}\n"
-                f"Allowed directories: {', '.join(str(d) for d in allowed_dirs)}"
-            )
-
-        # Prevent symlink attacks
-        if abs_path.exists() and abs_path.is_symlink():
-            raise ValidationError("Symlinks not allowed for security reasons")
+        # Resolve once and walk the allowed-roots trie (cached per path)
+        get_allowed_roots().check(path)
 
     @staticmethod
     def validate_file_size(file_path: str, max_size_mb: int = 5) -> None:
@@ -247,21 +444,31 @@ class ConfirmationPrompt:
 
 
 class AuditLogger:
-    """Audit logging for all Vault operations."""
+    """
+    Audit logging for all Vault operations.
+
+    Entries are structured JSON Lines records handed to the process-wide
+    AuditSink for the log (see audit.py), which writes, rotates and
+    compresses them from a background thread; log() never opens a file.
+    """
 
     def __init__(self, log_path: str = None):
         """
         Initialize audit logger.
 
         Args:
-            log_path: Path to audit log file (default: .claude-vault-audit.log in repo root)
+            log_path: Path to the active audit segment
+                (default: ~/.claude-vault/audit/audit.jsonl, or VAULT_AUDIT_LOG)
         """
-        if log_path is None:
-            # Default to repo root
-            repo_root = Path(__file__).parent.parent.parent.parent
-            self.log_path = repo_root / ".claude-vault-audit.log"
-        else:
-            self.log_path = Path(log_path)
+        self.log_path = Path(log_path) if log_path else default_audit_path()
+        self._sink: Optional[AuditSink] = None
+
+    @property
+    def sink(self) -> AuditSink:
+        """Sink for the log, created on first use (loggers are built at import)."""
+        if self._sink is None:
+            self._sink = get_audit_sink(self.log_path)
+        return self._sink
 
     def log(self, action: str, service: str, details: str, user: str = "mcp-server"):
         """
@@ -273,13 +480,16 @@ class AuditLogger:
             details: Additional details
             user: User/source of the action
         """
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-        log_entry = "[{0}] USER={1} ACTION={2} SERVICE={3} DETAILS={4}\n".format(
-            timestamp, user, action, service, details
+        self.sink.write(
+            {
+                "ts": utc_timestamp(),
+                "user": user,
+                "action": action,
+                "service": service,
+                "details": details,
+            }
         )
 
-        try:
-            with open(self.log_path, "a") as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"Warning: Could not write to audit log: {e}", file=sys.stderr)
+    def flush(self):
+        """Block until every entry logged so far is on disk."""
+        self.sink.flush()
@@ -5,13 +5,15 @@ from typing import Sequence
 from mcp.server import Server
 from mcp.types import TextContent, Tool
 
+from .tokenization import flush_token_vault
+from .tools.audit import VaultAuditQueryTool
 from .tools.auth import VaultLoginTool, VaultLogoutTool
 from .tools.example import VaultGenerateExampleTool
 from .tools.inject import VaultInjectTool
 
 # Import all tool handlers
-from .tools.read import VaultGetTool, VaultListTool, VaultStatusTool
-from .tools.scan import VaultScanComposeTool, VaultScanEnvTool
+from .tools.read import VaultGetTool, VaultListTool, VaultStatusTool, VaultTokensTool
+from .tools.scan import VaultScanComposeTool, VaultScanEnvTool, VaultScanWorkspaceTool
 from .tools.write import VaultSetTool
 
 # Create MCP server
@@ -24,11 +26,14 @@ TOOL_HANDLERS = {
     "vault_logout": VaultLogoutTool(),
     "vault_list": VaultListTool(),
     "vault_get": VaultGetTool(),
+    "vault_tokens": VaultTokensTool(),
     "vault_set": VaultSetTool(),
     "vault_inject": VaultInjectTool(),
     "vault_scan_env": VaultScanEnvTool(),
     "vault_scan_compose": VaultScanComposeTool(),
+    "vault_scan_workspace": VaultScanWorkspaceTool(),
     "vault_generate_example": VaultGenerateExampleTool(),
+    "vault_audit_query": VaultAuditQueryTool(),
 }
 
 
@@ -83,3 +88,6 @@ This is an unexpected error. Please check:
 Error details: {type(e).__name__}: {str(e)}""",
             )
         ]
+    finally:
+        # Seal tokens issued during this call in one write (see TokenVault.flush)
+        flush_token_vault()
@@ -0,0 +1,370 @@
+"""
+Local token-resolution service shared between processes.
+
+The MCP server owns the TokenVault, but the standalone approval server
+(`vault-approve-server`) runs in a separate process. Instead of detokenizing
+secrets up front and copying plaintext into pending-operations.json, the MCP
+process exposes its vault over a Unix domain socket and the approval server
+resolves tokens on demand, in one batched round trip per page render.
+
+Protocol: one JSON request per line, one JSON response per line.
+    {"op": "resolve", "op_id": "...", "tokens": ["@token-...", ...]}
+    → {"values": {"@token-...": "..."}, "unknown": ["@token-..."]}
+    {"op": "ping"}
+    → {"ok": true, "session_id": "sess-..."}
+
+A resolve request must name a live (unexpired) pending operation, and only
+tokens that appear in that operation's secrets are resolved; anything else is
+reported as unknown. The socket is created with owner-only permissions and, on
+Linux, peers with a different UID are rejected via SO_PEERCRED.
+
+The service is opt-in (VAULT_TOKEN_SERVICE=true). Any process running as the
+same user can still connect, read pending-operations.json and create pending
+operations, so enable it only when the AI's shell tools run sandboxed or as a
+different user.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .tokenization import TokenVault, get_token_vault
+
+# Default socket location, and the pending operations that scope lookups
+SOCKET_PATH = Path.home() / ".claude-vault" / "token-resolver.sock"
+PENDING_OPS_FILE = Path.home() / ".claude-vault" / "pending-operations.json"
+
+# Pending operations expire after 5 minutes (as in the approval server)
+PENDING_OP_TTL = 300
+
+# Upper bound for a single request line (batched lookups stay far below this)
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class TokenServiceUnavailable(Exception):
+    """Raised when the token-resolution service cannot be reached."""
+
+    pass
+
+
+def pending_op_tokens(op_id: str, path: Optional[Path] = None) -> Optional[Set[str]]:
+    """
+    Return the tokens referenced by a live pending operation.
+
+    Args:
+        op_id: Pending operation ID
+        path: pending-operations.json (default: ~/.claude-vault/pending-operations.json)
+
+    Returns:
+        Set of token strings, or None if the operation is unknown or expired
+    """
+    try:
+        data = json.loads(Path(path or PENDING_OPS_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+
+    op = data.get(op_id) if isinstance(data, dict) else None
+    if not isinstance(op, dict) or op.get("approved"):
+        return None
+    if time.time() - op.get("created_at", 0) > PENDING_OP_TTL:
+        return None
+
+    return {
+        value
+        for value in (op.get("secrets") or {}).values()
+        if isinstance(value, str) and value.startswith("@token-")
+    }
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    """Return the UID of the connected peer (Linux only), or None if unknown."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid
+
+
+class _ResolveHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests on one connection."""
+
+    def handle(self):
+        peer_uid = _peer_uid(self.connection)
+        if peer_uid is not None and peer_uid != os.getuid():
+            return
+
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            if not line:
+                break
+
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except (ValueError, TypeError, AttributeError) as e:
+                response = {"error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server bound to a vault getter."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        vault_getter: Callable[[], TokenVault],
+        op_lookup: Callable[[str], Optional[Set[str]]],
+    ):
+        self.vault_getter = vault_getter
+        self.op_lookup = op_lookup
+        super().__init__(path, _ResolveHandler)
+
+    def dispatch(self, request: dict) -> dict:
+        """Execute a single protocol request."""
+        op = request.get("op")
+        vault = self.vault_getter()
+
+        if op == "ping":
+            return {"ok": True, "session_id": vault.session_id}
+
+        if op == "resolve":
+            op_id = request.get("op_id")
+            allowed = self.op_lookup(op_id) if isinstance(op_id, str) else None
+            if allowed is None:
+                return {"error": "Unknown or expired pending operation"}
+
+            values = {}
+            unknown = []
+            for token in request.get("tokens", []):
+                if not isinstance(token, str) or token not in allowed:
+                    unknown.append(token)
+                    continue
+                try:
+                    values[token] = vault.detokenize(token)
+                except ValueError:
+                    unknown.append(token)
+            return {"values": values, "unknown": unknown}
+
+        return {"error": f"Unknown op: {op}"}
+
+
+class TokenResolutionServer:
+    """
+    Serves token lookups from this process's TokenVault over a Unix socket.
+
+    Lookups are scoped to the tokens of one live pending operation.
+
+    Example:
+        server = TokenResolutionServer()
+        server.start()
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[Path] = None,
+        vault_getter: Callable[[], TokenVault] = get_token_vault,
+        op_lookup: Callable[[str], Optional[Set[str]]] = pending_op_tokens,
+    ):
+        """
+        Initialize resolution server.
+
+        Args:
+            socket_path: Unix socket path (default: ~/.claude-vault/token-resolver.sock)
+            vault_getter: Callable returning the vault to resolve against
+            op_lookup: Callable returning the tokens a pending operation may
+                resolve, or None if it is unknown or expired
+        """
+        self.socket_path = Path(socket_path) if socket_path else SOCKET_PATH
+        self.vault_getter = vault_getter
+        self.op_lookup = op_lookup
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Bind the socket and serve in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return  # Already running
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Remove a stale socket left behind by a previous process
+        if self.socket_path.exists():
+            if _socket_alive(self.socket_path):
+                raise TokenServiceUnavailable(
+                    f"Another token-resolution service is running at {self.socket_path}"
+                )
+            self.socket_path.unlink()
+
+        old_umask = os.umask(0o077)
+        try:
+            self._server = _UnixServer(str(self.socket_path), self.vault_getter, self.op_lookup)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.socket_path.unlink(missing_ok=True)
+
+
+class TokenResolutionClient:
+    """
+    Client for the token-resolution service.
+
+    Example:
+        client = TokenResolutionClient()
+        values = client.resolve(["@token-a8f3d9e1b2c4f7a9"], op_id)
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: float = 2.0):
+        """
+        Initialize client.
+
+        Args:
+            socket_path: Unix socket path (default: ~/.claude-vault/token-resolver.sock)
+            timeout: Socket timeout in seconds
+        """
+        self.socket_path = Path(socket_path) if socket_path else SOCKET_PATH
+        self.timeout = timeout
+
+    def _request(self, payload: dict) -> dict:
+        """Send one request and return the decoded response."""
+        if not hasattr(socket, "AF_UNIX") or not self.socket_path.exists():
+            raise TokenServiceUnavailable(f"No token-resolution service at {self.socket_path}")
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(str(self.socket_path))
+                sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+                with sock.makefile("rb") as f:
+                    line = f.readline()
+        except OSError as e:
+            raise TokenServiceUnavailable(f"Token-resolution service unreachable: {e}")
+
+        if not line:
+            raise TokenServiceUnavailable("Token-resolution service closed the connection")
+
+        response = json.loads(line)
+        if response.get("error"):
+            raise TokenServiceUnavailable(response["error"])
+        return response
+
+    def ping(self) -> bool:
+        """Check that the service is reachable."""
+        try:
+            return bool(self._request({"op": "ping"}).get("ok"))
+        except TokenServiceUnavailable:
+            return False
+
+    def resolve(self, tokens: Iterable[str], op_id: str) -> Dict[str, str]:
+        """
+        Resolve a batch of tokens in a single round trip.
+
+        Args:
+            tokens: Token strings like "@token-a8f3d9e1b2c4f7a9"
+            op_id: Live pending operation whose secrets reference the tokens
+
+        Returns:
+            Dict of token → value for every token the service resolved
+
+        Raises:
+            TokenServiceUnavailable: If the service cannot be reached or
+                rejects the operation
+        """
+        batch = sorted(set(tokens))
+        if not batch:
+            return {}
+        payload = {"op": "resolve", "op_id": op_id, "tokens": batch}
+        return self._request(payload).get("values", {})
+
+
+def _socket_alive(path: Path) -> bool:
+    """Check whether a live server is listening on a socket path."""
+    return TokenResolutionClient(path, timeout=0.5).ping()
+
+
+def resolve_tokens(tokens: Iterable[str], op_id: Optional[str] = None) -> Dict[str, str]:
+    """
+    Resolve tokens using the local vault first, then the shared service.
+
+    Works in both processes: inside the MCP server the local vault answers
+    directly, while the standalone approval server falls through to the
+    MCP process over the socket (only for the tokens of op_id).
+
+    Args:
+        tokens: Token strings to resolve
+        op_id: Pending operation the tokens belong to; required for the socket
+
+    Returns:
+        Dict of token → value for every token that could be resolved
+    """
+    pending: List[str] = sorted(set(tokens))
+    resolved: Dict[str, str] = {}
+
+    vault = get_token_vault()
+    for token in pending:
+        try:
+            resolved[token] = vault.detokenize(token)
+        except ValueError:
+            continue  # Unknown here (or expired); ask the service
+
+    missing = [t for t in pending if t not in resolved]
+    if missing and op_id:
+        try:
+            resolved.update(TokenResolutionClient().resolve(missing, op_id))
+        except TokenServiceUnavailable as e:
+            print(f"Warning: {e}", file=sys.stderr)
+
+    return resolved
+
+
+# Global instance (started by the MCP server process)
+_token_service: Optional[TokenResolutionServer] = None
+
+
+def start_token_service() -> Optional[TokenResolutionServer]:
+    """
+    Start the process-wide token-resolution service.
+
+    Opt-in with VAULT_TOKEN_SERVICE=true (see the module docstring for the
+    exposure), and a no-op on platforms without Unix domain sockets.
+
+    Returns:
+        Running server, or None if disabled or unavailable
+    """
+    global _token_service
+
+    if os.getenv("VAULT_TOKEN_SERVICE", "false").lower() not in ("1", "true", "yes", "on"):
+        return None
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    if _token_service is None:
+        server = TokenResolutionServer()
+        try:
+            server.start()
+        except (TokenServiceUnavailable, OSError) as e:
+            print(f"Warning: Token-resolution service not started: {e}", file=sys.stderr)
+            return None
+        _token_service = server
+
+    return _token_service
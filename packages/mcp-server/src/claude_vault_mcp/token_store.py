@@ -0,0 +1,174 @@
+"""
+Encrypted warm-restart persistence for the token vault.
+
+The MCP server has to be restarted after every `claude-vault login`, which
+used to drop every token handed out to the AI. When persistence is enabled
+(VAULT_TOKEN_PERSIST=true) the token map is sealed with AES-256-GCM and
+stored under ~/.claude-vault, so a restarted server can resolve the tokens
+of the previous process until the token session expires.
+
+The encryption key lives in the OS keyring when the optional `keyring`
+package is installed and has a usable backend, otherwise in a 0600 key file
+next to the sealed store.
+"""
+
+import base64
+import json
+import os
+import secrets
+import sys
+from pathlib import Path
+from typing import Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .atomic_io import atomic_write
+
+try:
+    import keyring
+except ImportError:  # pragma: no cover - optional dependency
+    keyring = None
+
+# Default storage locations
+STORE_DIR = Path.home() / ".claude-vault"
+STORE_FILE = STORE_DIR / "token-vault.bin"
+KEY_FILE = STORE_DIR / "token-vault.key"
+
+# Keyring entry holding the base64-encoded store key
+KEYRING_SERVICE = "claude-vault"
+KEYRING_USERNAME = "token-vault-key"
+
+# File header, also bound to the ciphertext as associated data
+MAGIC = b"CVTV1"
+NONCE_SIZE = 12
+
+
+class TokenStoreError(Exception):
+    """Raised when the token store cannot be read or written."""
+
+    pass
+
+
+class EncryptedTokenStore:
+    """
+    AEAD-sealed file holding a snapshot of a TokenVault.
+
+    Layout: MAGIC || nonce (12 bytes) || AES-GCM(json snapshot).
+
+    Example:
+        store = EncryptedTokenStore()
+        store.save({"session_id": "sess-...", "token_map": {...}})
+        snapshot = store.load()
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        key_path: Optional[Path] = None,
+        use_keyring: bool = True,
+    ):
+        """
+        Initialize token store.
+
+        Args:
+            path: Sealed store file (default: ~/.claude-vault/token-vault.bin)
+            key_path: Fallback key file (default: ~/.claude-vault/token-vault.key)
+            use_keyring: Try the OS keyring before the key file
+        """
+        self.path = Path(path) if path else STORE_FILE
+        self.key_path = Path(key_path) if key_path else KEY_FILE
+        self.use_keyring = use_keyring and keyring is not None
+        self._key: Optional[bytes] = None
+
+    def _get_key(self) -> bytes:
+        """Return the store key, creating it on first use."""
+        if self._key is None:
+            key = self._load_keyring_key() if self.use_keyring else None
+            if key is None:
+                key = self._load_file_key()
+            self._key = key
+        return self._key
+
+    def _load_keyring_key(self) -> Optional[bytes]:
+        """Load (or create) the key in the OS keyring; None if unavailable."""
+        try:
+            encoded = keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+            if encoded:
+                return base64.b64decode(encoded)
+
+            key = AESGCM.generate_key(bit_length=256)
+            keyring.set_password(
+                KEYRING_SERVICE, KEYRING_USERNAME, base64.b64encode(key).decode()
+            )
+            return key
+        except Exception:
+            # No usable keyring backend (headless Linux, containers, ...)
+            return None
+
+    def _load_file_key(self) -> bytes:
+        """Load (or create) the key file with owner-only permissions."""
+        if self.key_path.exists():
+            key = self.key_path.read_bytes()
+            if len(key) != 32:
+                raise TokenStoreError(f"Invalid token store key file: {self.key_path}")
+            return key
+
+        self.key_path.parent.mkdir(parents=True, exist_ok=True)
+        key = AESGCM.generate_key(bit_length=256)
+        fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def load(self) -> Optional[dict]:
+        """
+        Load and decrypt the stored snapshot.
+
+        Returns:
+            Snapshot dict, or None if no store exists
+
+        Raises:
+            TokenStoreError: If the store is corrupted or the key does not match
+        """
+        if not self.path.exists():
+            return None
+
+        blob = self.path.read_bytes()
+        if not blob.startswith(MAGIC) or len(blob) <= len(MAGIC) + NONCE_SIZE:
+            raise TokenStoreError(f"Unrecognized token store format: {self.path}")
+
+        nonce = blob[len(MAGIC) : len(MAGIC) + NONCE_SIZE]
+        ciphertext = blob[len(MAGIC) + NONCE_SIZE :]
+
+        try:
+            plaintext = AESGCM(self._get_key()).decrypt(nonce, ciphertext, MAGIC)
+        except InvalidTag:
+            raise TokenStoreError("Token store authentication failed (wrong key or tampered)")
+
+        return json.loads(plaintext.decode("utf-8"))
+
+    def save(self, snapshot: dict) -> None:
+        """
+        Encrypt and write a snapshot, replacing the previous one atomically.
+
+        Args:
+            snapshot: JSON-serializable vault snapshot
+        """
+        plaintext = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+        nonce = secrets.token_bytes(NONCE_SIZE)
+        ciphertext = AESGCM(self._get_key()).encrypt(nonce, plaintext, MAGIC)
+
+        atomic_write(self.path, MAGIC + nonce + ciphertext, fsync=True, mode=0o600)
+
+    def clear(self) -> None:
+        """Delete the stored snapshot (the key is kept for reuse)."""
+        try:
+            self.path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not remove token store: {e}", file=sys.stderr)
+
+
+def persistence_enabled() -> bool:
+    """Check whether token persistence is enabled via VAULT_TOKEN_PERSIST."""
+    return os.getenv("VAULT_TOKEN_PERSIST", "false").lower() in ("1", "true", "yes", "on")
@@ -6,12 +6,17 @@ the local MCP server can resolve. This ensures secrets never reach Claude API
 while still allowing AI to help with structure and migration.
 """
 
+import atexit
 import hashlib
 import re
 import secrets
+import sys
 import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .classifier import get_classifier
+from .token_store import EncryptedTokenStore, TokenStoreError, persistence_enabled
 
 
 class TokenVault:
@@ -19,7 +24,10 @@ class TokenVault:
     Manages tokenization/detokenization of secrets.
 
     Tokens are session-scoped and expire after configurable TTL.
-    All storage is in-memory only (never persisted to disk).
+    Storage is in-memory only unless an EncryptedTokenStore is attached, in
+    which case changes are sealed to disk on flush() (once per tool call and
+    at exit) and reloaded lazily on first use, so tokens survive an MCP
+    server restart.
 
     Example:
         vault = TokenVault()
@@ -30,12 +38,13 @@ class TokenVault:
         # → "sk-1234567890abcdef"
     """
 
-    def __init__(self, session_ttl: int = 7200):
+    def __init__(self, session_ttl: int = 7200, store: Optional[EncryptedTokenStore] = None):
         """
         Initialize token vault.
 
         Args:
             session_ttl: Session time-to-live in seconds (default: 2 hours)
+            store: Optional encrypted store for warm-restart persistence
         """
         self.session_id = f"sess-{secrets.token_hex(8)}"
         self.session_created = time.time()
@@ -51,6 +60,128 @@ class TokenVault:
         # Metadata for audit/debugging
         self.token_metadata: Dict[str, dict] = {}
 
+        # Reverse index: service → key → tokens, and token → (service, key) refs
+        # A token can back several keys since equal values share one token
+        self.key_index: Dict[str, Dict[str, Set[str]]] = {}
+        self.token_refs: Dict[str, Set[Tuple[str, str]]] = {}
+
+        # Persistence (snapshot is loaded lazily on first use)
+        self._store = store
+        self._loaded = store is None
+        self._dirty = False
+
+    def _ensure_loaded(self) -> None:
+        """Restore the persisted session on first use, if it is still valid."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            snapshot = self._store.load()
+        except (TokenStoreError, ValueError, OSError) as e:
+            print(f"Warning: Could not load persisted tokens: {e}", file=sys.stderr)
+            return
+
+        if not snapshot:
+            return
+
+        created = snapshot.get("session_created", 0)
+        if (time.time() - created) > self.session_ttl:
+            # Persisted session expired; it is overwritten on the next save
+            return
+
+        self.session_id = snapshot["session_id"]
+        self.session_created = created
+        self.token_map.update(snapshot.get("token_map", {}))
+        self.token_metadata.update(snapshot.get("token_metadata", {}))
+        for token, value in self.token_map.items():
+            self.value_to_token.setdefault(self._hash_value(value), token)
+        for service, key, token in snapshot.get("key_index", []):
+            if token in self.token_map:
+                self._index(token, service, key)
+
+    def _mark_dirty(self) -> None:
+        """Record an unsaved change; it is sealed on the next flush()."""
+        if self._store is not None:
+            self._dirty = True
+
+    def flush(self) -> None:
+        """
+        Seal pending changes to the attached store, if any.
+
+        Each save re-encrypts the whole map and fsyncs it, so callers batch
+        changes and flush once per tool call rather than once per token.
+        """
+        if self._dirty:
+            self._persist()
+
+    def _persist(self) -> None:
+        """Seal the current session to the attached store."""
+        if self._store is None:
+            return
+        self._dirty = False
+
+        try:
+            self._store.save(
+                {
+                    "session_id": self.session_id,
+                    "session_created": self.session_created,
+                    "token_map": self.token_map,
+                    "token_metadata": self.token_metadata,
+                    "key_index": [
+                        [service, key, token]
+                        for service, keys in self.key_index.items()
+                        for key, tokens in keys.items()
+                        for token in tokens
+                    ],
+                }
+            )
+        except (TokenStoreError, OSError) as e:
+            print(f"Warning: Could not persist tokens: {e}", file=sys.stderr)
+
+    def _index(self, token: str, service: str, key: str) -> bool:
+        """Record that token backs service/key; returns True if the entry is new."""
+        tokens = self.key_index.setdefault(service, {}).setdefault(key, set())
+        if token in tokens:
+            return False
+        tokens.add(token)
+        self.token_refs.setdefault(token, set()).add((service, key))
+        return True
+
+    def _drop_token(self, token: str) -> None:
+        """Remove a token and its value mappings entirely."""
+        value = self.token_map.pop(token, None)
+        if value is not None:
+            value_hash = self._hash_value(value)
+            if self.value_to_token.get(value_hash) == token:
+                del self.value_to_token[value_hash]
+        self.token_metadata.pop(token, None)
+        self.token_refs.pop(token, None)
+
+    def _unindex(self, service: str, key: str) -> Set[str]:
+        """Remove the service/key index entry and return its tokens."""
+        keys = self.key_index.get(service, {})
+        tokens = keys.pop(key, set())
+        if not keys:
+            self.key_index.pop(service, None)
+        for token in tokens:
+            refs = self.token_refs.get(token)
+            if refs is not None:
+                refs.discard((service, key))
+        return tokens
+
+    def _unindex_token(self, token: str, service: str, key: str) -> None:
+        """Detach a single token from the service/key index entry."""
+        keys = self.key_index.get(service, {})
+        tokens = keys.get(key)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del keys[key]
+            if not keys:
+                self.key_index.pop(service, None)
+        self.token_refs.get(token, set()).discard((service, key))
+
     def _is_expired(self) -> bool:
         """Check if session has expired."""
         return (time.time() - self.session_created) > self.session_ttl
@@ -73,6 +204,8 @@ class TokenVault:
         Raises:
             ValueError: If session has expired
         """
+        self._ensure_loaded()
+
         if self._is_expired():
             raise ValueError(
                 f"Token session {self.session_id} expired. Restart MCP server."
@@ -80,9 +213,15 @@ class TokenVault:
 
         # Check if we've already tokenized this exact value
         # This ensures consistent tokens for duplicate values
+        service = metadata.get("service") if metadata else None
+        key = metadata.get("key") if metadata else None
+
         value_hash = self._hash_value(value)
         if value_hash in self.value_to_token:
-            return self.value_to_token[value_hash]
+            token = self.value_to_token[value_hash]
+            if service and key and self._index(token, service, key):
+                self._mark_dirty()
+            return token
 
         # Generate new cryptographically random token
         token_id = secrets.token_hex(8)  # 16 hex chars = 64 bits entropy
@@ -98,6 +237,10 @@ class TokenVault:
                 **metadata,
                 "created_at": datetime.now().isoformat(),
             }
+        if service and key:
+            self._index(token, service, key)
+
+        self._mark_dirty()
 
         return token
 
@@ -114,6 +257,8 @@ class TokenVault:
         Raises:
             ValueError: If token not found or session expired
         """
+        self._ensure_loaded()
+
         if self._is_expired():
             raise ValueError(
                 f"Token session {self.session_id} expired. Restart MCP server."
@@ -128,9 +273,95 @@ class TokenVault:
 
         return self.token_map[token]
 
+    def tokens_for(self, service: str, key: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        List live tokens for a service (or a single key) via the reverse index.
+
+        Args:
+            service: Service name
+            key: Optional key name to restrict the listing
+
+        Returns:
+            Dict of key → sorted list of tokens
+        """
+        self._ensure_loaded()
+
+        keys = self.key_index.get(service, {})
+        if key is not None:
+            keys = {key: keys[key]} if key in keys else {}
+        return {k: sorted(tokens) for k, tokens in sorted(keys.items())}
+
+    def invalidate(self, service: str, key: str) -> List[str]:
+        """
+        Invalidate the tokens issued for service/key (e.g. after rotation).
+
+        Tokens that also back another key (same value elsewhere) stay valid
+        for that key; all other tokens stop resolving.
+
+        Args:
+            service: Service name
+            key: Key name
+
+        Returns:
+            Tokens that no longer resolve
+        """
+        self._ensure_loaded()
+
+        dropped = []
+        for token in self._unindex(service, key):
+            if not self.token_refs.get(token):
+                self._drop_token(token)
+                dropped.append(token)
+
+        if dropped:
+            self._mark_dirty()
+        return sorted(dropped)
+
+    def repoint(self, service: str, key: str, value: str) -> List[str]:
+        """
+        Make every token issued for service/key resolve to a new value.
+
+        A token shared with other keys (they had the same value) is re-pointed
+        too, so it can never resolve to the rotated-out value; the other keys
+        are detached from it and get a fresh token the next time their value
+        is tokenized.
+
+        Args:
+            service: Service name
+            key: Key name
+            value: New secret value
+
+        Returns:
+            Tokens that now resolve to value
+        """
+        self._ensure_loaded()
+
+        value_hash = self._hash_value(value)
+        repointed = []
+
+        for token in self._unindex(service, key):
+            if self.token_map.get(token) != value:
+                for other_service, other_key in list(self.token_refs.get(token, ())):
+                    self._unindex_token(token, other_service, other_key)
+                old_hash = self._hash_value(self.token_map[token])
+                if self.value_to_token.get(old_hash) == token:
+                    del self.value_to_token[old_hash]
+                self.token_map[token] = value
+                self.value_to_token.setdefault(value_hash, token)
+            repointed.append(token)
+
+        for token in repointed:
+            self._index(token, service, key)
+
+        if repointed:
+            self._mark_dirty()
+        return sorted(repointed)
+
     def detokenize_dict(self, data: dict) -> dict:
         """
-        Recursively detokenize all tokens in a dict.
+        Detokenize all tokens in a dict, at any nesting depth.
+
+        See detokenize_structure().
 
         Args:
             data: Dictionary potentially containing tokens
@@ -138,21 +369,69 @@ class TokenVault:
         Returns:
             Dictionary with all tokens replaced by values
         """
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, str) and value.startswith("@token-"):
-                result[key] = self.detokenize(value)
-            elif isinstance(value, dict):
-                result[key] = self.detokenize_dict(value)
-            elif isinstance(value, list):
-                result[key] = [
-                    self.detokenize(v) if isinstance(v, str) and v.startswith("@token-") else v
-                    for v in value
-                ]
-            else:
-                result[key] = value
+        return self.detokenize_structure(data)
+
+    def detokenize_structure(self, data: Any) -> Any:
+        """
+        Detokenize every token string inside nested dicts and lists.
+
+        Walks the tree iteratively (no recursion limit) and copies only the
+        containers on the path to a token; subtrees without tokens are
+        returned by reference, so the input is never modified.
+
+        Args:
+            data: Dict, list, or scalar potentially containing tokens
+
+        Returns:
+            Structure with all tokens replaced by values
+        """
+        if isinstance(data, str):
+            return self.detokenize(data) if data.startswith("@token-") else data
+        if not isinstance(data, (dict, list)):
+            return data
+
+        # Frames: [node, child iterator, replacements, key in parent]
+        stack = [[data, self._children(data), None, None]]
+        result = data
+
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+
+            if child is not None:
+                key, value = child
+                if isinstance(value, str):
+                    if value.startswith("@token-"):
+                        if frame[2] is None:
+                            frame[2] = {}
+                        frame[2][key] = self.detokenize(value)
+                elif isinstance(value, (dict, list)) and value:
+                    stack.append([value, self._children(value), None, key])
+                continue
+
+            # Node finished: copy it only if something below changed
+            stack.pop()
+            node, _, replacements, parent_key = frame
+            if replacements:
+                node = dict(node) if isinstance(node, dict) else list(node)
+                for key, value in replacements.items():
+                    node[key] = value
+
+            if not stack:
+                result = node
+            elif node is not frame[0]:
+                parent = stack[-1]
+                if parent[2] is None:
+                    parent[2] = {}
+                parent[2][parent_key] = node
+
         return result
 
+    @staticmethod
+    def _children(node):
+        """Iterate (key, value) pairs of a dict or (index, item) pairs of a list."""
+        return iter(node.items()) if isinstance(node, dict) else enumerate(node)
+
     def detokenize_text(self, text: str) -> str:
         """
         Replace all tokens in a text string.
@@ -183,6 +462,7 @@ class TokenVault:
 
     def get_stats(self) -> dict:
         """Get session statistics."""
+        self._ensure_loaded()
         age = time.time() - self.session_created
         remaining = max(0, self.session_ttl - age)
 
@@ -190,9 +470,11 @@ class TokenVault:
             "session_id": self.session_id,
             "tokens_created": len(self.token_map),
             "unique_values": len(self.value_to_token),
+            "indexed_services": len(self.key_index),
             "session_age_seconds": int(age),
             "session_remaining_seconds": int(remaining),
             "is_expired": self._is_expired(),
+            "persistent": self._store is not None,
         }
 
     def clear(self):
@@ -200,6 +482,12 @@ class TokenVault:
         self.token_map.clear()
         self.value_to_token.clear()
         self.token_metadata.clear()
+        self.key_index.clear()
+        self.token_refs.clear()
+        self._dirty = False
+
+        if self._store is not None:
+            self._store.clear()
 
 
 # Global instance (created per MCP server process)
@@ -210,6 +498,9 @@ def get_token_vault(ttl: Optional[int] = None) -> TokenVault:
     """
     Get or create the global token vault.
 
+    Set VAULT_TOKEN_PERSIST=true to keep tokens across MCP server restarts
+    (sealed under ~/.claude-vault, see token_store).
+
     Args:
         ttl: Optional session TTL in seconds (default from env or 7200)
 
@@ -224,16 +515,26 @@ def get_token_vault(ttl: Optional[int] = None) -> TokenVault:
         ttl = int(os.getenv("VAULT_TOKEN_SESSION_TTL", "7200"))
 
     if _token_vault is None or _token_vault._is_expired():
-        _token_vault = TokenVault(session_ttl=ttl)
+        store = EncryptedTokenStore() if persistence_enabled() else None
+        _token_vault = TokenVault(session_ttl=ttl, store=store)
+        if store is not None:
+            atexit.register(_token_vault.flush)
 
     return _token_vault
 
 
+def flush_token_vault() -> None:
+    """Seal unsaved token changes of the global vault (no-op when not persistent)."""
+    if _token_vault is not None:
+        _token_vault.flush()
+
+
 def should_tokenize_value(key: str, value: str) -> bool:
     """
     Decide if a value should be tokenized.
 
     Non-sensitive values (ports, public URLs, etc.) can be sent plaintext.
+    Delegates to the shared compiled classifier (see classifier.py).
 
     Args:
         key: Secret key name
@@ -242,32 +543,4 @@ def should_tokenize_value(key: str, value: str) -> bool:
     Returns:
         True if value should be tokenized
     """
-    # Don't tokenize common non-sensitive config
-    non_sensitive_keys = {
-        "PORT",
-        "HOST",
-        "HOSTNAME",
-        "ENVIRONMENT",
-        "ENV",
-        "DEBUG",
-        "LOG_LEVEL",
-        "TIMEZONE",
-        "TZ",
-    }
-
-    if key.upper() in non_sensitive_keys:
-        return False
-
-    # Don't tokenize public URLs
-    if value.startswith(("http://", "https://", "ftp://")):
-        return False
-
-    # Don't tokenize boolean values
-    if value.lower() in ("true", "false", "yes", "no", "1", "0"):
-        return False
-
-    # Don't tokenize very short values (probably not secrets)
-    if len(value) < 8:
-        return False
-
-    return True
+    return get_classifier().should_tokenize(key, value)
@@ -0,0 +1,252 @@
+"""Audit tools: vault_audit_query."""
+
+import re
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+
+from mcp.types import TextContent, Tool
+
+from ..audit import default_audit_path, flush_audit_sinks, get_audit_index, utc_timestamp
+from ..audit_chain import AuditVerifier
+from ..audit_index import GROUP_BY
+from ..security import SecurityValidator, ValidationError
+from ..tools import ToolHandler
+
+# Page size bounds
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+_RELATIVE = re.compile(r"^(\d+)([mhdw])$")
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_TIMESTAMP = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})(?:T(\d{2}:\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?Z?$"
+)
+
+
+def parse_time_bound(value: Optional[str], end: bool = False) -> Optional[str]:
+    """
+    Normalize a time filter to the audit log's ISO-8601 UTC format.
+
+    Accepts relative durations ("30m", "24h", "7d", "2w" ago), dates
+    ("2025-01-31", covering the whole day) and ISO timestamps. A bound covers
+    its whole precision: "2025-01-31T12:00" as an upper bound includes every
+    entry of that minute. The result always has millisecond precision, like
+    stored "ts" values, so the string comparison is exact.
+
+    Args:
+        value: Filter as given by the caller
+        end: True for an upper bound (dates extend to the end of the day)
+
+    Returns:
+        Timestamp comparable with audit entry "ts" values, or None
+
+    Raises:
+        ValidationError: If the value is not a recognized format
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    match = _RELATIVE.match(value)
+    if match:
+        seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+        return utc_timestamp(time.time() - seconds)
+    match = _TIMESTAMP.match(value)
+    if match:
+        date, hour_minute, second, fraction = match.groups()
+        if hour_minute is None:
+            hour_minute = "23:59" if end else "00:00"
+        if second is None:
+            second = "59" if end else "00"
+        fraction = (fraction or "")[:3].ljust(3, "9" if end else "0")
+        try:
+            moment = datetime.strptime(
+                f"{date}T{hour_minute}:{second}.{fraction}", "%Y-%m-%dT%H:%M:%S.%f"
+            )
+        except ValueError:
+            pass  # e.g. month 13; reported below
+        else:
+            return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+    raise ValidationError(
+        f"Invalid time '{value}': use e.g. '24h', '7d', '2025-01-31' or '2025-01-31T12:00:00Z'"
+    )
+
+
+class VaultAuditQueryTool(ToolHandler):
+    """Tool for searching the audit log."""
+
+    def __init__(self):
+        super().__init__("vault_audit_query")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="""Search the MCP server's audit log (indexed, newest first).
+
+Examples:
+- What was written to a service last week: service="myapp", action="SUCCESS", since="7d"
+- Failed operations today: action="FAILED", since="24h"
+- Activity per service: group_by="service"
+- Check the log has not been tampered with: verify=true
+
+Filters can be combined; results are paginated with limit/offset.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "service": {"type": "string", "description": "Exact service name"},
+                    "action": {
+                        "type": "string",
+                        "description": "Exact action (SUCCESS, FAILED, CONFIRMED, ABORTED, "
+                        "VALIDATION_FAILED, ...)",
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Earliest time: '24h', '7d', '2025-01-31' or ISO timestamp",
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Latest time (same formats as since)",
+                    },
+                    "contains": {
+                        "type": "string",
+                        "description": "Substring to match in entry details",
+                    },
+                    "group_by": {
+                        "type": "string",
+                        "enum": list(GROUP_BY),
+                        "description": "Return counts per group instead of entries",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Page size (default {DEFAULT_LIMIT}, max {MAX_LIMIT})",
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Number of matching entries to skip (default 0)",
+                    },
+                    "verify": {
+                        "type": "boolean",
+                        "description": "Verify the hash chain and signed checkpoints "
+                        "(only entries since the last verified checkpoint are re-checked)",
+                    },
+                },
+                "required": [],
+            },
+        )
+
+    def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        if arguments.get("verify"):
+            return self._verify()
+
+        service = arguments.get("service")
+        action = arguments.get("action")
+        contains = arguments.get("contains")
+        group_by = arguments.get("group_by")
+
+        try:
+            if service:
+                SecurityValidator.validate_service_name(service)
+            if action and not re.fullmatch(r"[A-Z_]{1,64}", action):
+                raise ValidationError("Action must be upper-case letters and underscores")
+            since = parse_time_bound(arguments.get("since"))
+            until = parse_time_bound(arguments.get("until"), end=True)
+            limit = int(arguments.get("limit") or DEFAULT_LIMIT)
+            offset = int(arguments.get("offset") or 0)
+        except (ValidationError, ValueError, TypeError) as e:
+            return [TextContent(type="text", text=f"❌ Validation failed: {e}")]
+
+        limit = max(1, min(limit, MAX_LIMIT))
+        offset = max(0, offset)
+
+        index = get_audit_index()
+        if index is None:
+            return [
+                TextContent(
+                    type="text",
+                    text="❌ Audit index is disabled (VAULT_AUDIT_INDEX=false).",
+                )
+            ]
+
+        filters = {
+            "service": service,
+            "action": action,
+            "since": since,
+            "until": until,
+            "contains": contains,
+        }
+        described = ", ".join(f"{k}={v}" for k, v in filters.items() if v) or "none"
+
+        if group_by:
+            try:
+                groups = index.counts(group_by, **filters)
+            except ValueError as e:
+                return [TextContent(type="text", text=f"❌ {e}")]
+            if not groups:
+                return [TextContent(type="text", text=f"No audit entries match ({described}).")]
+            lines = [f"  {value or '-'}: {count}" for value, count in groups]
+            return [
+                TextContent(
+                    type="text",
+                    text=f"""📊 Audit entries by {group_by} (filters: {described}):
+
+{chr(10).join(lines)}
+
+Total: {sum(count for _, count in groups)}""",
+                )
+            ]
+
+        entries, total = index.query(limit=limit, offset=offset, **filters)
+        if not entries:
+            return [TextContent(type="text", text=f"No audit entries match ({described}).")]
+
+        lines = [
+            f"  {e['ts']}  {e['action']:<18} {e['service'] or '-':<20} {e['details'] or ''}"
+            for e in entries
+        ]
+        shown_to = offset + len(entries)
+        more = (
+            f"\nMore results: call again with offset={shown_to}" if shown_to < total else ""
+        )
+        return [
+            TextContent(
+                type="text",
+                text=f"""📜 Audit entries {offset + 1}-{shown_to} of {total} (filters: {described}):
+
+{chr(10).join(lines)}{more}""",
+            )
+        ]
+
+    def _verify(self) -> Sequence[TextContent]:
+        """Verify the audit hash chain incrementally."""
+        flush_audit_sinks()
+        try:
+            result = AuditVerifier(default_audit_path()).verify()
+        except OSError as e:
+            return [TextContent(type="text", text=f"❌ Audit verification failed: {e}")]
+
+        summary = (
+            f"Checked {result.entries_checked} entries and {result.checkpoints_checked} "
+            f"checkpoints after seq {result.start_seq}"
+        )
+        if not result.ok:
+            problems = "\n".join(f"  - {e}" for e in result.errors)
+            return [
+                TextContent(
+                    type="text",
+                    text=f"""❌ Audit log integrity check FAILED
+
+{summary}:
+{problems}""",
+                )
+            ]
+        return [
+            TextContent(
+                type="text",
+                text=f"""✅ Audit log intact
+
+{summary}.
+Verified through seq {result.verified_seq} (next check starts there).""",
+            )
+        ]
@@ -11,11 +11,10 @@ from typing import Sequence
 
 from mcp.types import TextContent, Tool
 
-from ..file_parsers import (
-    classify_secret,
-    parse_docker_compose,
-    parse_env_file_with_structure,
-)
+from ..atomic_io import atomic_open
+from ..classifier import get_classifier
+from ..compose_project import load_compose_project
+from ..file_parsers import dump_docker_compose, parse_env_file_with_structure
 from ..security import AuditLogger, SecurityValidator
 from . import ToolHandler
 
@@ -38,6 +37,8 @@ class VaultGenerateExampleTool(ToolHandler):
                 "- Replacing secret values with <REDACTED> placeholders\n"
                 "- Preserving configuration values (ports, hosts, feature flags, etc.)\n"
                 "- Maintaining all comments and file structure\n"
+                "- For compose files, using the effective configuration "
+                "(override file, include and extends merged)\n"
                 "- Useful for committing to git as documentation\n\n"
                 "No WebAuthn approval required "
                 "(only reads file structure, not secret values).\n\n"
@@ -167,6 +168,12 @@ class VaultGenerateExampleTool(ToolHandler):
         lines.append("# Other values are safe defaults that can be used as-is or customized")
         lines.append("")
 
+        # Classify all assignments in one batch
+        assignments = [
+            (line.key, line.value) for line in env_lines if line.type in ("assignment", "export")
+        ]
+        verdicts = iter(get_classifier().classify_batch(assignments))
+
         # Process each line
         for env_line in env_lines:
             if env_line.type == "comment":
@@ -178,7 +185,7 @@ class VaultGenerateExampleTool(ToolHandler):
                 value = env_line.value
 
                 # Classify as secret or config
-                is_secret = classify_secret(key, value)
+                is_secret = next(verdicts)
 
                 if is_secret:
                     # Replace with redacted placeholder
@@ -194,23 +201,20 @@ class VaultGenerateExampleTool(ToolHandler):
                         lines.append("{}={}".format(key, value))
 
         # Write to output file
-        with open(output_path, "w") as f:
+        with atomic_open(output_path) as f:
             f.write("\n".join(lines))
             if lines:  # Add trailing newline if file has content
                 f.write("\n")
 
     def _generate_yaml_example(self, source_path: str, output_path: str, service: str):
         """Generate docker-compose.example.yml file."""
-        import yaml  # noqa: F401
-
-        # Parse source file - using yaml module via parse_docker_compose
-        parse_docker_compose(source_path)
-
-        # Load original YAML to preserve structure
-        with open(source_path, "r") as f:
-            compose_data = yaml.safe_load(f)
+        # Load the effective configuration (with override, include and
+        # extends files; a private copy, so it can be redacted in place)
+        project = load_compose_project(source_path, check=SecurityValidator.validate_file_path)
+        compose_data = project.model
 
         # Process environment variables in each service
+        classifier = get_classifier()
         if "services" in compose_data:
             for service_name, service_config in compose_data["services"].items():
                 if "environment" in service_config:
@@ -218,18 +222,21 @@ class VaultGenerateExampleTool(ToolHandler):
 
                     if isinstance(env, dict):
                         # Dict format: key: value
-                        for key, value in env.items():
-                            if isinstance(value, str):
-                                if classify_secret(key, value):
-                                    env[key] = "<REDACTED>"
+                        candidates = [(k, v) for k, v in env.items() if isinstance(v, str)]
+                        verdicts = classifier.classify_batch(candidates)
+                        for (key, _value), is_secret in zip(candidates, verdicts):
+                            if is_secret:
+                                env[key] = "<REDACTED>"
 
                     elif isinstance(env, list):
                         # List format: ["KEY=value", ...]
+                        candidates = [tuple(i.split("=", 1)) for i in env if "=" in i]
+                        verdicts = iter(classifier.classify_batch(candidates))
                         new_env = []
                         for item in env:
                             if "=" in item:
                                 key, value = item.split("=", 1)
-                                if classify_secret(key, value):
+                                if next(verdicts):
                                     new_env.append("{}=<REDACTED>".format(key))
                                 else:
                                     new_env.append(item)
@@ -238,15 +245,20 @@ class VaultGenerateExampleTool(ToolHandler):
                         service_config["environment"] = new_env
 
         # Write to output file with header comment
-        with open(output_path, "w") as f:
+        with atomic_open(output_path) as f:
             f.write("# Example Docker Compose Configuration\n")
             f.write("# Service: {}\n".format(service))
             f.write("# Copy to docker-compose.yml and fill in actual values\n")
             f.write("#\n")
             f.write("# Values marked with <REDACTED> are secrets that must be provided\n")
             f.write("# Other values are safe defaults\n")
+            if len(project.inputs) > 1:
+                f.write("#\n")
+                f.write("# Effective configuration merged from:\n")
+                for input_path in project.inputs:
+                    f.write("#   {}\n".format(input_path))
             f.write("\n")
-            yaml.dump(compose_data, f, default_flow_style=False, sort_keys=False)
+            dump_docker_compose(compose_data, f)
 
     def _format_success_message(
         self, service: str, source_path: str, output_path: str, file_format: str
@@ -7,6 +7,8 @@ from typing import Sequence
 
 from mcp.types import TextContent, Tool
 
+from ..atomic_io import atomic_write
+from ..backup_store import get_backup_store
 from ..security import SecurityValidator, ValidationError
 from ..session import VaultSession
 from ..tokenization import get_token_vault
@@ -254,19 +256,16 @@ This may mean:
             output_file = Path(output_path)
             output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # Backup existing file if it exists
+            # Backup existing file if it exists (deduplicated: unchanged
+            # content is not stored again)
             if output_file.exists():
-                import shutil
-                from datetime import datetime
-
-                backup_path = f"{output_path}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(output_file, backup_path)
-                backed_up = True
+                backup_ref = get_backup_store().backup(str(output_file)).ref
+                backed_up = f"Yes (restore: vault-backup restore {backup_ref})"
             else:
-                backed_up = False
+                backed_up = "No (new file)"
 
-            # Write new content
-            output_file.write_text(detokenized_content)
+            # Replace atomically: a restarting service never reads a partial file
+            atomic_write(output_file, detokenized_content)
 
             return [
                 TextContent(
@@ -276,7 +275,7 @@ This may mean:
 **Summary:**
 - Tokens resolved: {tokens_resolved}
 - Security mode: {security_mode}
-- File backed up: {"Yes" if backed_up else "No (new file)"}
+- File backed up: {backed_up}
 - Lines written: {len(detokenized_content.splitlines())}
 
 ⚠️  File contains sensitive data:
@@ -1,4 +1,4 @@
-"""Read-only Vault tools: vault_status, vault_list, vault_get."""
+"""Read-only Vault tools: vault_status, vault_list, vault_get, vault_tokens."""
 
 import json
 import os
@@ -9,9 +9,13 @@ from mcp.types import TextContent, Tool
 
 from ..security import SecurityValidator, ValidationError
 from ..session import VaultSession
-from ..tokenization import get_token_vault, should_tokenize_value
+from ..classifier import get_classifier
+from ..compose_project import get_compose_project_cache
+from ..file_parsers import get_parse_cache, yaml_backend
+from ..tokenization import get_token_vault
 from ..tools import ToolHandler
 from ..vault_client import VaultClient
+from ..watcher import get_watcher
 
 
 class VaultStatusTool(ToolHandler):
@@ -86,6 +90,21 @@ The token may be invalid or revoked. Please re-authenticate:
         else:
             remaining_str = f"{remaining // 60}m {remaining % 60}s"
 
+        cache = get_classifier().cache_stats()
+        parses = get_parse_cache().stats()
+        projects = get_compose_project_cache().stats()
+        watcher = get_watcher()
+        if watcher is None:
+            watch_str = "off"
+        else:
+            watched = watcher.stats()
+            watch_str = "{} ({}, {} files, {} pending)".format(
+                watched["backend"],
+                "ready" if watched["ready"] else "starting",
+                watched["files"],
+                watched["pending"],
+            )
+
         return [
             TextContent(
                 type="text",
@@ -104,6 +123,13 @@ The token may be invalid or revoked. Please re-authenticate:
 - Time Remaining: {remaining_str}
 - Token TTL: {ttl}s
 
+**Classifier:**
+- Memo: {cache['size']}/{cache['maxsize']} entries, {cache['hit_rate']:.0%} hit rate
+- Parse cache: {parses['size']}/{parses['maxsize']} files, {parses['hit_rate']:.0%} hit rate
+- Compose projects: {projects['size']} merged, {projects['hit_rate']:.0%} hit rate
+- YAML backend: {yaml_backend()}
+- Workspace watcher: {watch_str}
+
 The session is valid and ready for operations.""",
             )
         ]
@@ -287,6 +313,13 @@ This tool helps you understand secret structure without exposing credentials."""
             },
         )
 
+    @staticmethod
+    def _invalidate_removed_keys(service: str, secrets: dict) -> None:
+        """Invalidate tokens of indexed keys that no longer exist in Vault."""
+        vault = get_token_vault()
+        for removed in set(vault.tokens_for(service)) - set(secrets):
+            vault.invalidate(service, removed)
+
     def run_tool(self, arguments: dict) -> Sequence[TextContent]:
         # Load and validate session
         session = VaultSession.from_environment()
@@ -319,6 +352,9 @@ This tool helps you understand secret structure without exposing credentials."""
 
         secrets = response.data["secrets"]
 
+        # Tokens issued for keys that have since been deleted stop resolving
+        self._invalidate_removed_keys(service, secrets)
+
         # Check security mode (default: tokenized)
         security_mode = os.getenv("VAULT_SECURITY_MODE", "tokenized")
 
@@ -340,7 +376,7 @@ Available keys: {available_keys}""",
             if security_mode == "tokenized":
                 # Tokenize the value
                 vault = get_token_vault()
-                if should_tokenize_value(key, value):
+                if get_classifier().should_tokenize(key, value):
                     token = vault.tokenize(
                         value, metadata={"service": service, "key": key, "type": "vault_secret"}
                     )
@@ -401,8 +437,9 @@ Value: <REDACTED>
                 tokenized = {}
                 stats = {"tokenized": 0, "plaintext": 0}
 
-                for k, v in secrets.items():
-                    if should_tokenize_value(k, v):
+                verdicts = get_classifier().should_tokenize_batch(secrets.items())
+                for (k, v), tokenize in zip(secrets.items(), verdicts):
+                    if tokenize:
                         tokenized[k] = vault.tokenize(
                             v, metadata={"service": service, "key": k, "type": "vault_secret"}
                         )
@@ -487,3 +524,87 @@ Total: {len(secrets)} secrets
 Consider using VAULT_SECURITY_MODE=tokenized for better security.""",
                     )
                 ]
+
+
+class VaultTokensTool(ToolHandler):
+    """Tool for listing live tokens per service."""
+
+    def __init__(self):
+        super().__init__("vault_tokens")
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="""List live tokens issued in this session (never the values).
+- Without service: Lists services that have tokens, with token counts
+- With service: Lists keys and their @token-xxx references for that service
+- With service and key: Lists tokens for a single key
+
+Tokens for a key are re-pointed automatically when vault_set rotates it, and
+tokens for keys deleted from Vault are invalidated when vault_get reads the service.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "service": {
+                        "type": "string",
+                        "description": "Optional service name. If omitted, lists all services.",
+                    },
+                    "key": {
+                        "type": "string",
+                        "description": "Optional key name (requires service).",
+                    },
+                },
+                "required": [],
+            },
+        )
+
+    def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        service = arguments.get("service")
+        key = arguments.get("key")
+
+        vault = get_token_vault()
+        stats = vault.get_stats()
+
+        if not service:
+            if not vault.key_index:
+                return [TextContent(type="text", text="No tokens issued in this session yet.")]
+
+            lines = [
+                f"  • {svc}: {sum(len(t) for t in keys.values())} token(s) "
+                f"across {len(keys)} key(s)"
+                for svc, keys in sorted(vault.key_index.items())
+            ]
+            return [
+                TextContent(
+                    type="text",
+                    text=f"""🎟️  Live tokens by service ({len(vault.key_index)} services):
+
+{chr(10).join(lines)}
+
+Session: {stats['session_id']} (expires in {stats['session_remaining_seconds']}s)""",
+                )
+            ]
+
+        try:
+            SecurityValidator.validate_service_name(service)
+            if key:
+                SecurityValidator.validate_key_name(key)
+        except ValidationError as e:
+            return [TextContent(type="text", text=f"❌ Validation failed: {e}")]
+
+        tokens = vault.tokens_for(service, key)
+        if not tokens:
+            target = f"{service}/{key}" if key else service
+            return [TextContent(type="text", text=f"No live tokens for {target}.")]
+
+        lines = [f"  {k}: {', '.join(v)}" for k, v in tokens.items()]
+        return [
+            TextContent(
+                type="text",
+                text=f"""🎟️  Live tokens for service: {service}
+
+{chr(10).join(lines)}
+
+Session: {stats['session_id']} (expires in {stats['session_remaining_seconds']}s)""",
+            )
+        ]
@@ -1,22 +1,57 @@
-"""Scan tools: vault_scan_env, vault_scan_compose."""
+"""Scan tools: vault_scan_env, vault_scan_compose, vault_scan_workspace."""
 
 from pathlib import Path
-from typing import Sequence
+from typing import Dict, List, Optional, Sequence
 
 from mcp.types import TextContent, Tool
 
 from ..approval_server import get_approval_server
-from ..file_parsers import (
-    classify_secret,
-    extract_compose_secrets,
-    get_env_file_references,
-    parse_docker_compose,
-    parse_env_file,
+from ..classifier import get_classifier
+from ..compose_env import ComposeEnvResolver, ServiceEnvironment
+from ..compose_project import (
+    COMPOSE_FILE_NAMES,
+    ComposeProject,
+    load_compose_project,
+    project_files,
 )
-from ..security import AuditLogger, SecurityValidator, ValidationError
+from ..file_parsers import parse_env_file
+from ..scan_manifest import get_scan_manifest
+from ..security import AuditLogger, SecurityValidator, ValidationError, get_allowed_roots
 from ..session import VaultSession
 from ..tokenization import get_token_vault
 from ..tools import ToolHandler
+from ..watcher import get_watcher
+from ..workspace_scan import FileScan, classify_file_kind, scan_files
+
+
+def _warm_result(file_path: str, kind: str) -> Optional[FileScan]:
+    """Result kept up to date by the workspace watcher (None: scan the file now)."""
+    watcher = get_watcher()
+    result = watcher.lookup(file_path) if watcher is not None else None
+    if result is None or result.error or result.kind != kind:
+        return None
+    return result
+
+
+def _secret_sources(environments: Dict[str, ServiceEnvironment]) -> List[str]:
+    """Files the detected secrets of a compose project come from."""
+    sources = []
+    for env in environments.values():
+        for resolved in env.secrets().values():
+            sources.extend(s for s in resolved.sources if s not in sources)
+    return sources
+
+
+def _resolution_warnings(environments: Dict[str, ServiceEnvironment]) -> List[str]:
+    """Missing env_files and variables, and interpolation errors, per container."""
+    warnings = []
+    for svc_name, env in environments.items():
+        warnings.extend(f"{svc_name}: env_file not found: {p}" for p in env.missing_files)
+        if env.missing_variables:
+            names = ", ".join(env.missing_variables)
+            warnings.append(f"{svc_name}: unset variables (resolved to empty): {names}")
+        warnings.extend(f"{svc_name}: {e}" for e in env.errors)
+    return warnings
 
 
 class VaultScanEnvTool(ToolHandler):
@@ -152,21 +187,22 @@ You can use vault_list to see available services.""",
     def _create_pending_scan(self, service: str, file_path: str) -> Sequence[TextContent]:
         """Phase 1: Create pending scan operation."""
         try:
-            # Validate file size
-            SecurityValidator.validate_file_size(file_path, max_size_mb=5)
+            warm = _warm_result(file_path, "env")
+            if warm is not None:
+                # Already parsed and classified by the workspace watcher
+                secret_count = len(warm.secrets)
+                config_count = warm.config_count
+            else:
+                # Validate file size
+                SecurityValidator.validate_file_size(file_path, max_size_mb=5)
 
-            # Parse file to get count of secrets (don't tokenize yet)
-            env_data = parse_env_file(file_path)
+                # Parse file to get count of secrets (don't tokenize yet)
+                env_data = parse_env_file(file_path)
 
-            # Classify secrets
-            secret_count = 0
-            config_count = 0
-
-            for key, value in env_data.items():
-                if classify_secret(key, value):
-                    secret_count += 1
-                else:
-                    config_count += 1
+                # Classify secrets
+                verdicts = get_classifier().classify_batch(env_data.items())
+                secret_count = sum(verdicts)
+                config_count = len(verdicts) - secret_count
 
             # Create pending operation
             approval_server = get_approval_server()
@@ -195,7 +231,7 @@ You can use vault_list to see available services.""",
             msg = (
                 "⚠️ SECURITY CHECKPOINT - SCAN APPROVAL REQUIRED\n\n"
                 "This operation will read secrets from:\n"
-                "  File: {}\n"
+                "  Files: {}\n"
                 "  Detected: {} potential secret(s)\n"
                 "  Config values: {}\n\n"
                 "The secrets will be tokenized (replaced with @token-xxx tokens) "
@@ -248,8 +284,9 @@ You can use vault_list to see available services.""",
             tokenized_secrets = {}
             non_secrets = {}
 
-            for key, value in env_data.items():
-                if classify_secret(key, value):
+            verdicts = get_classifier().classify_batch(env_data.items())
+            for (key, value), is_secret in zip(env_data.items(), verdicts):
+                if is_secret:
                     # Tokenize secret
                     token = vault.tokenize(
                         value,
@@ -354,12 +391,19 @@ PHASE 3 - Execute Scan:
   - Tokenizes detected secrets
   - Returns structured data
 
+Scans the effective configuration, as `docker compose` would run it:
+- the service directory's compose file plus its override file
+  (docker-compose.override.yml etc.)
+- include: entries and extends: services, merged per the compose spec
+
 Extracts secrets from:
 - services.{name}.environment (dict or list format)
-- Inline environment variable values
+- ${VAR} references, resolved from the project .env with compose's
+  interpolation rules (${VAR:-default}, ${VAR?error}, ...)
+- env_file entries (loaded together with the project .env)
+Each secret reports the file it came from.
 
 Notes:
-- env_file references are noted but not scanned (use vault_scan_env for those)
 - Secrets section (Docker Swarm) is noted but not extracted""",
             inputSchema={
                 "type": "object",
@@ -371,9 +415,9 @@ Notes:
                     "file_path": {
                         "type": "string",
                         "description": (
-                            "Optional: Path to docker-compose.yml "
-                            "(default: /workspace/proxmox-services/{service}/"
-                            "docker-compose.yml)"
+                            "Optional: Path to a compose file or project directory "
+                            "(default: /workspace/proxmox-services/{service}/, "
+                            "loading its compose file and override)"
                         ),
                     },
                     "approval_token": {
@@ -411,9 +455,10 @@ Notes:
         except ValidationError as e:
             return [TextContent(type="text", text=f"❌ Validation failed: {e}")]
 
-        # Determine file path
+        # Determine the compose files: the service directory's default set
+        # (compose.yaml or docker-compose.yml, plus its override), or file_path
         if not file_path:
-            file_path = f"/workspace/proxmox-services/{service}/docker-compose.yml"
+            file_path = f"/workspace/proxmox-services/{service}"
 
         # Validate file path
         try:
@@ -422,60 +467,60 @@ Notes:
             return [TextContent(type="text", text=f"❌ {e}")]
 
         # Check if file exists
-        if not Path(file_path).exists():
-            # Try alternative names
-            alt_paths = [
-                f"/workspace/proxmox-services/{service}/docker-compose.yaml",
-                f"/workspace/proxmox-services/{service}/compose.yml",
-                f"/workspace/proxmox-services/{service}/compose.yaml",
-            ]
-
-            for alt_path in alt_paths:
-                if Path(alt_path).exists():
-                    file_path = alt_path
-                    break
-            else:
-                return [
-                    TextContent(
-                        type="text",
-                        text=f"""❌ Docker compose file not found.
+        files = project_files(file_path)
+        if not files or not Path(files[0]).is_file():
+            return [
+                TextContent(
+                    type="text",
+                    text=f"""❌ Docker compose file not found: {file_path}
 
-Tried:
-- {file_path}
-- {chr(10).join('- ' + p for p in alt_paths)}
+A service directory is searched for:
+{chr(10).join('- ' + name for name in COMPOSE_FILE_NAMES)}
 
 Please verify the service directory exists and contains a docker-compose file.""",
-                    )
-                ]
+                )
+            ]
 
         # PHASE 1: Create pending scan operation
         if not approval_token:
-            return self._create_pending_scan(service, file_path)
+            return self._create_pending_scan(service, files)
 
         # PHASE 3: Execute scan with approval
-        return self._execute_scan(service, file_path, approval_token)
+        return self._execute_scan(service, files, approval_token)
 
-    def _create_pending_scan(self, service: str, file_path: str) -> Sequence[TextContent]:
+    @staticmethod
+    def _load_project(files: List[str]) -> ComposeProject:
+        """Load the merged project, validating every file it reads (includes too)."""
+
+        def check(path: str) -> None:
+            SecurityValidator.validate_file_path(path)
+            SecurityValidator.validate_file_size(path, max_size_mb=5)
+
+        return load_compose_project(files, check=check)
+
+    def _create_pending_scan(self, service: str, files: List[str]) -> Sequence[TextContent]:
         """Phase 1: Create pending scan operation."""
         try:
-            # Validate file size
-            SecurityValidator.validate_file_size(file_path, max_size_mb=5)
+            project = self._load_project(files)
+            file_path = project.files[0]
 
-            # Parse compose file
-            compose_data = parse_docker_compose(file_path)
+            # Resolve each container's environment (env_files, ${VAR} from
+            # .env) to get the count. Watcher results are not used here: they
+            # only cover inline values of single compose files.
+            environments = ComposeEnvResolver(
+                file_path, project.model, check=SecurityValidator.validate_file_path
+            ).resolve_all()
 
-            # Extract secrets to get count
-            all_secrets = {}
+            all_secrets = set()
             services_with_secrets = []
-
-            services = compose_data.get("services", {})
-            for svc_name, svc_config in services.items():
-                svc_secrets = extract_compose_secrets(compose_data, svc_name)
+            for svc_name, env in environments.items():
+                svc_secrets = env.secrets()
                 if svc_secrets:
                     all_secrets.update(svc_secrets)
                     services_with_secrets.append(svc_name)
 
             secret_count = len(all_secrets)
+            sources = _secret_sources(environments)
 
             # Create pending operation
             approval_server = get_approval_server()
@@ -489,6 +534,8 @@ Please verify the service directory exists and contains a docker-compose file.""
                 metadata={
                     "secret_count": secret_count,
                     "services_with_secrets": services_with_secrets,
+                    "sources": sources,
+                    "files": project.inputs,
                 },
             )
 
@@ -500,16 +547,17 @@ Please verify the service directory exists and contains a docker-compose file.""
                 service=service,
                 action="SCAN_COMPOSE_REQUESTED",
                 details=("file={} potential_secrets={} containers={} op_id={}").format(
-                    file_path, secret_count, len(services_with_secrets), op_id
+                    ",".join(project.inputs), secret_count, len(services_with_secrets), op_id
                 ),
             )
 
             msg = (
                 "⚠️ SECURITY CHECKPOINT - SCAN APPROVAL REQUIRED\n\n"
                 "This operation will read secrets from:\n"
-                "  File: {}\n"
+                "  Files: {}\n"
                 "  Detected: {} potential secret(s) in {} container(s)\n"
-                "  Containers: {}\n\n"
+                "  Containers: {}\n"
+                "  Sources: {}\n\n"
                 "The secrets will be tokenized (replaced with @token-xxx tokens).\n\n"
                 "To approve this scan:\n"
                 "  1. Open: {}\n"
@@ -518,10 +566,11 @@ Please verify the service directory exists and contains a docker-compose file.""
                 "After approval, call:\n"
                 '  vault_scan_compose(service="{}", approval_token="{}")'
             ).format(
-                file_path,
+                ", ".join(project.inputs),
                 secret_count,
                 len(services_with_secrets),
                 ", ".join(services_with_secrets) if services_with_secrets else "none",
+                ", ".join(sources) if sources else "none",
                 approval_url,
                 service,
                 op_id,
@@ -537,7 +586,7 @@ Please verify the service directory exists and contains a docker-compose file.""
             ]
 
     def _execute_scan(
-        self, service: str, file_path: str, approval_token: str
+        self, service: str, files: List[str], approval_token: str
     ) -> Sequence[TextContent]:
         """Phase 3: Execute scan with approval."""
         try:
@@ -555,47 +604,49 @@ Please verify the service directory exists and contains a docker-compose file.""
                     )
                 ]
 
-            # Parse compose file
-            compose_data = parse_docker_compose(file_path)
+            # Load the merged project and resolve each container's environment
+            project = self._load_project(files)
+            file_path = project.files[0]
+            environments = ComposeEnvResolver(
+                file_path, project.model, check=SecurityValidator.validate_file_path
+            ).resolve_all()
 
             # Get TokenVault
             vault = get_token_vault()
 
-            # Extract and tokenize secrets by container
+            # Extract and tokenize secrets by container: (token, source file)
             secrets_by_container = {}
 
-            services = compose_data.get("services", {})
-            for svc_name, svc_config in services.items():
-                svc_secrets = extract_compose_secrets(compose_data, svc_name)
+            for svc_name, env in environments.items():
+                svc_secrets = env.secrets()
 
                 if svc_secrets:
                     # Tokenize secrets
                     tokenized = {}
-                    for key, value in svc_secrets.items():
+                    for key, resolved in svc_secrets.items():
                         token = vault.tokenize(
-                            value,
+                            resolved.value,
                             metadata={
                                 "service": service,
                                 "container": svc_name,
                                 "key": key,
                                 "source": "compose_scan",
-                                "file": file_path,
+                                "file": resolved.sources[0],
+                                "compose_file": file_path,
                             },
                         )
-                        tokenized[key] = token
+                        tokenized[key] = (token, resolved.sources)
 
                     secrets_by_container[svc_name] = tokenized
 
-            # Get env_file references
+            # env_files loaded, and problems found while resolving
             env_files = []
-            for svc_name in services:
-                env_refs = get_env_file_references(compose_data, svc_name)
-                env_files.extend(env_refs)
-
-            env_files = list(set(env_files))  # Deduplicate
+            for env in environments.values():
+                env_files.extend(p for p in env.env_files if p not in env_files)
+            warnings = _resolution_warnings(environments)
 
             # Get compose version
-            compose_version = compose_data.get("version", "unknown")
+            compose_version = project.model.get("version", "unknown")
 
             # Count total secrets
             total_secrets = sum(len(s) for s in secrets_by_container.values())
@@ -605,14 +656,14 @@ Please verify the service directory exists and contains a docker-compose file.""
                 service=service,
                 action="SCAN_COMPOSE_SUCCESS",
                 details="file={} secrets={} containers={}".format(
-                    file_path, total_secrets, len(secrets_by_container)
+                    ",".join(project.inputs), total_secrets, len(secrets_by_container)
                 ),
             )
 
             # Mark as scanned
             from ..migration_state import mark_scanned
 
-            mark_scanned(service, [file_path], total_secrets)
+            mark_scanned(service, project.inputs, total_secrets)
 
             # Cleanup approved operation
             approval_server.cleanup_operation(approval_token)
@@ -621,7 +672,7 @@ Please verify the service directory exists and contains a docker-compose file.""
             response_parts = [
                 "✅ Docker Compose scan completed!\n\n",
                 "**Service:** {}\n".format(service),
-                "**File:** {}\n".format(file_path),
+                "**Files:** {}\n".format(", ".join(project.inputs)),
                 "**Compose Version:** {}\n\n".format(compose_version),
                 "**Secrets Found (tokenized):**\n",
             ]
@@ -629,29 +680,31 @@ Please verify the service directory exists and contains a docker-compose file.""
             if secrets_by_container:
                 for container, secrets in secrets_by_container.items():
                     response_parts.append("\n*Container: {}*\n".format(container))
-                    for key, token in secrets.items():
-                        response_parts.append("  • {}: {}\n".format(key, token))
+                    for key, (token, sources) in secrets.items():
+                        response_parts.append(
+                            "  • {}: {} (from {})\n".format(key, token, ", ".join(sources))
+                        )
             else:
-                response_parts.append("  No inline secrets detected\n")
+                response_parts.append("  No secrets detected\n")
 
             if env_files:
-                response_parts.append("\n**env_file References:**\n")
+                response_parts.append("\n**env_files Loaded:**\n")
                 for ef in env_files:
                     response_parts.append("  • {}\n".format(ef))
-                response_parts.append(
-                    "\nℹ️ Use vault_scan_env to scan these .env files " "separately.\n"
-                )
+
+            if warnings:
+                response_parts.append("\n**Warnings:**\n")
+                for warning in warnings:
+                    response_parts.append("  ⚠️ {}\n".format(warning))
 
             response_parts.append(
                 "\n**Summary:**\n"
                 "- Total containers: {}\n"
                 "- Secrets found: {}\n\n"
                 "**Next Steps:**\n"
-                "1. If env_file references found, scan those files with "
-                "vault_scan_env\n"
-                "2. Use vault_set to store tokenized secrets to Vault\n"
-                "3. Consider updating compose file to use vault_inject "
-                "generated .env files".format(len(services), total_secrets)
+                "1. Use vault_set to store tokenized secrets to Vault\n"
+                "2. Consider updating compose file to use vault_inject "
+                "generated .env files".format(len(environments), total_secrets)
             )
 
             return [TextContent(type="text", text="".join(response_parts))]
@@ -664,3 +717,314 @@ Please verify the service directory exists and contains a docker-compose file.""
                     text=f"❌ Error executing scan: {e}",
                 )
             ]
+
+
+class VaultScanWorkspaceTool(ToolHandler):
+    """Tool for scanning every .env and compose file in the workspace at once."""
+
+    def __init__(self):
+        super().__init__("vault_scan_workspace")
+        self.audit_logger = AuditLogger()
+
+    def get_tool_description(self) -> Tool:
+        return Tool(
+            name=self.name,
+            description="""Scan all services in the workspace for secrets with ONE approval.
+
+Walks the allowed directories (e.g. /workspace/proxmox-services), finds .env*,
+docker-compose*.yml and compose*.yml (including override files) in every
+service directory, and classifies them in parallel.
+
+⚠️ SECURITY: Same WebAuthn approval workflow as vault_scan_env:
+
+PHASE 1 - Call WITHOUT approval_token:
+  - Discovers and classifies files (no values leave the server); answered
+    from the background watcher's warm results when they are up to date, and
+    files unchanged since the last completed workspace scan are not re-read
+  - Reports changes since that scan: new/removed files, new/removed secrets,
+    secrets whose value changed (no approval needed: use for drift checks)
+  - Creates ONE pending SCAN_WORKSPACE operation with per-service counts
+  - Returns approval URL
+
+PHASE 2 - User approves in the browser with WebAuthn
+
+PHASE 3 - Call WITH approval_token="{op_id}":
+  - Re-reads the approved files and tokenizes detected secrets
+  - Returns tokens grouped by service and file
+
+Use vault_scan_env / vault_scan_compose for a single file.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": (
+                            "Optional: Directory to scan (must be inside the allowed "
+                            "directories; default: all allowed directories)"
+                        ),
+                    },
+                    "approval_token": {
+                        "type": "string",
+                        "description": (
+                            "Approval token from WebAuthn authentication. "
+                            "Only provide after user has approved via the web UI."
+                        ),
+                    },
+                },
+                "required": [],
+            },
+        )
+
+    def run_tool(self, arguments: dict) -> Sequence[TextContent]:
+        # Load and validate session
+        session = VaultSession.from_environment()
+        if not session:
+            error = VaultSession(
+                vault_addr="", vault_token="", vault_token_expiry=0
+            ).validate_or_error()
+            return [TextContent(type="text", text=f"❌ {error}")]
+
+        error = session.validate_or_error()
+        if error:
+            return [TextContent(type="text", text=f"❌ {error}")]
+
+        approval_token = arguments.get("approval_token")
+        if approval_token:
+            return self._execute_scan(approval_token)
+
+        roots = None
+        path = arguments.get("path")
+        if path:
+            try:
+                resolved = get_allowed_roots().check(path)
+            except ValidationError as e:
+                return [TextContent(type="text", text=f"❌ {e}")]
+            if not resolved.is_dir():
+                return [TextContent(type="text", text=f"❌ Not a directory: {path}")]
+            roots = [resolved]
+
+        return self._create_pending_scan(roots)
+
+    def _create_pending_scan(self, roots) -> Sequence[TextContent]:
+        """Phase 1: Classify the workspace and create one pending operation."""
+        try:
+            manifest = get_scan_manifest()
+            watcher = get_watcher()
+            scan = watcher.snapshot() if watcher is not None and roots is None else None
+            if scan is not None:
+                delta = manifest.compare(scan.files, scan.roots)
+            else:
+                scan, delta = manifest.rescan(roots, record=False)
+            summary = scan.summary()
+            summary["changes"] = delta.summary()
+            if not summary["file_count"]:
+                return [
+                    TextContent(
+                        type="text",
+                        text="No .env or compose files found under: {}".format(
+                            ", ".join(summary["roots"]) or "(no allowed directories exist)"
+                        ),
+                    )
+                ]
+
+            approval_server = get_approval_server()
+            op_id = approval_server.create_operation(
+                service="workspace",
+                action="SCAN_WORKSPACE",
+                secrets={},  # Counts only; values are read after approval
+                warnings=[],
+                scan_file_path=", ".join(summary["roots"]),
+                metadata=summary,
+            )
+            approval_url = approval_server.get_approval_url(op_id)
+
+            self.audit_logger.log(
+                service="workspace",
+                action="SCAN_WORKSPACE_REQUESTED",
+                details=(
+                    "roots={} files={} services={} potential_secrets={} rescanned={} op_id={}"
+                ).format(
+                    ",".join(summary["roots"]),
+                    summary["file_count"],
+                    len(summary["services"]),
+                    summary["secret_count"],
+                    delta.rescanned,
+                    op_id,
+                ),
+            )
+
+            lines = [
+                "  • {}: {} secret(s), {} config value(s) in {} file(s){}".format(
+                    name,
+                    svc["secret_count"],
+                    svc["config_count"],
+                    len(svc["files"]),
+                    " ⚠️ {} unreadable".format(len(svc["errors"])) if svc["errors"] else "",
+                )
+                for name, svc in summary["services"].items()
+            ]
+            msg = (
+                "⚠️ SECURITY CHECKPOINT - WORKSPACE SCAN APPROVAL REQUIRED\n\n"
+                "This operation will read secrets from {} file(s) in {} service(s):\n"
+                "{}\n\n"
+                "Detected: {} potential secret(s), {} config value(s)\n\n"
+                "{}\n\n"
+                "The secrets will be tokenized (replaced with @token-xxx tokens) "
+                "so AI never sees plaintext values.\n\n"
+                "To approve this scan:\n"
+                "  1. Open: {}\n"
+                "  2. Review the per-service details\n"
+                "  3. Authenticate with WebAuthn (TouchID/Windows Hello/YubiKey)\n\n"
+                "After approval, call:\n"
+                '  vault_scan_workspace(approval_token="{}")'
+            ).format(
+                summary["file_count"],
+                len(summary["services"]),
+                "\n".join(lines),
+                summary["secret_count"],
+                summary["config_count"],
+                self._format_changes(manifest.scanned_at, delta),
+                approval_url,
+                op_id,
+            )
+            return [TextContent(type="text", text=msg)]
+
+        except Exception as e:
+            return [TextContent(type="text", text=f"❌ Error creating scan operation: {e}")]
+
+    @staticmethod
+    def _format_changes(scanned_at, delta) -> str:
+        """Describe the delta against the last completed workspace scan."""
+        if scanned_at is None:
+            return "Changes: first workspace scan (no previous scan recorded)"
+        if delta.is_empty:
+            return "Changes since last scan ({}): none".format(scanned_at)
+
+        lines = ["Changes since last scan ({}):".format(scanned_at)]
+        for title, paths in (
+            ("New file", delta.new_files),
+            ("Removed file", delta.removed_files),
+            ("Changed file", delta.changed_files),
+        ):
+            lines.extend("  • {}: {}".format(title, path) for path in paths)
+        for title, labels in (
+            ("New secret", delta.new_secrets),
+            ("Removed secret", delta.removed_secrets),
+            ("Changed value", delta.changed_secrets),
+        ):
+            for path, keys in labels.items():
+                lines.append("  • {}(s) in {}: {}".format(title, path, ", ".join(keys)))
+        return "\n".join(lines)
+
+    def _execute_scan(self, approval_token: str) -> Sequence[TextContent]:
+        """Phase 3: Tokenize secrets in the approved files."""
+        try:
+            approval_server = get_approval_server()
+            if not approval_server.check_approval(approval_token):
+                return [
+                    TextContent(
+                        type="text",
+                        text=(
+                            "❌ Operation not approved or expired.\n\n"
+                            "Please restart the approval workflow:\n"
+                            "  1. Call vault_scan_workspace() without approval_token\n"
+                            "  2. Open the approval URL in your browser\n"
+                            "  3. Complete WebAuthn authentication\n"
+                            "  4. Call again with the approval token"
+                        ),
+                    )
+                ]
+
+            op = approval_server.pending_ops[approval_token]
+            if op.action != "SCAN_WORKSPACE":
+                return [
+                    TextContent(type="text", text="❌ Approval token is not for a workspace scan.")
+                ]
+
+            # Only the files the user approved, re-validated against the roots
+            roots = get_allowed_roots()
+            files = []
+            for service, svc in (op.metadata or {}).get("services", {}).items():
+                for path in svc["files"]:
+                    kind = classify_file_kind(Path(path).name)
+                    if kind is not None:
+                        roots.check(path)
+                        files.append((path, service, kind))
+
+            vault = get_token_vault()
+            manifest = get_scan_manifest()
+
+            # Warm results from the watcher where up to date, scan the rest now
+            watcher = get_watcher()
+            warm = []
+            for path, service, _ in files:
+                result = watcher.lookup(path) if watcher is not None else None
+                warm.append(result if result is not None and result.service == service else None)
+            missing = [f for f, result in zip(files, warm) if result is None]
+            scanned = iter(scan_files(missing, include_values=True, digest_key=manifest.key))
+            results = [result or next(scanned) for result in warm]
+
+            from ..migration_state import mark_scanned
+
+            by_service = {}
+            for result in results:
+                by_service.setdefault(result.service, []).append(result)
+
+            total_secrets = 0
+            response_parts = ["✅ Workspace scan completed!\n"]
+            for service, service_results in by_service.items():
+                response_parts.append("\n**Service:** {}\n".format(service))
+                service_secrets = 0
+                for result in service_results:
+                    if result.error:
+                        response_parts.append("  ⚠️ {}: {}\n".format(result.path, result.error))
+                        continue
+                    response_parts.append(
+                        "  *{}* ({} config value(s))\n".format(result.path, result.config_count)
+                    )
+                    for label, value in result.secrets.items():
+                        container, _, key = label.rpartition("/")
+                        metadata = {
+                            "service": service,
+                            "key": key,
+                            "source": "workspace_scan",
+                            "file": result.path,
+                        }
+                        if container:
+                            metadata["container"] = container
+                        token = vault.tokenize(value, metadata=metadata)
+                        response_parts.append("    • {}: {}\n".format(label, token))
+                        service_secrets += 1
+
+                mark_scanned(service, [r.path for r in service_results], service_secrets)
+                total_secrets += service_secrets
+
+            # Baseline for the next scan's change report
+            manifest.record(results, op.metadata["roots"])
+
+            self.audit_logger.log(
+                service="workspace",
+                action="SCAN_WORKSPACE_SUCCESS",
+                details="files={} services={} secrets={}".format(
+                    len(results), len(by_service), total_secrets
+                ),
+            )
+            approval_server.cleanup_operation(approval_token)
+
+            response_parts.append(
+                "\n**Summary:**\n"
+                "- Services: {}\n"
+                "- Files: {}\n"
+                "- Secrets tokenized: {}\n\n"
+                "**Next Steps:**\n"
+                "Use vault_set per service to store tokenized secrets to Vault.".format(
+                    len(by_service), len(results), total_secrets
+                )
+            )
+            return [TextContent(type="text", text="".join(response_parts))]
+
+        except Exception as e:
+            self.audit_logger.log(
+                service="workspace", action="SCAN_WORKSPACE_FAILED", details=str(e)
+            )
+            return [TextContent(type="text", text=f"❌ Error executing scan: {e}")]
@@ -119,40 +119,25 @@ Claude Code MUST:
                 )
             ]
 
-        # Validate all keys and values
-        all_warnings = []
-        try:
-            for key, value in secrets.items():
-                # Validate key name
-                SecurityValidator.validate_key_name(key)
-
-                # Validate value constraints
-                SecurityValidator.validate_secret_value(value)
-
-                # Detect dangerous patterns
-                warnings = SecurityValidator.detect_dangerous_patterns(value)
-                if warnings:
-                    all_warnings.extend([f"{key}: {w}" for w in warnings])
-
-        except ValidationError as e:
-            self.audit_logger.log("VALIDATION_FAILED", service, str(e))
-            return [TextContent(type="text", text=f"❌ Validation failed: {e}")]
+        # Validate all keys and values (every problem is reported at once)
+        errors, all_warnings = SecurityValidator.validate_secrets_batch(secrets)
+        if errors:
+            self.audit_logger.log("VALIDATION_FAILED", service, "; ".join(errors))
+            error_lines = "\n".join(f"  - {e}" for e in errors)
+            return [TextContent(type="text", text=f"❌ Validation failed:\n{error_lines}")]
 
         # Check if service exists (to determine CREATE vs UPDATE)
         client = VaultClient(session.vault_addr, session.vault_token)
         existing_response = client.get_secret(service)
         action = "UPDATE" if existing_response.success else "CREATE"
 
-        # Merge with existing secrets if updating
-        if action == "UPDATE":
-            existing_secrets = existing_response.data["secrets"]
-            merged_secrets = {**existing_secrets, **secrets}
-            new_keys = set(secrets.keys()) - set(existing_secrets.keys())
-            updated_keys = set(secrets.keys()) & set(existing_secrets.keys())
-        else:
-            merged_secrets = secrets
-            new_keys = set(secrets.keys())
-            updated_keys = set()
+        # Only the key names of existing secrets are used here: their values are
+        # merged in after approval, so they never reach the preview or the
+        # pending operation
+        existing_keys = set(existing_response.data["secrets"]) if action == "UPDATE" else set()
+        new_keys = set(secrets.keys()) - existing_keys
+        updated_keys = set(secrets.keys()) & existing_keys
+        kept_keys = existing_keys - set(secrets.keys())
 
         # Show preview
         preview_lines = [f"🔐 Preview: {action} secrets for service '{service}'", ""]
@@ -169,6 +154,12 @@ Claude Code MUST:
                 preview_lines.append(f"  ~ {key}")
             preview_lines.append("")
 
+        if kept_keys:
+            preview_lines.append(f"Unchanged keys kept ({len(kept_keys)}):")
+            for key in sorted(kept_keys):
+                preview_lines.append(f"  = {key}")
+            preview_lines.append("")
+
         if all_warnings:
             preview_lines.append("⚠️  Security Warnings:")
             for warning in all_warnings:
@@ -176,7 +167,7 @@ Claude Code MUST:
             preview_lines.append("")
 
         preview_lines.append("Data to write:")
-        preview_lines.append(f"```json\n{json.dumps(merged_secrets, indent=2)}\n```")
+        preview_lines.append(f"```json\n{json.dumps(secrets, indent=2)}\n```")
 
         preview_text = "\n".join(preview_lines)
 
@@ -196,42 +187,16 @@ To actually write these secrets, call vault_set without dry_run=true.""",
 
         # SECURITY CHECKPOINT: Require WebAuthn approval
         if not approval_token:
-            # Detokenize secrets for approval UI display
-            # The approval UI is local-only, so it's safe to show real values
-            # This allows users to verify what they're approving
-            detokenized_secrets = {}
-            tokens_map = {}  # Maps key -> token for display
-
-            # Check if any values are tokens
-            has_tokens = any(
-                isinstance(v, str) and v.startswith("@token-") for v in merged_secrets.values()
-            )
-
-            if has_tokens:
-                token_vault = get_token_vault()
-                for key, value in merged_secrets.items():
-                    if isinstance(value, str) and value.startswith("@token-"):
-                        # Store the token for display
-                        tokens_map[key] = value
-                        # Detokenize the value
-                        try:
-                            detokenized_secrets[key] = token_vault.detokenize(value)
-                        except Exception as e:
-                            print(f"[VaultSet] Warning: Failed to detokenize {key}: {e}")
-                            detokenized_secrets[key] = value  # Keep token if failed
-                    else:
-                        detokenized_secrets[key] = value
-            else:
-                detokenized_secrets = merged_secrets
-
-            # Create pending operation and get approval server
+            # Only the new or changed values are stored, exactly as given
+            # (tokens included): the approval UI resolves tokens at render time
+            # via the token-resolution service, so no plaintext is copied into
+            # pending-operations.json
             approval_server = get_approval_server()
             op_id, approval_url = approval_server.create_pending_operation(
                 service=service,
                 action=action,
-                secrets=detokenized_secrets,  # Pass detokenized values
+                secrets=secrets,
                 warnings=all_warnings if all_warnings else None,
-                tokens_map=tokens_map if tokens_map else None,  # Pass token mapping
             )
 
             self.audit_logger.log(
@@ -289,11 +254,11 @@ Operation expires in 5 minutes.""",
             vault = get_token_vault()
 
             # Detokenize all token values
-            detokenized_secrets = vault.detokenize_dict(merged_secrets)
+            detokenized_secrets = vault.detokenize_dict(secrets)
 
             # Count how many were detokenized
             token_count = sum(
-                1 for v in merged_secrets.values() if isinstance(v, str) and v.startswith("@token-")
+                1 for v in secrets.values() if isinstance(v, str) and v.startswith("@token-")
             )
 
             if token_count > 0:
@@ -303,7 +268,11 @@ Operation expires in 5 minutes.""",
                     f"Detokenized {token_count} token(s) before writing to Vault",
                 )
         else:
-            detokenized_secrets = merged_secrets
+            detokenized_secrets = secrets
+
+        # Merge with the existing secrets only now, after approval
+        if action == "UPDATE":
+            detokenized_secrets = {**existing_response.data["secrets"], **detokenized_secrets}
 
         # Write detokenized secrets to Vault
         write_response = client.write_secret(service, detokenized_secrets)
@@ -322,6 +291,14 @@ Operation expires in 5 minutes.""",
         # Success! Clean up pending operation
         approval_server.cleanup_operation(approval_token)
 
+        # Re-point tokens issued for the written keys so they never resolve
+        # to a rotated-out value
+        token_vault = get_token_vault()
+        for key in secrets:
+            value = detokenized_secrets.get(key)
+            if isinstance(value, str):
+                token_vault.repoint(service, key, value)
+
         version = write_response.data.get("version", "N/A")
         keys_written = ", ".join(secrets.keys())
         self.audit_logger.log("SUCCESS", service, f"{action} version={version} keys={keys_written}")
@@ -342,6 +319,6 @@ Next steps:
   1. List secrets: vault_list with service='{service}'
   2. Inject to .env: vault_inject with service='{service}'
 
-Audit log: Operation logged to .claude-vault-audit.log""",
+Audit log: Operation logged to ~/.claude-vault/audit/""",
             )
         ]
@@ -0,0 +1,472 @@
+"""
+Background watcher keeping workspace scan results warm.
+
+Subscribes to filesystem events under the allowed roots (inotify via ctypes
+on Linux, periodic stat polling elsewhere) and re-parses and re-classifies
+.env and compose files as they change. vault_scan_* calls then answer from
+the warm result set instead of reading files at request time, and fall back
+to a synchronous scan for anything the watcher has not caught up with.
+
+Started with the MCP server (see __init__.main). Configuration:
+- VAULT_WATCH: auto (default; inotify if available, else poll), inotify,
+  poll, or off
+- VAULT_WATCH_INTERVAL: Poll interval in seconds (default: 5)
+
+Results include secret values (needed to tokenize after approval). They are
+held only in this process's memory, like the TokenVault's, and never written
+anywhere.
+
+Example:
+    watcher = start_watcher()
+    result = watcher.lookup("/workspace/proxmox-services/app/.env")
+    if result is None:
+        ...  # Not warm: scan synchronously
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import secrets
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .file_parsers import RACY_WINDOW_NS
+from .workspace_scan import (
+    MAX_SCAN_DEPTH,
+    SKIP_DIRS,
+    FileScan,
+    WorkspaceScan,
+    classify_file_kind,
+    file_identity,
+    scan_files,
+    walk_workspace,
+)
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+# Events watched on every directory (file writes are picked up on close)
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_DONT_FOLLOW
+)
+
+# struct inotify_event header: wd, mask, cookie, len (name follows)
+_EVENT = struct.Struct("iIII")
+
+# Default poll interval (seconds)
+POLL_INTERVAL = 5.0
+
+# Quiet period before rescanning, so an editor's burst of writes is one rescan
+DEBOUNCE = 0.1
+
+
+class Inotify:
+    """Minimal inotify(7) binding over ctypes (Linux only)."""
+
+    def __init__(self):
+        """
+        Create an inotify instance.
+
+        Raises:
+            OSError: If inotify is unavailable
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_init1: {os.strerror(code)}")
+        self.fd = fd
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        """Watch a directory (re-adding an existing watch returns its descriptor)."""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Stop watching (errors ignored: the directory may already be gone)."""
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """
+        Wait up to timeout seconds and read the queued events.
+
+        Returns:
+            (wd, mask, name) per event (name is "" for events on the directory)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """Close the inotify descriptor (drops all watches)."""
+        os.close(self.fd)
+
+
+class WorkspaceWatcher:
+    """
+    Keeps scan results for every file under the roots up to date.
+
+    With inotify, changed paths are marked pending as soon as their event is
+    read and rescanned after a short quiet period; directory changes and
+    queue overflows trigger a full resync (a walk plus one stat() per file).
+    Polling resyncs every interval, so lookups additionally compare the
+    file's stat identity before trusting a result.
+
+    Results are replaced, never mutated, so callers may keep them; treat them
+    as read-only.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        backend: str = "auto",
+        interval: float = POLL_INTERVAL,
+        digest_key: Optional[bytes] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            roots: Directories to watch
+            backend: "auto", "inotify" or "poll"
+            interval: Poll interval in seconds
+            digest_key: Value digest key; pass the scan manifest's key to compare
+                results against it (default: a random key)
+            max_workers: Scan pool size (default: VAULT_SCAN_WORKERS or CPU count)
+        """
+        self.roots = [Path(r) for r in roots]
+        self.backend = backend
+        self.interval = interval
+        # Scanning with a key also records the stat identities lookups rely on
+        self.digest_key = digest_key or secrets.token_bytes(32)
+        self.max_workers = max_workers
+        self.rescans = 0
+
+        self._results: Dict[str, FileScan] = {}
+        self._pending: Dict[str, Tuple[str, str]] = {}  # path → (service, kind)
+        self._resync = True
+        self._watches: Dict[int, Tuple[str, int, str]] = {}  # wd → (dir, depth, service)
+        self._inotify: Optional[Inotify] = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Pick the backend and start watching in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return  # Already running
+
+        if self.backend in ("auto", "inotify"):
+            try:
+                if not sys.platform.startswith("linux"):
+                    raise OSError(errno.ENOSYS, "inotify requires Linux")
+                self._inotify = Inotify()
+                self.backend = "inotify"
+            except OSError as e:
+                if self.backend == "inotify":
+                    print(f"Warning: {e}; watching by polling instead", file=sys.stderr)
+                self.backend = "poll"
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vault-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and drop the warm results."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        with self._lock:
+            self._ready.clear()
+            self._results.clear()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the initial scan; returns False on timeout."""
+        return self._ready.wait(timeout)
+
+    def _fresh(self, result: FileScan) -> bool:
+        """In poll mode, check the file still has the identity it was scanned with."""
+        if self.backend != "poll":
+            return True
+        try:
+            return result.identity == file_identity(os.stat(result.path))
+        except OSError:
+            return False
+
+    def lookup(self, path: str) -> Optional[FileScan]:
+        """
+        Get the warm result for a file.
+
+        Args:
+            path: File path
+
+        Returns:
+            FileScan (with values), or None if the file is not watched, has
+            pending changes, or the watcher is not ready
+        """
+        with self._lock:
+            if not self._ready.is_set() or self._resync:
+                return None
+            path = path if path in self._results else os.path.realpath(path)
+            if path in self._pending:
+                return None
+            result = self._results.get(path)
+        return result if result is not None and self._fresh(result) else None
+
+    def snapshot(self) -> Optional[WorkspaceScan]:
+        """
+        Get warm results for all roots, grouped by service.
+
+        Returns:
+            WorkspaceScan (with values), or None while changes are pending
+        """
+        with self._lock:
+            if not self._ready.is_set() or self._resync or self._pending:
+                return None
+            results = [self._results[path] for path in sorted(self._results)]
+        if not all(self._fresh(r) for r in results):
+            return None
+
+        scan = WorkspaceScan(roots=[str(r) for r in self.roots])
+        for result in results:
+            scan.services.setdefault(result.service, []).append(result)
+        return scan
+
+    def stats(self) -> dict:
+        """Get watcher statistics."""
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "ready": self._ready.is_set(),
+                "files": len(self._results),
+                "pending": len(self._pending) + (1 if self._resync else 0),
+                "watches": len(self._watches),
+                "rescans": self.rescans,
+            }
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                self._process()
+                self._ready.set()
+                if self._inotify is not None:
+                    self._wait_for_events()
+                elif not self._stop.wait(self.interval):
+                    with self._lock:
+                        self._resync = True
+        except Exception as e:
+            # Lookups return None from now on, so tools scan synchronously
+            self._ready.clear()
+            print(f"Warning: Workspace watcher stopped: {e}", file=sys.stderr)
+
+    def _wait_for_events(self) -> None:
+        """Block until events arrive, then collect them until a quiet period."""
+        events = self._inotify.read_events(timeout=1.0)
+        while events and not self._stop.is_set():
+            for event in events:
+                self._handle(*event)
+            events = self._inotify.read_events(timeout=DEBOUNCE)
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        """Mark the file an event refers to as pending (or schedule a resync)."""
+        if mask & IN_Q_OVERFLOW:
+            with self._lock:
+                self._resync = True
+            return
+        watch = self._watches.get(wd)
+        if watch is None:
+            return
+        directory, depth, service = watch
+        if mask & IN_IGNORED:
+            del self._watches[wd]
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF) or (
+            mask & IN_ISDIR and depth < MAX_SCAN_DEPTH and name not in SKIP_DIRS
+        ):
+            # Directories appeared, vanished or moved: re-walk
+            with self._lock:
+                self._resync = True
+            return
+
+        kind = classify_file_kind(name)
+        if kind is not None and not mask & IN_ISDIR:
+            with self._lock:
+                self._pending[os.path.join(directory, name)] = (service, kind)
+
+    def _watch(self, directories: List[Tuple[str, int, str]]) -> None:
+        """Watch exactly the walked directories (inotify reuses descriptors)."""
+        watches = {}
+        for directory, depth, service in directories:
+            try:
+                watches[self._inotify.add_watch(directory)] = (directory, depth, service)
+            except OSError as e:
+                if e.errno in (errno.ENOSPC, errno.ENOMEM):
+                    # Out of watches (fs.inotify.max_user_watches): poll instead
+                    print(f"Warning: {e}; watching by polling instead", file=sys.stderr)
+                    self._inotify.close()
+                    self._inotify = None
+                    self.backend = "poll"
+                    self._watches = {}
+                    return
+                # Directory vanished or unreadable: the next resync retries
+        for wd in self._watches.keys() - watches.keys():
+            self._inotify.rm_watch(wd)
+        self._watches = watches
+
+    def _process(self) -> None:
+        """Rescan pending files, or resync everything."""
+        with self._lock:
+            resync = self._resync
+            pending = dict(self._pending)
+            known = dict(self._results)
+
+        stale: List[Tuple[str, str, str]] = []
+        removed = []
+        if resync:
+            directories = []
+            files = []
+            for directory, depth, service, found in walk_workspace(self.roots):
+                directories.append((directory, depth, service))
+                files.extend(found)
+            if self._inotify is not None:
+                self._watch(directories)
+            now = time.time_ns()
+            for path, service, kind in files:
+                result = known.get(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if (
+                    path in pending
+                    or result is None
+                    or result.identity != file_identity(st)
+                    or now - st.st_mtime_ns < RACY_WINDOW_NS
+                ):
+                    stale.append((path, service, kind))
+            removed = known.keys() - {f[0] for f in files}
+        else:
+            for path, (service, kind) in pending.items():
+                if os.path.isfile(path) and not os.path.islink(path):
+                    stale.append((path, service, kind))
+                else:
+                    removed.append(path)
+
+        results = scan_files(
+            stale, include_values=True, max_workers=self.max_workers, digest_key=self.digest_key
+        )
+
+        with self._lock:
+            for path in removed:
+                self._results.pop(path, None)
+            for result in results:
+                self._results[result.path] = result
+            for path in pending:
+                self._pending.pop(path, None)
+            if resync:
+                self._resync = False
+            if stale or removed:
+                self.rescans += 1
+
+
+# Global instance (started by the MCP server process)
+_watcher: Optional[WorkspaceWatcher] = None
+
+
+def start_watcher() -> Optional[WorkspaceWatcher]:
+    """
+    Start the process-wide watcher over the allowed roots.
+
+    Disabled with VAULT_WATCH=off, or when none of the allowed roots exist.
+
+    Returns:
+        Running watcher, or None if disabled
+    """
+    global _watcher
+
+    mode = os.getenv("VAULT_WATCH", "auto").lower()
+    if mode in ("0", "false", "no", "off"):
+        return None
+    if mode not in ("auto", "inotify", "poll"):
+        print(f"Warning: Unknown VAULT_WATCH={mode!r}, using auto", file=sys.stderr)
+        mode = "auto"
+
+    if _watcher is None:
+        from .scan_manifest import get_scan_manifest
+        from .security import get_allowed_roots
+
+        roots = [r for r in get_allowed_roots().roots if r.is_dir()]
+        if not roots:
+            return None
+        try:
+            interval = float(os.getenv("VAULT_WATCH_INTERVAL", POLL_INTERVAL))
+        except ValueError:
+            interval = POLL_INTERVAL
+
+        watcher = WorkspaceWatcher(
+            roots, backend=mode, interval=interval, digest_key=get_scan_manifest().key
+        )
+        watcher.start()
+        _watcher = watcher
+
+    return _watcher
+
+
+def get_watcher() -> Optional[WorkspaceWatcher]:
+    """Get the running watcher (None if not started)."""
+    return _watcher
@@ -0,0 +1,369 @@
+"""
+Workspace-wide discovery of secrets in .env and docker-compose files.
+
+Walks the allowed roots (see security.get_allowed_roots), finds `.env*`,
+compose and compose override files, and parses and classifies them on a
+process pool. Results are grouped by service: the first directory level
+under a root, matching the /workspace/proxmox-services/{service}/ layout
+used by the per-file scan tools.
+
+Example:
+    scan = scan_workspace()
+    for service, files in scan.services.items():
+        print(service, sum(len(f.secrets) for f in files))
+"""
+
+import atexit
+import hashlib
+import hmac
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .classifier import get_classifier
+from .file_parsers import parse_docker_compose, parse_env_file
+
+# Compose file names (overrides such as docker-compose.prod.yml also match)
+COMPOSE_PREFIXES = ("docker-compose.", "compose.")
+COMPOSE_SUFFIXES = (".yml", ".yaml")
+
+# .env variants that hold placeholders rather than real values
+ENV_TEMPLATE_SUFFIXES = (".example", ".sample", ".template", ".dist", ".tpl")
+
+# Directories never descended into
+SKIP_DIRS = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".cache"}
+
+# Directory levels below a root that are searched
+MAX_SCAN_DEPTH = 4
+
+# Files larger than this are reported as errors instead of parsed (matches
+# the per-file scan tools)
+MAX_SCAN_FILE_SIZE = 5 * 1024 * 1024
+
+# Below this many files a pool costs more to start than it saves
+MIN_FILES_FOR_POOL = 32
+
+
+@dataclass
+class FileScan:
+    """Classification of one discovered file."""
+
+    path: str
+    service: str
+    kind: str  # "env" or "compose"
+    # Secret keys ("KEY", or "container/KEY" for compose) → value, or None
+    # when values were not requested
+    secrets: Dict[str, Optional[str]] = field(default_factory=dict)
+    config_count: int = 0
+    error: Optional[str] = None
+    # Recorded when scanning with a digest key (see scan_manifest.py):
+    # stat identity (dev, ino, mtime_ns, size), content digest, and keyed
+    # digests of the secret values
+    identity: Optional[Tuple[int, int, int, int]] = None
+    digest: Optional[str] = None
+    value_digests: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class WorkspaceScan:
+    """Per-service results of a workspace scan."""
+
+    roots: List[str]
+    services: Dict[str, List[FileScan]] = field(default_factory=dict)
+
+    @property
+    def files(self) -> Iterator[FileScan]:
+        """All scanned files."""
+        for files in self.services.values():
+            yield from files
+
+    def summary(self) -> Dict:
+        """JSON-serializable counts (no values) per service and in total."""
+        services = {}
+        for service, files in sorted(self.services.items()):
+            services[service] = {
+                "files": [f.path for f in files],
+                "secret_count": sum(len(f.secrets) for f in files),
+                "config_count": sum(f.config_count for f in files),
+                "errors": [f"{f.path}: {f.error}" for f in files if f.error],
+            }
+        return {
+            "roots": self.roots,
+            "file_count": sum(len(s["files"]) for s in services.values()),
+            "secret_count": sum(s["secret_count"] for s in services.values()),
+            "config_count": sum(s["config_count"] for s in services.values()),
+            "services": services,
+        }
+
+
+def classify_file_kind(name: str) -> Optional[str]:
+    """Return "env", "compose" or None for a file name."""
+    if name == ".env" or (name.startswith(".env.") and not name.endswith(ENV_TEMPLATE_SUFFIXES)):
+        return "env"
+    if name.startswith(COMPOSE_PREFIXES) and name.endswith(COMPOSE_SUFFIXES):
+        return "compose"
+    return None
+
+
+def walk_workspace(
+    roots: Iterable[Path], max_depth: int = MAX_SCAN_DEPTH
+) -> Iterator[Tuple[str, int, str, List[Tuple[str, str, str]]]]:
+    """
+    Walk the directories searched for candidate files.
+
+    Symlinks (to files or directories) are not followed, so the walk cannot
+    leave the roots.
+
+    Args:
+        roots: Directories to search
+        max_depth: Directory levels below each root to descend
+
+    Yields:
+        (directory, depth, service, [(path, service, kind), ...]) per directory
+    """
+    for root in roots:
+        root = Path(root)
+        stack = [(str(root), 0, None)]
+        while stack:
+            directory, depth, service = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            files = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth < max_depth and entry.name not in SKIP_DIRS:
+                        stack.append((entry.path, depth + 1, service or entry.name))
+                elif entry.is_file(follow_symlinks=False):
+                    kind = classify_file_kind(entry.name)
+                    if kind is not None:
+                        files.append((entry.path, service or root.name, kind))
+            yield directory, depth, service or root.name, files
+
+
+def discover_files(
+    roots: Iterable[Path], max_depth: int = MAX_SCAN_DEPTH
+) -> List[Tuple[str, str, str]]:
+    """
+    Find candidate files under the given roots (see walk_workspace).
+
+    Args:
+        roots: Directories to search
+        max_depth: Directory levels below each root to descend
+
+    Returns:
+        Sorted list of (path, service, kind)
+    """
+    return sorted(f for _, _, _, files in walk_workspace(roots, max_depth) for f in files)
+
+
+def content_digest(data: bytes) -> str:
+    """Digest of a file's content (as used by the parse cache)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def value_digest(key: bytes, value: str) -> str:
+    """Keyed digest of a secret value: detects changes without storing the value."""
+    return hmac.new(key, value.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def file_identity(st: os.stat_result) -> Tuple[int, int, int, int]:
+    """Stat identity of a file: unchanged identity means unchanged content."""
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def scan_file(
+    path: str,
+    service: str,
+    kind: str,
+    include_values: bool = False,
+    digest_key: Optional[bytes] = None,
+) -> FileScan:
+    """
+    Parse and classify one file (runs in pool workers).
+
+    Args:
+        path: File path
+        service: Service the file belongs to
+        kind: "env" or "compose"
+        include_values: Return secret values (for tokenization) instead of None
+        digest_key: Also record the file's identity, content digest and keyed
+            value digests (for the scan manifest)
+
+    Returns:
+        FileScan (error set if the file could not be read or parsed)
+    """
+    result = FileScan(path=path, service=service, kind=kind)
+    try:
+        if digest_key is not None:
+            # Stat before reading: if the file changes while it is scanned,
+            # the recorded identity is stale and the next rescan catches it
+            with open(path, "rb") as f:
+                result.identity = file_identity(os.fstat(f.fileno()))
+                if result.identity[3] <= MAX_SCAN_FILE_SIZE:
+                    result.digest = content_digest(f.read())
+        if os.path.getsize(path) > MAX_SCAN_FILE_SIZE:
+            result.error = f"larger than {MAX_SCAN_FILE_SIZE // (1024 * 1024)}MB"
+            return result
+
+        if kind == "env":
+            candidates = list(parse_env_file(path).items())
+            labels = [key for key, _ in candidates]
+        else:
+            candidates, labels = _compose_candidates(parse_docker_compose(path))
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+        return result
+
+    verdicts = get_classifier().classify_batch(candidates)
+    for label, (_, value), is_secret in zip(labels, candidates, verdicts):
+        if is_secret:
+            result.secrets[label] = value if include_values else None
+            if digest_key is not None:
+                result.value_digests[label] = value_digest(digest_key, value)
+        else:
+            result.config_count += 1
+    return result
+
+
+def _compose_candidates(compose: Dict) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """Environment (key, value) pairs of every compose service, with labels."""
+    candidates: List[Tuple[str, str]] = []
+    labels: List[str] = []
+    services = compose.get("services") if isinstance(compose, dict) else None
+    for container, config in (services or {}).items():
+        environment = config.get("environment") if isinstance(config, dict) else None
+        if isinstance(environment, dict):
+            pairs = [(k, v) for k, v in environment.items() if isinstance(v, str)]
+        elif isinstance(environment, list):
+            pairs = [
+                tuple(item.split("=", 1))
+                for item in environment
+                if isinstance(item, str) and "=" in item
+            ]
+        else:
+            continue
+        candidates.extend(pairs)
+        labels.extend(f"{container}/{key}" for key, _ in pairs)
+    return candidates, labels
+
+
+def _scan_many(args: Sequence[Tuple[str, str, str, bool, Optional[bytes]]]) -> List[FileScan]:
+    return [scan_file(*a) for a in args]
+
+
+def _workers_from_env() -> int:
+    """Pool size from VAULT_SCAN_WORKERS (default: CPU count, max 8; 0 or 1 = in-process)."""
+    default = min(os.cpu_count() or 1, 8)
+    try:
+        return int(os.getenv("VAULT_SCAN_WORKERS", str(default)))
+    except ValueError:
+        return default
+
+
+# Worker pool, kept between scans (starting workers costs far more than a scan)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the shared worker pool, (re)creating it for a new size."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Not fork: the server process has background threads (audit
+            # sink, approval server) whose locks a forked child could inherit
+            # held. The fork server imports this module once and forks
+            # workers from that clean process.
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker pool (a later scan starts a new one)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def scan_files(
+    files: Sequence[Tuple[str, str, str]],
+    include_values: bool = False,
+    max_workers: Optional[int] = None,
+    digest_key: Optional[bytes] = None,
+) -> List[FileScan]:
+    """
+    Scan files on a process pool (in-process for small batches).
+
+    Args:
+        files: (path, service, kind) tuples, e.g. from discover_files()
+        include_values: Return secret values for tokenization
+        max_workers: Pool size (default: VAULT_SCAN_WORKERS or CPU count)
+        digest_key: Record identities and digests (see scan_file)
+
+    Returns:
+        FileScan per file, in input order
+    """
+    workers = _workers_from_env() if max_workers is None else max_workers
+    args = [(path, service, kind, include_values, digest_key) for path, service, kind in files]
+
+    if workers > 1 and len(args) >= MIN_FILES_FOR_POOL:
+        # Batches of files per task amortize pickling and IPC
+        size = max(1, len(args) // (workers * 4))
+        batches = [args[i : i + size] for i in range(0, len(args), size)]
+        try:
+            pool = _get_pool(workers)
+            return [r for batch in pool.map(_scan_many, batches) for r in batch]
+        except (OSError, RuntimeError) as e:
+            shutdown_pool()
+            print(f"Warning: Scan pool unavailable, scanning in-process: {e}", file=sys.stderr)
+
+    return _scan_many(args)
+
+
+def scan_workspace(
+    roots: Optional[Iterable[Path]] = None,
+    include_values: bool = False,
+    max_workers: Optional[int] = None,
+) -> WorkspaceScan:
+    """
+    Discover and scan every .env and compose file under the roots.
+
+    Args:
+        roots: Directories to scan (default: the allowed roots)
+        include_values: Return secret values for tokenization
+        max_workers: Pool size (default: VAULT_SCAN_WORKERS or CPU count)
+
+    Returns:
+        WorkspaceScan grouped by service
+    """
+    if roots is None:
+        from .security import get_allowed_roots
+
+        roots = [r for r in get_allowed_roots().roots if r.is_dir()]
+    roots = [Path(r) for r in roots]
+
+    scan = WorkspaceScan(roots=[str(r) for r in roots])
+    for result in scan_files(discover_files(roots), include_values, max_workers):
+        scan.services.setdefault(result.service, []).append(result)
+    return scan
@@ -4,6 +4,16 @@ import pytest
 from datetime import datetime, timedelta
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_home(tmp_path_factory):
+    """Keep audit logs and the signing key out of the real home directory."""
+    home = tmp_path_factory.mktemp("home")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("HOME", str(home))
+        mp.setenv("VAULT_AUDIT_LOG", str(home / ".claude-vault" / "audit"))
+        yield home
+
+
 @pytest.fixture
 def sample_secrets():
     """Sample secrets for testing."""
@@ -0,0 +1,70 @@
+"""Tests for atomic file replacement."""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.atomic_io import atomic_open, atomic_write
+from claude_vault_mcp.file_parsers import parse_env_file, write_env_file
+
+
+class TestAtomicWrite:
+    """Atomic replace, permission and concurrency tests."""
+
+    def test_replaces_keeping_mode_and_symlinks(self, tmp_path):
+        """The new content keeps the old permissions; symlinks keep pointing at it."""
+        env = tmp_path / ".env"
+        env.write_text("OLD=1\n")
+        env.chmod(0o640)
+        link = tmp_path / "current.env"
+        link.symlink_to(env)
+
+        write_env_file(str(link), {"API_KEY": "abc123"})
+
+        assert link.is_symlink()
+        assert parse_env_file(str(env)) == {"API_KEY": "abc123"}
+        assert env.stat().st_mode & 0o777 == 0o640
+        assert sorted(os.listdir(tmp_path)) == [".env", "current.env"]
+
+        atomic_write(tmp_path / "new" / "secrets.yaml", b"key: v\n", mode=0o600)
+        assert (tmp_path / "new" / "secrets.yaml").stat().st_mode & 0o777 == 0o600
+
+    def test_failure_leaves_target_untouched(self, tmp_path):
+        """An error while writing keeps the old file and removes the temp file."""
+        env = tmp_path / ".env"
+        env.write_text("DB_PASSWORD=old\n")
+
+        with pytest.raises(RuntimeError):
+            with atomic_open(env) as f:
+                f.write("DB_PASSWORD=")
+                raise RuntimeError("interrupted")
+
+        assert env.read_text() == "DB_PASSWORD=old\n"
+        assert os.listdir(tmp_path) == [".env"]
+
+    def test_concurrent_reader_sees_whole_files(self, tmp_path):
+        """A reader polling during rewrites only ever sees complete versions."""
+        env = tmp_path / ".env"
+        versions = ["".join(f"KEY_{i}={v * 64}\n" for i in range(200)) for v in "ab"]
+        env.write_text(versions[0])
+        done = threading.Event()
+        seen = set()
+
+        def read():
+            while not done.is_set():
+                seen.add(env.read_text())
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for i in range(200):
+                atomic_write(env, versions[i % 2], fsync=False)
+        finally:
+            done.set()
+            reader.join()
+
+        assert seen <= set(versions)
@@ -0,0 +1,373 @@
+"""Tests for the buffered, rotating audit sink."""
+
+import gzip
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.audit import AuditSink, SegmentedLog, load_manifest, read_entries
+from claude_vault_mcp.audit_chain import AuditChain, AuditVerifier, CheckpointSigner
+from claude_vault_mcp.audit_index import AuditIndex
+from claude_vault_mcp.security import AuditLogger, ValidationError
+from claude_vault_mcp.tools.audit import parse_time_bound
+
+
+def _record(i, ts="2025-01-01T00:00:00.000Z"):
+    return {"ts": ts, "action": "SUCCESS", "service": "app", "details": f"event={i}"}
+
+
+class TestAuditSink:
+    """Background writer tests."""
+
+    def test_loggers_share_sink_and_flush(self, tmp_path):
+        """Loggers for the same file share one sink; flush makes entries durable."""
+        log_file = tmp_path / "audit.jsonl"
+        first = AuditLogger(str(log_file))
+        second = AuditLogger(str(log_file))
+
+        first.log("SUCCESS", "app", "one")
+        second.log("FAILED", "app", "two")
+        first.flush()
+
+        assert first.sink is second.sink
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [e["action"] for e in entries] == ["SUCCESS", "FAILED"]
+        assert entries[0]["service"] == "app" and entries[0]["ts"].endswith("Z")
+
+    def test_full_queue_blocks_instead_of_dropping(self, tmp_path):
+        """Concurrent writers through a tiny queue lose no events."""
+        sink = AuditSink(tmp_path / "audit.jsonl", max_queue=2, fsync_interval=None)
+
+        def writer(n):
+            for i in range(200):
+                sink.write(_record(f"{n}-{i}"))
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sink.close()
+
+        assert len((tmp_path / "audit.jsonl").read_text().splitlines()) == 800
+        assert sink.events_written == 800
+
+    def test_group_commit(self, tmp_path):
+        """Events queued while the writer is busy go out in one group."""
+        sink = AuditSink(tmp_path / "audit.jsonl", fsync_interval=0.0)
+        queued = threading.Event()
+        write_group = sink._write_group
+
+        def slow_write_group(records):
+            queued.wait(5)  # Hold the writer until everything is queued
+            write_group(records)
+
+        sink._write_group = slow_write_group
+        for i in range(500):
+            sink.write(_record(i))
+        queued.set()
+        sink.close()
+
+        assert sink.events_written == 500
+        assert sink.groups_written <= 2
+
+
+    def test_writer_survives_failing_log(self, tmp_path):
+        """Errors from append and close are reported; the thread keeps writing."""
+        log = SegmentedLog(tmp_path / "audit.jsonl")
+        append, failures = log.append, []
+
+        def flaky_append(records):
+            if not failures:
+                failures.append(records)
+                raise OSError("disk full")
+            append(records)
+
+        def failing_close():
+            raise OSError("close failed")
+
+        log.append, log.close = flaky_append, failing_close
+        sink = AuditSink(tmp_path / "audit.jsonl", fsync_interval=0.0, log=log)
+        sink.write(_record(0))
+        sink.flush()
+        sink.write(_record(1))
+        sink.flush()
+
+        assert sink._thread.is_alive()
+        assert failures and sink.events_written == 1
+        assert [e["details"] for e in read_entries(tmp_path / "audit.jsonl")] == ["event=1"]
+        sink.close()
+
+
+class TestSegmentedLog:
+    """Rotation, retention and range-read tests."""
+
+    def test_rotate_segment_with_only_a_torn_line(self, tmp_path):
+        """A segment holding a partial first line is sealed, dated by its mtime."""
+        path = tmp_path / "audit.jsonl"
+        path.write_text('{"ts": "2025')
+        os.utime(path, (1735689600, 1735689600))
+        log = SegmentedLog(path)
+        entry = log.rotate()
+
+        assert entry["file"].startswith("audit-20250101T000000Z-")
+        assert entry["start"] == entry["end"] == "2025-01-01T00:00:00.000Z"
+        assert entry["entries"] == 0
+        log.append([_record(0)])
+        log.close()
+        assert [e["details"] for e in read_entries(path)] == ["event=0"]
+
+    def test_size_rotation_and_retention(self, tmp_path):
+        """Full segments are compressed and indexed; only `retain` are kept."""
+        log = SegmentedLog(tmp_path / "audit.jsonl", max_bytes=500, retain=2, compression="gzip")
+        for i in range(40):
+            log.append([_record(i, f"2025-01-01T00:00:{i:02d}.000Z")])
+        log.close()
+
+        segments = load_manifest(tmp_path)["segments"]
+        assert len(segments) == 2
+        assert all((tmp_path / s["file"]).exists() for s in segments)
+        assert len(list(tmp_path.glob("audit-*.jsonl.gz"))) == 2
+        first = gzip.decompress((tmp_path / segments[0]["file"]).read_bytes()).decode()
+        assert json.loads(first.splitlines()[0])["ts"] == segments[0]["start"]
+
+    def test_rotation_by_another_writer(self, tmp_path):
+        """A writer whose segment was rotated away reopens it instead of losing events."""
+        first = SegmentedLog(tmp_path / "audit.jsonl", compression="gzip")
+        second = SegmentedLog(tmp_path / "audit.jsonl", compression="gzip")
+        first.append([_record(0)])
+        second.append([_record(1)])
+        assert second.rotate()["entries"] == 2
+
+        first.append([_record(2)])
+        first.close()
+        second.close()
+
+        assert [e["details"] for e in read_entries(tmp_path / "audit.jsonl")] == [
+            "event=0",
+            "event=1",
+            "event=2",
+        ]
+
+    def test_age_rotation_and_range_reads(self, tmp_path):
+        """Segments rotate by age and range reads skip non-overlapping ones."""
+        log = SegmentedLog(tmp_path / "audit.jsonl", max_age=3600, compression="gzip")
+        for hour in range(5):
+            log.append([_record(hour, f"2025-01-01T{hour:02d}:30:00.000Z")])
+        log.close()
+
+        segments = load_manifest(tmp_path)["segments"]
+        assert [s["start"][11:13] for s in segments] == ["00", "01", "02", "03"]
+
+        (tmp_path / segments[0]["file"]).unlink()  # Outside the range: never opened
+        found = list(
+            read_entries(
+                tmp_path / "audit.jsonl", "2025-01-01T02:00:00.000Z", "2025-01-01T04:00:00.000Z"
+            )
+        )
+        assert [e["details"] for e in found] == ["event=2", "event=3"]
+
+
+class TestAuditIndex:
+    """Indexed audit query tests."""
+
+    def test_sink_feeds_index(self, tmp_path):
+        """Entries written through the sink are queryable with filters and pages."""
+        index = AuditIndex(tmp_path / "index.sqlite3")
+        sink = AuditSink(tmp_path / "audit.jsonl", fsync_interval=None, index=index)
+        for i in range(30):
+            sink.write(
+                {
+                    "ts": f"2025-01-{1 + i % 10:02d}T00:00:00.000Z",
+                    "action": "SUCCESS" if i % 3 else "FAILED",
+                    "service": f"svc{i % 2}",
+                    "details": f"Wrote key_{i}",
+                }
+            )
+        sink.flush()
+
+        page, total = index.query(service="svc0", action="SUCCESS", limit=3, offset=3)
+        assert total == 10
+        assert len(page) == 3
+        assert page[0]["ts"] >= page[-1]["ts"]
+        assert index.counts("action", since="2025-01-06T00:00:00.000Z") == [
+            ("SUCCESS", 10),
+            ("FAILED", 5),
+        ]
+        assert index.query(contains="key_1_")[1] == 0
+        sink.close()
+
+    def test_index_rebuilt_from_log(self, tmp_path):
+        """A missing index is repopulated from the existing segments."""
+        log = SegmentedLog(tmp_path / "audit.jsonl", max_bytes=300, compression="gzip")
+        for i in range(20):
+            log.append([_record(i, f"2025-01-01T00:00:{i:02d}.000Z")])
+        log.close()
+
+        index = AuditIndex(tmp_path / "index.sqlite3")
+        sink = AuditSink(tmp_path / "audit.jsonl", index=index)
+        sink.flush()
+
+        assert index.count() == 20
+        sink.close()
+
+    def test_query_tool_time_filters(self):
+        """Relative, date and timestamp bounds normalize to log timestamps."""
+        assert parse_time_bound("2025-01-31") == "2025-01-31T00:00:00.000Z"
+        assert parse_time_bound("2025-01-31", end=True) == "2025-01-31T23:59:59.999Z"
+        assert parse_time_bound("7d") < parse_time_bound("1h")
+        with pytest.raises(ValidationError):
+            parse_time_bound("last tuesday")
+        with pytest.raises(ValidationError):
+            parse_time_bound("2025-13-01T12:00")
+
+    def test_time_bounds_at_minute_and_second_precision(self):
+        """A minute or second bound includes every stored entry within it."""
+        stored = [
+            "2025-01-31T12:00:00.000Z",
+            "2025-01-31T12:00:42.123Z",
+            "2025-01-31T12:01:00.000Z",
+        ]
+
+        def within(since, until):
+            low, high = parse_time_bound(since), parse_time_bound(until, end=True)
+            return [ts for ts in stored if low <= ts <= high]
+
+        assert parse_time_bound("2025-01-31T12:00") == "2025-01-31T12:00:00.000Z"
+        assert parse_time_bound("2025-01-31T12:00", end=True) == "2025-01-31T12:00:59.999Z"
+        assert parse_time_bound("2025-01-31T12:00:42Z", end=True) == "2025-01-31T12:00:42.999Z"
+        assert parse_time_bound("2025-01-31T12:00:42.5") == "2025-01-31T12:00:42.500Z"
+        assert parse_time_bound("2025-01-31T12:00:42.123456Z") == "2025-01-31T12:00:42.123Z"
+
+        assert within("2025-01-31T12:00", "2025-01-31T12:00") == stored[:2]
+        assert within("2025-01-31T12:00:00Z", "2025-01-31T12:00:00Z") == stored[:1]
+        assert within("2025-01-31T12:00:42", "2025-01-31T12:01") == stored[1:]
+
+
+class TestAuditChain:
+    """Hash chain, checkpoint and incremental verification tests."""
+
+    @staticmethod
+    def _chained_log(tmp_path, every=10, **kwargs):
+        signer = CheckpointSigner(tmp_path / "signing.key")
+        chain = AuditChain(tmp_path, signer=signer, checkpoint_every=every)
+        log = SegmentedLog(tmp_path / "audit.jsonl", chain=chain, **kwargs)
+        return log, AuditVerifier(tmp_path / "audit.jsonl", public_key=signer.public_key)
+
+    def test_signing_key_created_on_first_checkpoint(self, tmp_path, monkeypatch):
+        """Building loggers, sinks and chains leaves HOME alone until a checkpoint."""
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        key_file = tmp_path / "home" / ".claude-vault" / "audit-signing.key"
+        AuditLogger(str(tmp_path / "audit" / "audit.jsonl"))
+        chain = AuditChain(tmp_path)
+        log = SegmentedLog(tmp_path / "audit.jsonl", chain=chain)
+        log.append([_record(0)])
+        assert not key_file.exists()
+
+        log.close()
+        assert key_file.exists()
+        assert chain.signer.key_path == key_file
+
+    def test_unusable_signing_key_disables_checkpoints(self, tmp_path):
+        """Entries stay chained when the key cannot be read."""
+        (tmp_path / "signing.key").write_bytes(b"short")
+        chain = AuditChain(tmp_path, signer=CheckpointSigner(tmp_path / "signing.key"),
+                           checkpoint_every=2)
+        log = SegmentedLog(tmp_path / "audit.jsonl", chain=chain)
+        for i in range(5):
+            log.append([_record(i)])
+        log.close()
+        assert not (tmp_path / "checkpoints.jsonl").exists()
+        assert [e["seq"] for e in read_entries(tmp_path / "audit.jsonl")] == [1, 2, 3, 4, 5]
+
+    def test_modified_entry_is_detected(self, tmp_path):
+        """Editing an entry in place breaks its hash."""
+        log, verifier = self._chained_log(tmp_path)
+        log.append([_record(i) for i in range(25)])
+        log.close()
+        assert verifier.verify(full=True).ok
+
+        path = tmp_path / "audit.jsonl"
+        path.write_text(path.read_text().replace("event=7", "event=8"))
+        result = verifier.verify(full=True)
+        assert not result.ok
+        assert any("seq 8 was modified" in e for e in result.errors)
+
+    def test_incremental_verification_across_rotation(self, tmp_path):
+        """A second run only re-hashes entries after the last verified checkpoint."""
+        log, verifier = self._chained_log(tmp_path, max_bytes=2000, compression="gzip")
+        for i in range(50):
+            log.append([_record(i)])
+        first = verifier.verify()
+        assert first.ok and first.entries_checked == 50 and 40 <= first.verified_seq <= 50
+
+        # A restarted writer continues the chain from disk
+        log.close()
+        log, _ = self._chained_log(tmp_path, max_bytes=2000, compression="gzip")
+        for i in range(50, 65):
+            log.append([_record(i)])
+        log.close()
+
+        second = verifier.verify()
+        assert second.ok
+        assert second.entries_checked == 65 - first.verified_seq
+        assert second.verified_seq == 65
+        assert load_manifest(tmp_path)["segments"][0]["first_seq"] == 1
+
+    def test_concurrent_writers_share_one_chain(self, tmp_path):
+        """Writers in separate processes (one log object each) keep one valid chain."""
+        writers = [self._chained_log(tmp_path, max_bytes=3000, compression="gzip")[0]]
+        writers.append(self._chained_log(tmp_path, max_bytes=3000, compression="gzip")[0])
+        verifier = self._chained_log(tmp_path)[1]
+
+        # Interleaved groups, with rotations done by either writer
+        for i in range(40):
+            writers[i % 2].append([_record(i), _record(i)])
+
+        # Unsynchronized threads, one per writer
+        threads = [
+            threading.Thread(
+                target=lambda log=log: [log.append([_record(i)]) for i in range(100)]
+            )
+            for log in writers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for log in writers:
+            log.close()
+
+        result = verifier.verify(full=True)
+        assert result.ok, result.errors
+        assert result.last_seq == 280
+        assert len(load_manifest(tmp_path)["segments"]) > 2
+        entries = list(read_entries(tmp_path / "audit.jsonl"))
+        assert [e["seq"] for e in entries] == list(range(1, 281))
+
+    def test_truncation_and_forged_checkpoint(self, tmp_path):
+        """Dropping checkpointed entries or re-signing with another key fails."""
+        log, verifier = self._chained_log(tmp_path)
+        log.append([_record(i) for i in range(20)])
+        log.close()
+        assert verifier.verify().verified_seq == 20
+
+        path = tmp_path / "audit.jsonl"
+        lines = path.read_text().splitlines(keepends=True)
+        path.write_text("".join(lines[:15]))
+        result = verifier.verify()
+        assert not result.ok
+        assert any("truncated" in e for e in result.errors)
+
+        path.write_text("".join(lines))
+        forged = AuditChain(tmp_path, signer=CheckpointSigner(tmp_path / "other.key"))
+        forged.resume(20, json.loads(lines[-1])["hash"])
+        forged.seal([_record(20)])
+        forged.checkpoint("2025-01-01T00:00:00.000Z")
+        result = verifier.verify()
+        assert any("invalid signature" in e for e in result.errors)
@@ -0,0 +1,82 @@
+"""Tests for the content-addressed backup store."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.backup_store import BackupError, BackupStore, main
+
+
+class TestBackupStore:
+    """Deduplication, retention and restore tests."""
+
+    def test_deduplicates_identical_content(self, tmp_path):
+        """Unchanged files add no version; equal content across paths is stored once."""
+        store = BackupStore(tmp_path / "backups")
+        env = tmp_path / "app" / ".env"
+        env.parent.mkdir()
+        env.write_text("API_KEY=abc123\n" * 100)
+        copy = tmp_path / "copy.env"
+        copy.write_text(env.read_text())
+
+        first = store.backup(str(env))
+        assert store.backup(str(env)) == first
+        store.backup(str(copy))
+        env.write_text("API_KEY=rotated\n")
+        store.backup(str(env))
+
+        stats = store.stats()
+        assert (stats["paths"], stats["versions"], stats["objects"]) == (2, 3, 2)
+        assert stats["stored_bytes"] < stats["logical_bytes"] / 10
+        assert [v.digest for v in store.versions(str(env))][1] == first.digest
+
+    def test_restore_and_retention(self, tmp_path):
+        """Restore picks versions by position or digest; retention drops old objects."""
+        store = BackupStore(tmp_path / "backups", keep=3)
+        env = tmp_path / ".env"
+        for i in range(5):
+            env.write_text(f"DB_PASSWORD=v{i}\n")
+            env.chmod(0o600)
+            store.backup(str(env))
+        env.write_text("DB_PASSWORD=broken\n")
+
+        versions = store.versions(str(env))
+        assert len(versions) == 3
+        assert len(list((tmp_path / "backups" / "objects").rglob("*.gz"))) == 3
+
+        store.restore(str(env), versions[1].digest[:8])
+        assert env.read_text() == "DB_PASSWORD=v3\n"
+        assert env.stat().st_mode & 0o777 == 0o600
+        # The overwritten content was backed up first
+        assert store.read(store.resolve(str(env), "1")) == b"DB_PASSWORD=broken\n"
+
+        with pytest.raises(BackupError):
+            store.resolve(str(env), "9")
+        pruned = store.prune(keep=1)
+        assert (pruned["versions_removed"], pruned["objects_removed"]) == (2, 2)
+        assert pruned["bytes_freed"] > 0
+
+    def test_cli(self, tmp_path, monkeypatch, capsys):
+        """vault-backup add/log/restore round trip; corrupt objects are refused."""
+        monkeypatch.setattr("claude_vault_mcp.backup_store._global_store", None)
+        monkeypatch.setattr("claude_vault_mcp.backup_store.BACKUP_DIR", tmp_path / "backups")
+        env = tmp_path / ".env"
+        env.write_text("TOKEN=one\n")
+
+        assert main(["add", str(env)]) == 0
+        ref = capsys.readouterr().out.strip()
+        env.write_text("TOKEN=two\n")
+        assert main(["restore", ref, "--to", str(tmp_path / "restored.env")]) == 0
+        assert (tmp_path / "restored.env").read_text() == "TOKEN=one\n"
+
+        assert main(["log", str(env)]) == 0
+        assert ref.rpartition("@")[2] in capsys.readouterr().out
+
+        obj = next((tmp_path / "backups" / "objects").rglob("*.gz"))
+        obj.write_bytes(b"not gzip")
+        assert main(["restore", str(env)]) == 1
+        assert "unreadable" in capsys.readouterr().err
+        assert env.read_text() == "TOKEN=two\n"
@@ -0,0 +1,157 @@
+"""Tests for multi-file compose projects."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.compose_env import ComposeEnvResolver
+from claude_vault_mcp.compose_project import (
+    ComposeProjectCache,
+    ComposeProjectError,
+    project_files,
+)
+
+BASE = """
+services:
+  app:
+    image: app:1.0
+    command: ["serve"]
+    environment:
+      - LOG_LEVEL=info
+      - API_KEY=${API_KEY}
+    ports: ["8080:80"]
+    volumes:
+      - ./data:/data
+      - logs:/logs
+    env_file: app.env
+"""
+
+OVERRIDE = """
+services:
+  app:
+    command: ["serve", "--debug"]
+    environment:
+      LOG_LEVEL: debug
+      DEBUG_TOKEN: Tq8-Zr4mWx9Lp2Vk7Ns3
+    ports: ["9229:9229"]
+    volumes:
+      - ./dev-data:/data
+    env_file: [dev.env]
+"""
+
+
+def _write(path, content, age=10):
+    """Write a file with an mtime old enough for the cache to trust."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+class TestComposeProject:
+    """Override merging, include/extends and the merged-model cache."""
+
+    def test_override_merge(self, tmp_path):
+        """The default file set merges the override per compose rules."""
+        _write(tmp_path / "docker-compose.yml", BASE)
+        _write(tmp_path / "docker-compose.override.yml", OVERRIDE)
+        _write(tmp_path / "prod.yml", BASE)
+
+        files = project_files(str(tmp_path))
+        assert files == [
+            str(tmp_path / "docker-compose.yml"),
+            str(tmp_path / "docker-compose.override.yml"),
+        ]
+        assert project_files(str(tmp_path / "docker-compose.yml")) == files
+        assert project_files(str(tmp_path / "prod.yml")) == [str(tmp_path / "prod.yml")]
+
+        app = ComposeProjectCache().load(files).model["services"]["app"]
+        assert app["image"] == "app:1.0"
+        assert app["command"] == ["serve", "--debug"]
+        assert app["environment"] == {
+            "LOG_LEVEL": "debug",
+            "API_KEY": "${API_KEY}",
+            "DEBUG_TOKEN": "Tq8-Zr4mWx9Lp2Vk7Ns3",
+        }
+        assert app["ports"] == ["8080:80", "9229:9229"]
+        assert app["volumes"] == ["./dev-data:/data", "logs:/logs"]
+        assert app["env_file"] == ["app.env", "dev.env"]
+
+    def test_include_and_extends(self, tmp_path):
+        """Included and extended services are merged with paths rebased to the project."""
+        _write(
+            tmp_path / "compose.yaml",
+            "include:\n  - shared/db.yml\n"
+            "services:\n"
+            "  worker:\n"
+            "    extends: {file: shared/base.yml, service: base}\n"
+            "    environment: {QUEUE: jobs}\n"
+            "  api:\n"
+            "    extends: worker\n"
+            "    command: api\n",
+        )
+        _write(
+            tmp_path / "shared" / "base.yml",
+            "services:\n  base:\n    image: base\n    env_file: base.env\n"
+            "    environment: {QUEUE: default, TZ: UTC}\n",
+        )
+        _write(tmp_path / "shared" / "base.env", "WORKER_SECRET=Xk9-mP2vL8qR4nTw\n")
+        _write(
+            tmp_path / "shared" / "db.yml",
+            "services:\n  db:\n    image: postgres\n    env_file: db.env\n"
+            "volumes:\n  pgdata: {}\n",
+        )
+        _write(tmp_path / "shared" / "db.env", "POSTGRES_PASSWORD=Hn4-Bx8Mc6Dv1Qz7\n")
+
+        project = ComposeProjectCache().load(project_files(str(tmp_path)))
+        services = project.model["services"]
+        assert set(services) == {"db", "worker", "api"}
+        assert "pgdata" in project.model["volumes"]
+        assert services["worker"]["environment"] == {"QUEUE": "jobs", "TZ": "UTC"}
+        assert services["worker"]["env_file"] == "./shared/base.env"
+        assert services["api"]["image"] == "base" and services["api"]["command"] == "api"
+        assert "extends" not in services["api"]
+        assert len(project.inputs) == 3
+
+        envs = ComposeEnvResolver(project.files[0], project.model).resolve_all()
+        assert envs["db"].secrets()["POSTGRES_PASSWORD"].sources == [
+            str(tmp_path / "shared" / "db.env")
+        ]
+        assert "WORKER_SECRET" in envs["api"].secrets()
+
+        _write(tmp_path / "compose.yaml", "include: [shared/db.yml]\nservices:\n  db: {}\n")
+        with pytest.raises(ComposeProjectError, match="service 'db'"):
+            ComposeProjectCache().load(project_files(str(tmp_path)))
+        _write(tmp_path / "compose.yaml", "services:\n  a: {extends: b}\n  b: {extends: a}\n")
+        with pytest.raises(ComposeProjectError, match="cycle"):
+            ComposeProjectCache().load(project_files(str(tmp_path)))
+
+    def test_cache_tracks_every_input(self, tmp_path):
+        """Unchanged projects are served from cache; any changed input reloads."""
+        _write(tmp_path / "compose.yaml", "include: [db.yml]\nservices:\n  app: {image: app}\n")
+        _write(tmp_path / "db.yml", "services:\n  db: {image: postgres}\n")
+        files = project_files(str(tmp_path))
+        cache = ComposeProjectCache()
+        checked = []
+
+        first = cache.load(files, check=checked.append)
+        first.model["services"]["app"]["image"] = "mutated"
+        second = cache.load(files, check=checked.append)
+        assert second.model["services"]["app"]["image"] == "app"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert checked == second.inputs * 2
+
+        _write(tmp_path / "db.yml", "services:\n  db: {image: postgres:16}\n", age=5)
+        assert cache.load(files).model["services"]["db"]["image"] == "postgres:16"
+        assert cache.misses == 2
+
+        # Files modified within the racy window are never cached
+        _write(tmp_path / "db.yml", "services:\n  db: {image: mysql}\n", age=0)
+        assert cache.load(files).model["services"]["db"]["image"] == "mysql"
+        assert cache.load(files).model["services"]["db"]["image"] == "mysql"
+        assert cache.misses == 4
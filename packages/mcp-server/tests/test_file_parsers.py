@@ -0,0 +1,194 @@
+"""Tests for the .env/compose parsers, the parse cache and the YAML backend."""
+
+import importlib
+import io
+import itertools
+import os
+import sys
+import time
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp import file_parsers
+from claude_vault_mcp.file_parsers import (
+    ParseCache,
+    get_parse_cache,
+    iter_env_lines,
+    parse_docker_compose,
+    parse_env_file,
+    parse_env_file_with_structure,
+    write_docker_compose,
+    write_env_file,
+    yaml_backend,
+)
+
+SAMPLE = """# Database
+export DB_HOST=localhost
+DB_PASSWORD="s3cret pass"
+API_KEY=abc123 # rotated monthly
+
+CERT='-----BEGIN-----
+line
+-----END-----'
+  INDENTED=yes
+not an assignment
+"""
+
+
+class TestEnvParser:
+    """Single-grammar .env parsing tests."""
+
+    def test_plain_and_structure_agree(self, tmp_path):
+        """Both entry points produce the same key/values from one grammar."""
+        env_file = tmp_path / ".env"
+        env_file.write_text(SAMPLE)
+
+        plain = parse_env_file(str(env_file))
+        structure = parse_env_file_with_structure(str(env_file))
+
+        assert plain == {
+            "DB_HOST": "localhost",
+            "DB_PASSWORD": "s3cret pass",
+            "API_KEY": "abc123",
+            "CERT": "-----BEGIN-----\nline\n-----END-----",
+            "INDENTED": "yes",
+        }
+        assert {line.key: line.value for line in structure if line.key} == plain
+        assert [line.type for line in structure] == [
+            "comment", "export", "assignment", "assignment", "blank",
+            "assignment", "assignment", "unknown", "blank",
+        ]
+        assert structure[3].comment == "# rotated monthly"
+
+    def test_structure_round_trip(self, tmp_path):
+        """Writing an unchanged structure reproduces the file byte for byte."""
+        env_file = tmp_path / ".env"
+        env_file.write_text(SAMPLE)
+        out = tmp_path / "out.env"
+
+        write_env_file(str(out), {}, True, parse_env_file_with_structure(str(env_file)))
+
+        assert out.read_text() == SAMPLE
+
+    def test_streams_lazily(self):
+        """Entries are yielded as lines arrive, without reading ahead."""
+        endless = itertools.chain(
+            io.StringIO("A=1\nB='two\nlines'\n"), (f"K{i}=v\n" for i in itertools.count())
+        )
+        first = list(itertools.islice(iter_env_lines(endless, structure=False), 3))
+
+        assert first == [("A", "1"), ("B", "two\nlines"), ("K0", "v")]
+
+
+class TestParseCache:
+    """Stat-keyed parse cache tests."""
+
+    def test_unchanged_file_is_not_reparsed(self, tmp_path):
+        """Repeated parses hit the cache and return independent copies."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=1\n")
+        old = time.time_ns() - 10 * 10**9
+        os.utime(env_file, ns=(old, old))  # Outside the racy window
+        compose_file = tmp_path / "docker-compose.yml"
+        compose_file.write_text("services:\n  web:\n    environment:\n      A: '1'\n")
+        cache = get_parse_cache()
+        cache.clear()
+
+        parse_env_file(str(env_file))["A"] = "mutated"
+        parse_docker_compose(str(compose_file))["services"]["web"]["environment"]["A"] = "x"
+
+        assert parse_env_file(str(env_file)) == {"A": "1"}
+        assert parse_docker_compose(str(compose_file))["services"]["web"]["environment"] == {
+            "A": "1"
+        }
+        assert cache.stats()["hits"] == 2
+
+        write_env_file(str(env_file), {"A": "2"})
+        assert parse_env_file(str(env_file)) == {"A": "2"}
+
+    def test_ambiguous_mtime_is_verified_by_content(self, tmp_path):
+        """A same-size rewrite within one mtime tick is caught by the hash."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=1\n")
+        st = env_file.stat()
+        cache = ParseCache()
+        parse = lambda f: dict(iter_env_lines(f, structure=False))  # noqa: E731
+
+        assert cache.load("env", str(env_file), parse) == {"A": "1"}
+        assert cache.load("env", str(env_file), parse) == {"A": "1"}
+
+        env_file.write_text("A=2\n")
+        os.utime(env_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cache.load("env", str(env_file), parse) == {"A": "2"}
+        assert cache.stats()["hits"] == 1
+
+    def test_crlf_parsed_alike_at_any_age(self, tmp_path):
+        """Fresh (content-hashed) and old files get the same newline translation."""
+        fresh = tmp_path / "fresh.env"
+        old_file = tmp_path / "old.env"
+        for path in (fresh, old_file):
+            path.write_bytes(b"A=hello\r\n# note\r\nB='multi\r\nline'\r\n")
+        old = time.time_ns() - 10 * 10**9
+        os.utime(old_file, ns=(old, old))
+        cache = ParseCache()
+        parse = lambda f: list(iter_env_lines(f, structure=True))  # noqa: E731
+
+        expected = cache.load("env", str(old_file), parse)
+        assert [line.raw_line for line in expected[:3]] == ["A=hello", "# note", "B='multi\nline'"]
+        assert cache.load("env", str(fresh), parse) == expected
+
+        # Same identity, changed content: the re-parse path translates too
+        st = fresh.stat()
+        fresh.write_bytes(b"A=howdy\r\n# note\r\nB='multi\r\nline'\r\n")
+        os.utime(fresh, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cache.load("env", str(fresh), parse)[0].raw_line == "A=howdy"
+
+    def test_missing_file(self, tmp_path):
+        """Missing files raise FileNotFoundError and drop stale entries."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=1\n")
+        parse_env_file(str(env_file))
+        env_file.unlink()
+
+        with pytest.raises(FileNotFoundError):
+            parse_env_file(str(env_file))
+
+
+class TestYamlBackend:
+    """libyaml selection and fallback tests."""
+
+    def test_compose_round_trip(self, tmp_path):
+        """Compose files dump and load back unchanged, keeping key order."""
+        data = {
+            "services": {
+                "web": {"image": "nginx", "environment": {"Z": "1", "A": "héllo"}},
+                "db": {"image": "postgres", "ports": ["5432:5432"]},
+            }
+        }
+        compose_file = tmp_path / "docker-compose.yml"
+        write_docker_compose(str(compose_file), data)
+
+        loaded = parse_docker_compose(str(compose_file))
+        assert loaded == data
+        assert list(loaded["services"]["web"]["environment"]) == ["Z", "A"]
+        expected = "libyaml" if hasattr(yaml, "CSafeLoader") else "python"
+        assert yaml_backend() == expected
+
+    def test_falls_back_without_libyaml(self, tmp_path, monkeypatch):
+        """Without the C extension the pure-Python safe loader is used."""
+        monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+        monkeypatch.delattr(yaml, "CSafeDumper", raising=False)
+        try:
+            module = importlib.reload(file_parsers)
+            assert module.yaml_backend() == "python"
+            assert module.SafeLoader is yaml.SafeLoader
+
+            compose_file = tmp_path / "docker-compose.yml"
+            module.write_docker_compose(str(compose_file), {"services": {"web": {}}})
+            assert module.parse_docker_compose(str(compose_file)) == {"services": {"web": {}}}
+        finally:
+            monkeypatch.undo()
+            importlib.reload(file_parsers)
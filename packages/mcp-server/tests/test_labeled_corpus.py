@@ -0,0 +1,44 @@
+"""Accuracy regression tests on the labeled benchmark corpus."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../benchmarks'))
+
+from claude_vault_mcp.file_parsers import classify_secret
+from claude_vault_mcp.tokenization import should_tokenize_value
+from labeled_corpus import generate_corpus, render_env, score
+
+# Baseline measured on generate_corpus(2000, seed=0); raise these when the
+# classifier improves, never lower them to make a speed change pass.
+CLASSIFY_MIN_PRECISION = 0.72
+CLASSIFY_MIN_RECALL = 0.98
+
+
+class TestLabeledCorpus:
+    """Classifier quality on the labeled corpus."""
+
+    def test_corpus_is_deterministic(self):
+        """Same seed, same corpus; both labels are represented."""
+        first = generate_corpus(200, seed=7)
+
+        assert first == generate_corpus(200, seed=7)
+        assert any(p.is_secret for p in first) and not all(p.is_secret for p in first)
+        assert render_env(first).count("\n") == 202
+
+    def test_classify_secret_quality(self):
+        """classify_secret keeps its precision/recall baseline."""
+        pairs = generate_corpus(2000, seed=0)
+        result = score(
+            [classify_secret(p.key, p.value) for p in pairs], [p.is_secret for p in pairs]
+        )
+
+        assert result["precision"] >= CLASSIFY_MIN_PRECISION
+        assert result["recall"] >= CLASSIFY_MIN_RECALL
+
+    def test_should_tokenize_never_misses_secrets(self):
+        """Every labeled secret fetched from Vault is tokenized."""
+        pairs = [p for p in generate_corpus(2000, seed=0) if p.is_secret]
+
+        assert all(should_tokenize_value(p.key, p.value) for p in pairs)
@@ -0,0 +1,94 @@
+"""Tests for incremental workspace rescans."""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.scan_manifest import ScanManifest
+
+SECRET = "8f14e45fceea167a5a36dedd4bea2543"
+ROTATED = "0cc175b9c0f1b6a831c399e269772661"
+
+
+def _write(path, text, age=10):
+    """Write a file with an mtime outside the racy window."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    old = time.time_ns() - age * 10**9
+    os.utime(path, ns=(old, old))
+
+
+def _manifest(tmp_path):
+    return ScanManifest(tmp_path / "scan-manifest.json", tmp_path / "scan-manifest.key")
+
+
+class TestScanManifest:
+    """Manifest reuse and delta tests."""
+
+    def test_unchanged_workspace_is_not_reread(self, tmp_path):
+        """A second rescan reuses every entry and reports no changes."""
+        root = tmp_path / "ws"
+        _write(root / "app" / ".env", f"SECRET_KEY={SECRET}\nPORT=8080\n")
+        _write(root / "db" / ".env", f"DB_PASSWORD={ROTATED}\n")
+
+        _, first = _manifest(tmp_path).rescan([root], max_workers=0)
+        assert first.new_files == [str(root / "app" / ".env"), str(root / "db" / ".env")]
+        assert first.rescanned == 2
+
+        scan, second = _manifest(tmp_path).rescan([root], max_workers=0)
+        assert second.is_empty
+        assert (second.rescanned, second.unchanged) == (0, 2)
+        assert scan.summary()["secret_count"] == 2
+
+        saved = (tmp_path / "scan-manifest.json").read_text()
+        assert SECRET not in saved and ROTATED not in saved
+        assert json.loads(saved)["files"][str(root / "db" / ".env")]["secrets"].keys() == {
+            "DB_PASSWORD"
+        }
+
+    def test_deltas(self, tmp_path):
+        """New, removed and changed secrets are reported per file."""
+        root = tmp_path / "ws"
+        env = root / "app" / ".env"
+        _write(env, f"SECRET_KEY={SECRET}\nAPI_TOKEN=ghp_{'a' * 36}\nPORT=8080\n")
+        _write(root / "old" / ".env", f"DB_PASSWORD={ROTATED}\n")
+        _manifest(tmp_path).rescan([root], max_workers=0)
+
+        _write(env, f"SECRET_KEY={ROTATED}\nPORT=9090\nJWT_SECRET={SECRET}\n", age=5)
+        (root / "old" / ".env").unlink()
+        _write(root / "new" / ".env", f"REDIS_PASSWORD={SECRET}\n")
+
+        manifest = _manifest(tmp_path)
+        _, delta = manifest.rescan([root], max_workers=0, record=False)
+        app, old, new = (str(env), str(root / "old" / ".env"), str(root / "new" / ".env"))
+        assert delta.changed_files == [app]
+        assert delta.new_files == [new] and delta.removed_files == [old]
+        assert delta.new_secrets == {app: ["JWT_SECRET"], new: ["REDIS_PASSWORD"]}
+        assert delta.removed_secrets == {app: ["API_TOKEN"], old: ["DB_PASSWORD"]}
+        assert delta.changed_secrets == {app: ["SECRET_KEY"]}
+        assert delta.unchanged == 0
+
+        # Not recorded: the baseline is still the first scan
+        _, again = _manifest(tmp_path).rescan([root], max_workers=0)
+        assert again.summary() == delta.summary()
+        assert _manifest(tmp_path).rescan([root], max_workers=0)[1].is_empty
+
+    def test_racy_rewrite_is_detected(self, tmp_path):
+        """A same-size rewrite keeping the mtime is caught by the content digest."""
+        root = tmp_path / "ws"
+        env = root / "app" / ".env"
+        env.parent.mkdir(parents=True)
+        env.write_text(f"SECRET_KEY={SECRET}\n")
+        st = env.stat()
+        _manifest(tmp_path).rescan([root], max_workers=0)
+
+        _, touched = _manifest(tmp_path).rescan([root], max_workers=0)
+        assert touched.is_empty and touched.unchanged == 1
+
+        env.write_text(f"SECRET_KEY={ROTATED}\n")
+        os.utime(env, ns=(st.st_atime_ns, st.st_mtime_ns))
+        _, delta = _manifest(tmp_path).rescan([root], max_workers=0)
+        assert delta.changed_secrets == {str(env): ["SECRET_KEY"]}
@@ -0,0 +1,52 @@
+"""Tests for the vault_scan_env approval workflow."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp import migration_state
+from claude_vault_mcp.tokenization import TokenVault
+from claude_vault_mcp.tools import scan
+from claude_vault_mcp.tools.scan import VaultScanEnvTool
+
+
+class FakeApprovalServer:
+    """Approves every operation and records cleanups."""
+
+    def __init__(self):
+        self.cleaned = []
+
+    def check_approval(self, op_id):
+        return True
+
+    def cleanup_operation(self, op_id):
+        self.cleaned.append(op_id)
+
+
+class TestVaultScanEnvExecute:
+    """Phase 3 of vault_scan_env: tokenize an approved file."""
+
+    def test_approved_scan_tokenizes_secrets(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("VAULT_AUDIT_LOG", str(tmp_path / "audit"))
+        approvals = FakeApprovalServer()
+        vault = TokenVault()
+        marked = []
+        monkeypatch.setattr(scan, "get_approval_server", lambda: approvals)
+        monkeypatch.setattr(scan, "get_token_vault", lambda: vault)
+        monkeypatch.setattr(migration_state, "mark_scanned", lambda *args: marked.append(args))
+
+        env_file = tmp_path / ".env"
+        env_file.write_text("SECRET_KEY=8f14e45fceea167a5a36dedd4bea2543\nPORT=8080\n")
+        tool = VaultScanEnvTool()
+        result = tool._execute_scan("app", str(env_file), "op-1")
+        tool.audit_logger.flush()
+
+        text = result[0].text
+        assert text.startswith("✅ Scan completed")
+        assert "8f14e45fceea167a5a36dedd4bea2543" not in text
+        assert "PORT: 8080" in text
+        token = text.split("SECRET_KEY: ", 1)[1].split()[0]
+        assert vault.detokenize(token) == "8f14e45fceea167a5a36dedd4bea2543"
+        assert marked == [("app", [str(env_file)], 1)]
+        assert approvals.cleaned == ["op-1"]
@@ -0,0 +1,96 @@
+"""Tests for the precompiled security validators."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.security import (
+    AllowedRoots,
+    SecurityValidator,
+    ValidationError,
+    reset_allowed_roots,
+)
+
+
+class TestSecurityValidator:
+    """Single-scan pattern detection and batch validation tests."""
+
+    def test_every_pattern_reported_once(self):
+        """One scan reports every distinct hit, in declaration order."""
+        patterns = SecurityValidator.detect_dangerous_patterns("a; b && $(c) ; `d`\n")
+
+        assert patterns == [
+            "command substitution: $(...)",
+            "backticks (command execution)",
+            "command chaining: &&",
+            "command separator: ;",
+            "newline character",
+        ]
+
+    def test_batch_collects_all_errors(self):
+        """Every invalid entry is reported, not just the first."""
+        errors, warnings = SecurityValidator.validate_secrets_batch(
+            {
+                "GOOD": "x && y",
+                "bad key": "fine",
+                "TOO_LONG": "x" * 9000,
+                "NOT_STRING": 42,
+            }
+        )
+
+        assert [e.split(":")[0] for e in errors] == ["bad key", "TOO_LONG", "NOT_STRING"]
+        assert warnings == ["GOOD: command chaining: &&"]
+
+    def test_names_rejected_with_trailing_newline(self):
+        """Names must match entirely (no trailing newline slips through)."""
+        with pytest.raises(ValidationError):
+            SecurityValidator.validate_key_name("API_KEY\n")
+        with pytest.raises(ValidationError):
+            SecurityValidator.validate_service_name("myapp\n")
+
+
+class TestAllowedRoots:
+    """Allowed-roots trie and validated-path cache tests."""
+
+    def test_paths_checked_against_roots(self, tmp_path):
+        """Paths under a root pass; siblings, prefixes and traversal do not."""
+        root = tmp_path / "services"
+        (root / "app").mkdir(parents=True)
+        roots = AllowedRoots([str(root)])
+
+        assert roots.check(str(root / "app" / ".env")) == root.resolve() / "app" / ".env"
+        for bad in [tmp_path / "services-old" / ".env", root / ".." / "other", "/etc/passwd"]:
+            with pytest.raises(ValidationError):
+                roots.check(str(bad))
+
+    def test_cache_invalidated_when_file_replaced_by_symlink(self, tmp_path):
+        """A cached path is re-validated once its inode changes."""
+        root = tmp_path / "services"
+        root.mkdir()
+        target = root / ".env"
+        target.write_text("A=1\n")
+        outside = tmp_path / "outside.env"
+        outside.write_text("B=2\n")
+        roots = AllowedRoots([str(root)])
+
+        roots.check(str(target))
+        assert str(target) in roots._cache
+
+        target.unlink()
+        target.symlink_to(outside)
+        with pytest.raises(ValidationError):
+            roots.check(str(target))
+
+    def test_roots_from_environment(self, tmp_path, monkeypatch):
+        """VAULT_ALLOWED_DIRS replaces the default roots."""
+        monkeypatch.setenv("VAULT_ALLOWED_DIRS", str(tmp_path))
+        reset_allowed_roots()
+        try:
+            SecurityValidator.validate_file_path(str(tmp_path / "app" / ".env"))
+            with pytest.raises(ValidationError):
+                SecurityValidator.validate_file_path("/workspace/proxmox-services/app/.env")
+        finally:
+            reset_allowed_roots()
@@ -0,0 +1,80 @@
+"""Tests for the cross-process token-resolution service."""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.token_service import (
+    TokenResolutionClient,
+    TokenResolutionServer,
+    TokenServiceUnavailable,
+    pending_op_tokens,
+    start_token_service,
+)
+from claude_vault_mcp.tokenization import TokenVault
+
+
+class TestTokenService:
+    """Unix socket token resolution tests."""
+
+    def test_batched_resolve(self, tmp_path):
+        """Tokens of the pending operation resolve in one batch; others are omitted."""
+        vault = TokenVault()
+        token1 = vault.tokenize("first_secret_value")
+        token2 = vault.tokenize("second_secret_value")
+        other = vault.tokenize("unrelated_secret_value")
+        ops = {"op1": {token1, token2}}
+
+        server = TokenResolutionServer(
+            tmp_path / "resolver.sock", vault_getter=lambda: vault, op_lookup=ops.get
+        )
+        server.start()
+        try:
+            client = TokenResolutionClient(tmp_path / "resolver.sock")
+            values = client.resolve([token1, token2, other, "@token-0000000000000000"], "op1")
+            with pytest.raises(TokenServiceUnavailable, match="pending operation"):
+                client.resolve([other], "unknown-op")
+        finally:
+            server.stop()
+
+        assert values == {token1: "first_secret_value", token2: "second_secret_value"}
+
+    def test_pending_op_tokens(self, tmp_path):
+        """Only live, unapproved operations expose their tokens."""
+        path = tmp_path / "pending-operations.json"
+        now = time.time()
+        path.write_text(
+            json.dumps(
+                {
+                    "live": {
+                        "created_at": now,
+                        "secrets": {"A": "@token-aaaaaaaaaaaaaaaa", "B": "plain"},
+                    },
+                    "expired": {"created_at": now - 600, "secrets": {"A": "@token-a"}},
+                    "approved": {"created_at": now, "approved": True, "secrets": {}},
+                }
+            )
+        )
+
+        assert pending_op_tokens("live", path) == {"@token-aaaaaaaaaaaaaaaa"}
+        assert pending_op_tokens("expired", path) is None
+        assert pending_op_tokens("approved", path) is None
+        assert pending_op_tokens("missing", path) is None
+        assert pending_op_tokens("live", tmp_path / "absent.json") is None
+
+    def test_service_is_opt_in(self, monkeypatch):
+        """Nothing listens unless VAULT_TOKEN_SERVICE is enabled."""
+        monkeypatch.delenv("VAULT_TOKEN_SERVICE", raising=False)
+
+        assert start_token_service() is None
+
+    def test_client_without_service(self, tmp_path):
+        """Ping fails cleanly when nothing is listening."""
+        client = TokenResolutionClient(tmp_path / "missing.sock")
+
+        assert client.ping() is False
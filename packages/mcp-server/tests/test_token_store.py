@@ -0,0 +1,76 @@
+"""Tests for encrypted token vault persistence."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.token_store import EncryptedTokenStore
+from claude_vault_mcp.tokenization import TokenVault
+
+
+def make_store(tmp_path):
+    return EncryptedTokenStore(
+        path=tmp_path / "token-vault.bin",
+        key_path=tmp_path / "token-vault.key",
+        use_keyring=False,
+    )
+
+
+class TestTokenPersistence:
+    """Warm-restart persistence tests."""
+
+    def test_tokens_survive_restart(self, tmp_path):
+        """A new vault on the same store resolves tokens from the previous one."""
+        vault = TokenVault(store=make_store(tmp_path))
+        token = vault.tokenize("my_super_secret_password")
+        vault.flush()
+
+        restarted = TokenVault(store=make_store(tmp_path))
+
+        assert restarted.detokenize(token) == "my_super_secret_password"
+        assert restarted.session_id == vault.session_id
+        # Deduplication still holds after reload
+        assert restarted.tokenize("my_super_secret_password") == token
+
+    def test_store_is_encrypted(self, tmp_path):
+        """Plaintext never appears in the sealed file."""
+        vault = TokenVault(store=make_store(tmp_path))
+        vault.tokenize("my_super_secret_password")
+        vault.flush()
+
+        blob = (tmp_path / "token-vault.bin").read_bytes()
+
+        assert b"my_super_secret_password" not in blob
+        assert oct((tmp_path / "token-vault.key").stat().st_mode & 0o777) == "0o600"
+
+    def test_expired_snapshot_ignored(self, tmp_path):
+        """Snapshots older than the session TTL are not restored."""
+        vault = TokenVault(store=make_store(tmp_path))
+        token = vault.tokenize("my_super_secret_password")
+        vault.session_created -= 10_000
+        vault.flush()
+
+        restarted = TokenVault(store=make_store(tmp_path))
+
+        assert token not in restarted.token_map
+
+    def test_writes_are_batched(self, tmp_path):
+        """Tokenizing many values seals the store once, on flush."""
+        store = make_store(tmp_path)
+        saves = []
+        save = store.save
+        store.save = lambda snapshot: (saves.append(1), save(snapshot))
+        vault = TokenVault(store=store)
+
+        tokens = [
+            vault.tokenize(f"secret_value_{i:04d}", {"service": "app", "key": f"K{i}"})
+            for i in range(50)
+        ]
+        assert saves == [] and not (tmp_path / "token-vault.bin").exists()
+
+        vault.flush()
+        vault.flush()
+        assert saves == [1]
+        restarted = TokenVault(store=make_store(tmp_path))
+        assert restarted.detokenize(tokens[-1]) == "secret_value_0049"
@@ -0,0 +1,196 @@
+"""Tests for TokenVault indexing and structural detokenization."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.tokenization import TokenVault
+from claude_vault_mcp.tools.read import VaultGetTool, VaultTokensTool
+
+
+class TestTokenIndex:
+    """Reverse (service, key) → token index tests."""
+
+    def test_tokens_listed_per_service(self):
+        """Tokens are indexed by the service/key metadata."""
+        vault = TokenVault()
+        token = vault.tokenize("db_password_value", {"service": "app", "key": "DB_PASSWORD"})
+        vault.tokenize("other_value_12345", {"service": "other", "key": "API_KEY"})
+
+        assert vault.tokens_for("app") == {"DB_PASSWORD": [token]}
+        assert vault.tokens_for("app", "API_KEY") == {}
+
+    def test_invalidate_keeps_shared_tokens(self):
+        """Invalidating one key leaves a token shared with another key valid."""
+        vault = TokenVault()
+        shared = vault.tokenize("same_value_1234", {"service": "app", "key": "A"})
+        vault.tokenize("same_value_1234", {"service": "app", "key": "B"})
+        only = vault.tokenize("only_value_1234", {"service": "app", "key": "C"})
+
+        assert vault.invalidate("app", "A") == []
+        assert vault.detokenize(shared) == "same_value_1234"
+        assert vault.invalidate("app", "C") == [only]
+        assert only not in vault.token_map
+        assert vault.tokens_for("app") == {"B": [shared]}
+
+    def test_repoint_after_rotation(self):
+        """Rotated keys keep their token but resolve to the new value."""
+        vault = TokenVault()
+        token = vault.tokenize("old_secret_value", {"service": "app", "key": "API_KEY"})
+
+        assert vault.repoint("app", "API_KEY", "new_secret_value") == [token]
+        assert vault.detokenize(token) == "new_secret_value"
+        assert vault.tokenize("new_secret_value") == token
+
+
+    def test_token_refs_track_shared_values(self):
+        """Equal values share one token that references every key."""
+        vault = TokenVault()
+        shared = vault.tokenize("same_value_1234", {"service": "app", "key": "A"})
+        assert vault.tokenize("same_value_1234", {"service": "web", "key": "B"}) == shared
+
+        assert vault.token_refs[shared] == {("app", "A"), ("web", "B")}
+        assert vault.key_index == {"app": {"A": {shared}}, "web": {"B": {shared}}}
+        assert vault.tokens_for("web", "B") == {"B": [shared]}
+
+    def test_repoint_shared_token(self):
+        """Rotating a key re-points a shared token; the old value is unreachable."""
+        vault = TokenVault()
+        shared = vault.tokenize("oldpassword123", {"service": "s", "key": "P"})
+        vault.tokenize("oldpassword123", {"service": "s", "key": "Q"})
+
+        assert vault.repoint("s", "P", "newpassword456") == [shared]
+        assert vault.detokenize(shared) == "newpassword456"
+        assert "oldpassword123" not in vault.token_map.values()
+        assert vault.tokens_for("s") == {"P": [shared]}
+        assert vault.token_refs[shared] == {("s", "P")}
+
+        # Q gets a fresh token for its (unchanged) value
+        fresh = vault.tokenize("oldpassword123", {"service": "s", "key": "Q"})
+        assert fresh != shared
+        assert vault.tokens_for("s", "Q") == {"Q": [fresh]}
+
+    def test_repoint_after_write(self):
+        """Re-pointing to a value that already has a token keeps both resolvable."""
+        vault = TokenVault()
+        old = vault.tokenize("old_secret_value", {"service": "app", "key": "API_KEY"})
+        new = vault.tokenize("new_secret_value")
+
+        assert vault.repoint("app", "API_KEY", "new_secret_value") == [old]
+        assert vault.detokenize(old) == vault.detokenize(new) == "new_secret_value"
+        assert vault.repoint("app", "API_KEY", "new_secret_value") == [old]
+
+    def test_invalidate_unknown_key(self):
+        """Invalidating a key without tokens is a no-op."""
+        vault = TokenVault()
+
+        assert vault.invalidate("app", "MISSING") == []
+        assert vault.key_index == {}
+
+
+class TestTokenTools:
+    """vault_tokens listing and token invalidation on read."""
+
+    def test_vault_tokens(self, monkeypatch):
+        """The tool lists services, keys and tokens but never values."""
+        vault = TokenVault()
+        token = vault.tokenize("db_password_value", {"service": "app", "key": "DB_PASSWORD"})
+        monkeypatch.setattr("claude_vault_mcp.tools.read.get_token_vault", lambda: vault)
+        tool = VaultTokensTool()
+
+        overview = tool.run_tool({})[0].text
+        detail = tool.run_tool({"service": "app"})[0].text
+
+        assert "app: 1 token(s) across 1 key(s)" in overview
+        assert f"DB_PASSWORD: {token}" in detail
+        assert "db_password_value" not in overview + detail
+        assert "No live tokens" in tool.run_tool({"service": "app", "key": "OTHER"})[0].text
+
+    def test_deleted_keys_invalidated(self, monkeypatch):
+        """Tokens of keys no longer present in Vault stop resolving."""
+        vault = TokenVault()
+        kept = vault.tokenize("kept_value_12345", {"service": "app", "key": "KEPT"})
+        gone = vault.tokenize("gone_value_12345", {"service": "app", "key": "GONE"})
+        monkeypatch.setattr("claude_vault_mcp.tools.read.get_token_vault", lambda: vault)
+
+        VaultGetTool._invalidate_removed_keys("app", {"KEPT": "kept_value_12345"})
+
+        assert vault.tokens_for("app") == {"KEPT": [kept]}
+        assert gone not in vault.token_map
+
+
+class TestDetokenizeStructure:
+    """Structural detokenization tests."""
+
+    def test_lists_of_dicts(self):
+        """Tokens inside lists of dicts are resolved."""
+        vault = TokenVault()
+        token = vault.tokenize("compose_secret_value")
+        data = {"services": [{"environment": {"DB_PASSWORD": token}}], "plain": {"a": 1}}
+
+        result = vault.detokenize_dict(data)
+
+        assert result["services"][0]["environment"]["DB_PASSWORD"] == "compose_secret_value"
+        assert data["services"][0]["environment"]["DB_PASSWORD"] == token
+        assert result["plain"] is data["plain"]
+
+    def test_nested_dicts_and_lists(self):
+        """Tokens at every level are resolved; other subtrees are shared by identity."""
+        vault = TokenVault()
+        token = vault.tokenize("nested_secret_value")
+        untouched = {"image": "app:1.0", "ports": ["80:80"]}
+        data = {
+            "top": token,
+            "services": {"app": {"env": [token, "plain", {"K": token}]}, "web": untouched},
+            "tags": ["a", "b"],
+        }
+
+        result = vault.detokenize_structure(data)
+
+        assert result["top"] == "nested_secret_value"
+        assert result["services"]["app"]["env"] == [
+            "nested_secret_value",
+            "plain",
+            {"K": "nested_secret_value"},
+        ]
+        assert result["services"]["web"] is untouched
+        assert result["tags"] is data["tags"]
+        assert result is not data and result["services"] is not data["services"]
+
+    def test_input_not_mutated(self):
+        """The input structure is left exactly as it was."""
+        import copy
+
+        vault = TokenVault()
+        token = vault.tokenize("nested_secret_value")
+        data = {"a": [{"b": token}, [token]], "c": {"d": token}}
+        before = copy.deepcopy(data)
+
+        vault.detokenize_structure(data)
+
+        assert data == before
+
+    def test_untouched_input_returned(self):
+        """A structure without tokens comes back by reference."""
+        vault = TokenVault()
+        data = {"a": [{"b": "plain"}], "c": 3}
+
+        assert vault.detokenize_dict(data) is data
+
+    def test_deep_nesting(self):
+        """Nesting far beyond the recursion limit is supported."""
+        vault = TokenVault()
+        token = vault.tokenize("deep_secret_value")
+        data = leaf = {}
+        for _ in range(sys.getrecursionlimit() * 2):
+            leaf["next"] = {}
+            leaf = leaf["next"]
+        leaf["value"] = [token]
+
+        result = vault.detokenize_dict(data)
+
+        node = result
+        while "next" in node:
+            node = node["next"]
+        assert node["value"] == ["deep_secret_value"]
@@ -0,0 +1,99 @@
+"""Tests for the background workspace watcher."""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from claude_vault_mcp.watcher import Inotify, WorkspaceWatcher
+
+SECRET = "8f14e45fceea167a5a36dedd4bea2543"
+ROTATED = "0cc175b9c0f1b6a831c399e269772661"
+
+
+def _inotify_available():
+    try:
+        Inotify().close()
+        return True
+    except OSError:
+        return False
+
+
+def _eventually(check, timeout=5.0):
+    """Poll until check() is truthy; returns its last value."""
+    deadline = time.monotonic() + timeout
+    while not (value := check()) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return value
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / ".env").write_text(f"SECRET_KEY={SECRET}\nPORT=8080\n")
+    return tmp_path
+
+
+class TestWorkspaceWatcher:
+    """inotify and polling watcher tests."""
+
+    @pytest.mark.skipif(not _inotify_available(), reason="inotify not available")
+    def test_inotify_keeps_results_warm(self, workspace):
+        """Writes, new service directories and deletions are picked up from events."""
+        env = str(workspace / "app" / ".env")
+        watcher = WorkspaceWatcher([workspace], backend="inotify", max_workers=0)
+        watcher.start()
+        try:
+            assert watcher.wait_ready(5)
+            assert watcher.backend == "inotify"
+            assert watcher.lookup(env).secrets == {"SECRET_KEY": SECRET}
+
+            (workspace / "app" / ".env").write_text(f"SECRET_KEY={ROTATED}\n")
+            assert _eventually(
+                lambda: (r := watcher.lookup(env)) and r.secrets["SECRET_KEY"] == ROTATED
+            )
+
+            (workspace / "db" / "config").mkdir(parents=True)
+            (workspace / "db" / "config" / ".env").write_text(f"DB_PASSWORD={SECRET}\n")
+            scan = _eventually(lambda: (s := watcher.snapshot()) and "db" in s.services and s)
+            assert [f.secrets for f in scan.services["db"]] == [{"DB_PASSWORD": SECRET}]
+
+            os.unlink(env)
+            assert _eventually(lambda: watcher.stats()["files"] == 1)
+            assert watcher.lookup(env) is None
+        finally:
+            watcher.stop()
+
+    def test_polling_verifies_identity(self, workspace):
+        """Between polls, a changed file is not served from the stale result."""
+        env = workspace / "app" / ".env"
+        watcher = WorkspaceWatcher([workspace], backend="poll", interval=60, max_workers=0)
+        watcher.start()
+        try:
+            assert watcher.wait_ready(5)
+            assert watcher.snapshot().summary()["secret_count"] == 1
+
+            env.write_text(f"SECRET_KEY={ROTATED}\nAPI_KEY={SECRET}\n")
+            assert watcher.lookup(str(env)) is None
+            assert watcher.snapshot() is None
+        finally:
+            watcher.stop()
+
+    def test_not_ready_and_unwatched(self, workspace, tmp_path_factory):
+        """Lookups return None before the first scan and for files outside the roots."""
+        watcher = WorkspaceWatcher([workspace], backend="poll")
+        assert watcher.lookup(str(workspace / "app" / ".env")) is None
+        assert watcher.snapshot() is None
+
+        other = tmp_path_factory.mktemp("other") / ".env"
+        other.write_text("A=1\n")
+        watcher.start()
+        try:
+            assert watcher.wait_ready(5)
+            assert watcher.lookup(str(other)) is None
+            assert watcher.stats()["files"] == 1
+        finally:
+            watcher.stop()